@@ -0,0 +1,283 @@
+"""合成题库生成器：按需生成任意规模的 .txt / .docx 题库，用于基准测试和压力测试
+
+每次生成一对题库 "X.ext"（含答案）与 "X（无答案）.ext"（纯题干），命名与批量模式的配对规则一致，
+另附 "X.truth.json" 记录每道题的题型、题干、选项和答案。覆盖的格式：
+
+- 题号 "1. " / "1、" / "（1）" 轮换，题号全卷连续
+- 判断题 "（ ）" 题干；填空题 "____" 题干；简答题
+- 选择题 A–H 选项，每行一个或同行多个，含多选题（"（多选）"）
+- 题型标题 "一、判断题" 等，每种题型一个章节
+- 含答案版本在判断/选择/填空章节末尾附 "答案：1.√ 2.× …" 行，简答章节末尾附 "答案要点：" 块
+- DOCX 中按 strike_ratio 给部分题目加删除线（这些题在真值中标记 struck，识别时应被过滤）
+
+所有文件逐行流式写出，内存占用只与单个章节的答案数有关，可生成数百万行的题库。
+
+    python -m benchmarks.bank_generator --size 100000 --output data/synthetic
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+from xml.sax.saxutils import escape
+
+DEFAULT_NAME = "synthetic"
+WITHOUT_ANSWERS_SUFFIX = "（无答案）"
+TRUTH_SUFFIX = ".truth.json"
+SUPPORTED_FORMATS = ("txt", "docx")
+
+# (题型, 章节标题)；每种题型一个章节，与 extract_answers_by_type 按题型分块对齐的方式一致
+SECTIONS: Tuple[Tuple[str, str], ...] = (
+    ("judge", "一、判断题"),
+    ("choice", "二、选择题"),
+    ("fill", "三、填空题"),
+    ("short", "四、简答题"),
+)
+NUMBER_STYLES = ("{n}. ", "{n}、", "（{n}）")
+OPTION_LETTERS = "ABCDEFGH"
+
+# 题干素材（不含数字：题干中的 "空格+数字+点" 会被当成同行串联的多道题）
+_SUBJECTS = ("列车", "车站", "线路", "信号系统", "调度中心", "车辆段", "供电系统", "客运组织", "乘务作业", "区间")
+_TOPICS = ("制动距离", "通过能力", "运行阻力", "限制坡度", "折返作业", "客流组织", "行车间隔", "牵引计算", "应急预案", "运营指标")
+_TERMS = ("空走距离", "有效制动", "附加阻力", "追踪间隔", "闭塞分区", "牵引特性", "黏着系数", "断面客流", "满载率", "旅行速度")
+
+# WordprocessingML 最小包结构
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+_DOCUMENT_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+)
+_DOCUMENT_TAIL = "<w:sectPr/></w:body></w:document>"
+
+
+class GeneratedQuestion(NamedTuple):
+    """一道合成题目（真值）"""
+    number: int  # 卷面题号（全卷连续）
+    type: str
+    stem: str  # 不含题号的题干
+    options: Tuple[str, ...]
+    answer: str
+    struck: bool  # DOCX 中是否带删除线
+    lines: Tuple[str, ...]  # 卷面上的各行（含题号和选项行）
+
+
+class BankFiles(NamedTuple):
+    with_answers: Dict[str, Path]  # 格式 -> 路径
+    without_answers: Dict[str, Path]
+    truth: Path
+    questions: int
+    lines: int  # 含答案版本的行数
+
+
+class _TextWriter:
+    def __init__(self, path: Path):
+        self._file: TextIO = path.open("w", encoding="utf-8", newline="\n")
+
+    def write(self, text: str, strike: bool = False) -> None:
+        self._file.write(text)
+        self._file.write("\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _DocxWriter:
+    """逐段写出 word/document.xml，不在内存中构建文档树"""
+
+    def __init__(self, path: Path):
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _PACKAGE_RELS)
+        self._stream = self._zip.open("word/document.xml", "w", force_zip64=True)
+        self._stream.write(_DOCUMENT_HEAD.encode("utf-8"))
+
+    def write(self, text: str, strike: bool = False) -> None:
+        rpr = "<w:rPr><w:strike/></w:rPr>" if strike else ""
+        self._stream.write(
+            f'<w:p><w:r>{rpr}<w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'.encode("utf-8")
+        )
+
+    def close(self) -> None:
+        self._stream.write(_DOCUMENT_TAIL.encode("utf-8"))
+        self._stream.close()
+        self._zip.close()
+
+
+def _make_question(rng: random.Random, number: int, q_type: str, strike_ratio: float) -> GeneratedQuestion:
+    subject, topic, term = rng.choice(_SUBJECTS), rng.choice(_TOPICS), rng.choice(_TERMS)
+    options: Tuple[str, ...] = ()
+    option_lines: List[str] = []
+    if q_type == "judge":
+        stem = f"{subject}的{topic}主要取决于{term}（ ）"
+        answer = rng.choice("√×")
+    elif q_type == "choice":
+        count = rng.randint(4, len(OPTION_LETTERS))
+        options = tuple(rng.sample(_TERMS, min(count, len(_TERMS))))
+        multiple = rng.random() < 0.25
+        if multiple:
+            stem = f"下列属于{subject}{topic}影响因素的有（  ）。（多选）"
+            answer = "".join(sorted(rng.sample(OPTION_LETTERS[:len(options)], rng.randint(2, 3))))
+        else:
+            stem = f"{subject}的{topic}与下列哪一项直接相关？（  ）"
+            answer = rng.choice(OPTION_LETTERS[:len(options)])
+        per_line = rng.choice((1, 2, 4))
+        for start in range(0, len(options), per_line):
+            option_lines.append("    ".join(
+                f"{OPTION_LETTERS[i]}{rng.choice('.、')} {options[i]}"
+                for i in range(start, min(start + per_line, len(options)))
+            ))
+    elif q_type == "fill":
+        stem = f"{subject}的{topic}由基本部分和____组成。"
+        answer = term
+    else:
+        stem = f"简述{subject}{topic}的主要影响因素及提高措施。"
+        answer = f"{term}与{rng.choice(_TERMS)}是主要因素，应优化{rng.choice(_TOPICS)}"
+
+    head = NUMBER_STYLES[number % len(NUMBER_STYLES)].format(n=number) + stem
+    return GeneratedQuestion(
+        number=number,
+        type=q_type,
+        stem=stem,
+        options=options,
+        answer=answer,
+        struck=rng.random() < strike_ratio,
+        lines=(head, *option_lines),
+    )
+
+
+def iter_bank(size: int, seed: int = 0, strike_ratio: float = 0.0) -> Iterator[Tuple[str, str, List[GeneratedQuestion]]]:
+    """按章节产出 (题型, 章节标题, 本章题目)；size 道题在各题型间平均分配"""
+    rng = random.Random(seed)
+    number = 0
+    for index, (q_type, title) in enumerate(SECTIONS):
+        count = size // len(SECTIONS) + (1 if index < size % len(SECTIONS) else 0)
+        if not count:
+            continue
+        questions = []
+        for _ in range(count):
+            number += 1
+            questions.append(_make_question(rng, number, q_type, strike_ratio))
+        yield q_type, title, questions
+
+
+def _answer_lines(q_type: str, questions: Sequence[GeneratedQuestion]) -> List[str]:
+    """含答案版本的章节答案：客观题一行 "答案：1.A 2.B"，简答题 "答案要点：" 后逐题一行"""
+    if q_type == "short":
+        return ["答案要点："] + [f"{q.number}. {q.answer}" for q in questions]
+    return ["答案：" + " ".join(f"{q.number}.{q.answer}" for q in questions)]
+
+
+def generate_bank(
+    output_dir: Path | str,
+    size: int,
+    name: str = DEFAULT_NAME,
+    formats: Sequence[str] = SUPPORTED_FORMATS,
+    seed: int = 0,
+    strike_ratio: float = 0.0,
+) -> BankFiles:
+    """生成一对题库及真值文件
+
+    Args:
+        size: 题目总数
+        formats: 输出格式（"txt" / "docx"）
+        strike_ratio: DOCX 中带删除线的题目比例（TXT 无法表示删除线，照常写出）
+    """
+    unknown = set(formats) - set(SUPPORTED_FORMATS)
+    if unknown:
+        raise ValueError(f"Unsupported format: {', '.join(sorted(unknown))}")
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    with_paths = {fmt: output / f"{name}.{fmt}" for fmt in formats}
+    without_paths = {fmt: output / f"{name}{WITHOUT_ANSWERS_SUFFIX}.{fmt}" for fmt in formats}
+    truth_path = output / f"{name}{TRUTH_SUFFIX}"
+
+    writers = []
+    for fmt in formats:
+        writer_cls = _DocxWriter if fmt == "docx" else _TextWriter
+        writers.append((writer_cls(with_paths[fmt]), writer_cls(without_paths[fmt])))
+
+    total = lines = 0
+    with truth_path.open("w", encoding="utf-8") as truth:
+        truth.write("[")
+        try:
+            for q_type, title, questions in iter_bank(size, seed, strike_ratio):
+                for with_writer, without_writer in writers:
+                    with_writer.write(title)
+                    without_writer.write(title)
+                lines += 1
+                for q in questions:
+                    for with_writer, without_writer in writers:
+                        for line in q.lines:
+                            with_writer.write(line, q.struck)
+                            without_writer.write(line, q.struck)
+                    lines += len(q.lines)
+                    record = {
+                        "number": q.number,
+                        # 识别后的题目 id：删除线题目被过滤，但照常占用题号（答案按题号匹配）
+                        "id": None if q.struck else q.number,
+                        "type": q.type,
+                        "stem": q.stem,
+                        "options": list(q.options) or None,
+                        "answer": q.answer,
+                        "struck": q.struck,
+                    }
+                    truth.write(("," if total else "") + "\n" + json.dumps(record, ensure_ascii=False))
+                    total += 1
+                answer_lines = _answer_lines(q_type, questions)
+                for with_writer, _ in writers:
+                    for line in answer_lines:
+                        with_writer.write(line)
+                lines += len(answer_lines)
+            truth.write("\n]\n")
+        finally:
+            for with_writer, without_writer in writers:
+                with_writer.close()
+                without_writer.close()
+
+    return BankFiles(with_paths, without_paths, truth_path, total, lines)
+
+
+def load_truth(path: Path | str) -> List[Dict]:
+    with Path(path).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="生成合成题库（含答案/纯题干配对 + 真值 JSON）")
+    parser.add_argument("--size", type=int, default=1000, help="题目总数（默认: 1000）")
+    parser.add_argument("--output", default="data/synthetic", help="输出目录（默认: data/synthetic）")
+    parser.add_argument("--name", default=DEFAULT_NAME, help=f"题库文件名（默认: {DEFAULT_NAME}）")
+    parser.add_argument("--formats", nargs="+", choices=SUPPORTED_FORMATS, default=list(SUPPORTED_FORMATS))
+    parser.add_argument("--seed", type=int, default=0, help="随机种子，相同参数生成相同题库")
+    parser.add_argument("--strike-ratio", type=float, default=0.0, help="DOCX 中带删除线的题目比例")
+    args = parser.parse_args(argv)
+
+    files = generate_bank(args.output, args.size, args.name, args.formats, args.seed, args.strike_ratio)
+    for fmt in args.formats:
+        print(f"{files.with_answers[fmt]}\n{files.without_answers[fmt]}")
+    print(f"{files.truth}（{files.questions} 道题，{files.lines} 行）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""解析 → 识别 → 对齐 流水线的基准测试
+
+分阶段计时 parse_docx_file / parse_text_file / detect_questions / _detect_type / align_answers，
+以及题目表示（pydantic 模型与 QuestionRecord）的构造 + model_dump 往返，
+数据为 data/raw 下的真实题库和 bank_generator 按规模生成的题库（默认 1k / 10k / 100k 题），记录峰值内存，
+结果写入 JSON，可与另一次提交的结果对比并按阈值判定性能回退。
+
+    python -m benchmarks.bench_pipeline                           # 运行并写出 benchmarks/results/latest.json
+    python -m benchmarks.bench_pipeline --sizes 1000 --repeat 5
+    python -m benchmarks.bench_pipeline --baseline base.json --threshold 0.2   # 有回退时退出码为 1
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bank_generator import generate_bank
+from config import LOG_FORMAT
+from models.question import Question, QuestionRecord
+from parsers.docx_parser import parse_docx_file
+from parsers.text_parser import parse_text_file
+from recognizers.answer_aligner import align_answers
+from recognizers.question_detector import _detect_type, detect_questions
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+RAW_DIR = ROOT / "data" / "raw"
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "results" / "latest.json"
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_THRESHOLD = 0.2  # 比基线慢 20% 以上视为回退
+# 耗时过短的用例受计时噪声影响大，不参与回退判定
+MIN_COMPARABLE_SECONDS = 0.005
+
+# 真实题库的 含答案 / 纯题干 配对
+REAL_PAIRS = (
+    ("列车运行计算与设计复习题.docx", "列车运行计算与设计复习题（无答案）.docx"),
+    ("轨道交通运营管理复习题.docx", "轨道交通运营管理复习题（无答案）.docx"),
+    ("城轨交通企业管理复习题.docx", "城轨交通企业管理复习题.docx"),
+    ("复习题_带答案.txt", "复习题_纯题干.txt"),
+)
+
+
+def _time_call(func: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    """多次运行取最短耗时（最不受干扰的一次）"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _peak_memory(func: Callable[[], object]) -> int:
+    """单独运行一次，记录 tracemalloc 峰值（字节）；与计时分开，避免跟踪开销影响耗时"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(func: Callable[[], object], repeat: int, memory: bool = True, items: Optional[int] = None) -> Dict:
+    seconds, result = _time_call(func, repeat)
+    entry: Dict = {"seconds": round(seconds, 6)}
+    if items is None and isinstance(result, (list, tuple)):
+        items = len(result)
+    if items is not None:
+        entry["items"] = items
+    if memory:
+        entry["peak_kb"] = round(_peak_memory(func) / 1024, 1)
+    return entry
+
+
+def _detect_types(questions: List[Dict]) -> int:
+    for q in questions:
+        _detect_type(q["stem"], q["options"])
+    return len(questions)
+
+
+def _to_models(questions: List[Dict]) -> List[Dict]:
+    # 旧做法：逐题构造 pydantic 模型再 model_dump()
+    return [Question(**q).model_dump() for q in questions]
+
+
+def _to_records(questions: List[Dict]) -> List[Dict]:
+    return [QuestionRecord(**q).model_dump() for q in questions]
+
+
+def _bench_texts(name: str, with_text: str, without_text: str, repeat: int, memory: bool) -> Dict[str, Dict]:
+    """文本层面的各阶段：识别、题型判定、两份文本对齐、单份文本提取答案"""
+    results = {}
+    results[f"detect_questions[{name}]"] = measure(lambda: detect_questions(without_text), repeat, memory)
+    questions = detect_questions(without_text)
+    results[f"_detect_type[{name}]"] = measure(lambda: _detect_types(questions), repeat, memory, len(questions))
+    # 题目表示：pydantic 模型与 __slots__ 记录的 构造 + model_dump 往返
+    results[f"question_model[{name}]"] = measure(lambda: _to_models(questions), repeat, memory)
+    results[f"question_record[{name}]"] = measure(lambda: _to_records(questions), repeat, memory)
+    results[f"align_answers[{name}]"] = measure(lambda: align_answers(with_text, without_text), repeat, memory)
+    results[f"align_answers_same[{name}]"] = measure(lambda: align_answers(with_text, with_text), repeat, memory)
+    return results
+
+
+def bench_real_banks(raw_dir: Path, repeat: int, memory: bool) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    for with_name, without_name in REAL_PAIRS:
+        with_path, without_path = raw_dir / with_name, raw_dir / without_name
+        if not with_path.exists() or not without_path.exists():
+            logger.warning("Skipping missing bank: %s", with_name)
+            continue
+        if with_path.suffix == ".docx":
+            parse, stage = partial(parse_docx_file, use_cache=False), "parse_docx_file"
+        else:
+            parse, stage = parse_text_file, "parse_text_file"
+        results[f"{stage}[{with_name}]"] = measure(lambda: parse(str(with_path)), repeat, memory)
+        with_text = parse(str(with_path))
+        without_text = parse(str(without_path))
+        results.update(_bench_texts(with_name, with_text, without_text, repeat, memory))
+    return results
+
+
+def bench_synthetic(sizes: List[int], repeat: int, memory: bool, seed: int = 0) -> Dict[str, Dict]:
+    """用 bank_generator 生成各规模的 TXT/DOCX 题库对，分别计时两种解析器和后续各阶段"""
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory(prefix="autoreview-bench-") as tmp:
+        for size in sizes:
+            name = f"synthetic-{size}"
+            files = generate_bank(tmp, size, name=name, seed=seed)
+            for fmt, stage, parse in (
+                ("docx", "parse_docx_file", partial(parse_docx_file, use_cache=False)),
+                ("txt", "parse_text_file", parse_text_file),
+            ):
+                path = str(files.without_answers[fmt])
+                results[f"{stage}[{name}.{fmt}]"] = measure(lambda: parse(path), repeat, memory)
+            with_text = parse_text_file(str(files.with_answers["txt"]))
+            without_text = parse_text_file(str(files.without_answers["txt"]))
+            results.update(_bench_texts(name, with_text, without_text, repeat, memory))
+    return results
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_benchmarks(
+    sizes: List[int] = list(DEFAULT_SIZES),
+    repeat: int = 3,
+    memory: bool = True,
+    real: bool = True,
+    raw_dir: Path = RAW_DIR,
+) -> Dict:
+    results: Dict[str, Dict] = {}
+    if real:
+        results.update(bench_real_banks(raw_dir, repeat, memory))
+    results.update(bench_synthetic(sizes, repeat, memory))
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """逐用例与基线对比，返回耗时增幅超过 threshold 的用例（两边都有且足够长的用例才比较）"""
+    regressions = []
+    base_results = baseline.get("results", {})
+    for case, entry in current.get("results", {}).items():
+        base = base_results.get(case)
+        if not base:
+            continue
+        before, after = base["seconds"], entry["seconds"]
+        if max(before, after) < MIN_COMPARABLE_SECONDS:
+            continue
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold:
+            regressions.append({"case": case, "baseline": before, "current": after, "ratio": round(ratio, 3)})
+    return regressions
+
+
+def format_report(current: Dict, baseline: Optional[Dict] = None) -> str:
+    """格式化为逐用例的耗时/内存表，有基线时附带相对变化"""
+    base_results = (baseline or {}).get("results", {})
+    rows = [f"{'用例':<56}{'耗时(ms)':>12}{'峰值(KB)':>12}{'对比基线':>10}"]
+    for case, entry in current["results"].items():
+        peak = entry.get("peak_kb")
+        row = f"{case:<56}{entry['seconds'] * 1000:>12.2f}{peak if peak is not None else '-':>12}"
+        base = base_results.get(case)
+        if base and base["seconds"]:
+            row += f"{(entry['seconds'] / base['seconds'] - 1) * 100:>+9.1f}%"
+        rows.append(row)
+    return "\n".join(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="AutoReview 流水线基准测试")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DEFAULT_SIZES), help="合成题库的题数（默认: 1000 10000 100000）")
+    parser.add_argument("--repeat", type=int, default=3, help="每个用例运行次数，取最短耗时（默认: 3）")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="结果 JSON 路径（默认: benchmarks/results/latest.json）")
+    parser.add_argument("--baseline", help="与之对比的基线结果 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="回退阈值，耗时增幅比例（默认: 0.2）")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="不记录峰值内存（更快）")
+    parser.add_argument("--no-real", dest="real", action="store_false", help="跳过 data/raw 下的真实题库")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    current = run_benchmarks(args.sizes, args.repeat, args.memory, args.real)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+    print(format_report(current, baseline))
+    print(f"结果已写入 {output}")
+    if baseline is None:
+        return 0
+
+    regressions = compare_results(current, baseline, args.threshold)
+    for r in regressions:
+        print(f"性能回退: {r['case']} {r['baseline'] * 1000:.2f}ms → {r['current'] * 1000:.2f}ms (x{r['ratio']})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
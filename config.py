@@ -1,4 +1,5 @@
 import re
+from pathlib import Path
 from typing import Pattern
 
 QUESTION_START_PATTERN: Pattern[str] = re.compile(r"^\s*(?:[（(]?\s*\d+\s*[)）\.、]\s*)?(.*)")
@@ -42,3 +43,25 @@ SECTION_PATTERN: Pattern[str] = re.compile(r"^第[一二三四五六七八九十
 
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
 
+
+# 解析缓存：按文件内容哈希缓存解析结果；解析逻辑变更时递增版本号，使旧缓存自动失效
+PARSER_VERSION = "3"
+# 题目识别/答案对齐逻辑的版本：修改 recognizers 导致输出变化时递增，使 data/processed 下的产物重建
+DETECTOR_VERSION = "2"
+PARSE_CACHE_DIR = Path(__file__).resolve().parent / "data" / "cache"
+PARSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# DOCX 格式标记位：逐行格式表中每行一个字节
+FORMAT_BOLD = 1  # 加粗 = 重点
+FORMAT_STRIKE = 2  # 删除线 = 跳过此题
+FORMAT_UNDERLINE = 4  # 下划线 = 要点
+
+# 答题记录 / 错题本（storage.attempt_store）：写入按批落盘
+ATTEMPT_DB_PATH = Path(__file__).resolve().parent / "data" / "attempts.sqlite3"
+ATTEMPT_FLUSH_SIZE = 64  # 攒够这么多条立即写入
+ATTEMPT_FLUSH_INTERVAL = 0.5  # 秒，不足一批时最多等待这么久
+
+# 逐题统计（storage.question_stats）：内存中增量更新，定期写回 data/stats/<题库哈希>.qstats
+STATS_DIR = Path(__file__).resolve().parent / "data" / "stats"
+STATS_SAVE_INTERVAL = 5.0  # 秒，距上次写盘超过这么久时顺带写回
+STATS_MAX_ANSWER_SECONDS = 600.0  # 作答用时超过这么久视为离开了页面，不计入平均用时
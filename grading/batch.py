@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional
+
+from grading.evaluator import GradingKey, compile_key, grade
+
+logger = logging.getLogger(__name__)
+
+
+class Submission(NamedTuple):
+    """一份答卷：学生标识 + {题目 id: 作答}"""
+    student: str
+    answers: Mapping[int, Any]
+
+
+class SheetResult(NamedTuple):
+    """一份答卷的判分结果"""
+    student: str
+    correct: int  # 判对题数
+    graded: int  # 自动判分的题数（有标准答案的客观题）
+    answered: int  # 其中作答了的题数
+    results: Dict[int, bool]  # 题目 id -> 是否判对（只含自动判分的题）
+
+    @property
+    def score(self) -> float:
+        """得分率（0~1）"""
+        return self.correct / self.graded if self.graded else 0.0
+
+
+class AnswerKeySet:
+    """整份题库的判分依据（按题目 id），载入题库时整理一次，之后判任意多份答卷
+
+    不自动判分的题（简答、无标准答案）不在其中。
+    """
+
+    def __init__(self, questions: Iterable[Mapping[str, Any]]):
+        self.keys: Dict[int, GradingKey] = {}
+        self.question_count = 0
+        for q in questions:
+            self.question_count += 1
+            key = compile_key(q.get("type"), q.get("answer"), q.get("options"))
+            if key is not None:
+                # 题号重复时取第一道（与答案对齐按题号匹配的规则一致）
+                self.keys.setdefault(q["id"], key)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, question_id: int) -> bool:
+        return question_id in self.keys
+
+    def grade(self, question_id: int, answer: Any) -> Optional[bool]:
+        return grade(self.keys.get(question_id), answer)
+
+
+def grade_sheet(key_set: AnswerKeySet, submission: Submission) -> SheetResult:
+    """判一份答卷：逐题套用预先整理的判分依据，未作答记为错"""
+    answers = submission.answers
+    results: Dict[int, bool] = {}
+    correct = answered = 0
+    for question_id, key in key_set.keys.items():
+        answer = answers.get(question_id)
+        if answer is None or answer == "" or answer == []:
+            results[question_id] = False
+            continue
+        answered += 1
+        ok = bool(grade(key, answer))
+        results[question_id] = ok
+        correct += ok
+    return SheetResult(submission.student, correct, len(key_set.keys), answered, results)
+
+
+def grade_many(key_set: AnswerKeySet, submissions: Iterable[Submission]) -> Iterator[SheetResult]:
+    """依次判多份答卷（整场考试 / 导入的 CSV），逐份产出结果，不在内存中累积答卷"""
+    for submission in submissions:
+        yield grade_sheet(key_set, submission)
+
+
+class AccuracyTally:
+    """按题累计作答人数、判对人数（可逐份 / 逐批加入判分结果）"""
+
+    def __init__(self):
+        self._counts: Dict[int, List[int]] = {}
+        self.sheets = 0
+
+    def add(self, sheet: SheetResult) -> None:
+        self.sheets += 1
+        for question_id, ok in sheet.results.items():
+            counts = self._counts.setdefault(question_id, [0, 0])
+            counts[0] += 1
+            counts[1] += ok
+
+    def summary(self) -> Dict[int, Dict[str, float]]:
+        """题目 id -> {total, correct, accuracy}（按题目 id 排序）"""
+        return {
+            question_id: {"total": total, "correct": correct, "accuracy": correct / total if total else 0.0}
+            for question_id, (total, correct) in sorted(self._counts.items())
+        }
+
+
+def question_accuracy(results: Iterable[SheetResult]) -> Dict[int, Dict[str, float]]:
+    """按题统计：作答人数、判对人数、正确率"""
+    tally = AccuracyTally()
+    for sheet in results:
+        tally.add(sheet)
+    return tally.summary()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# 答案分隔符：分号、逗号、顿号、斜杠、空白
+_SEPARATOR_PATTERN = re.compile(r"[;，,、/\s]+")
+# 选项字母串（"B"、"ACD"）
+_LETTER_RUN_PATTERN = re.compile(r"^[a-h]+$")
+# 判断题的统一取值
+_JUDGE_VALUES = {
+    **dict.fromkeys(["正确", "对", "√", "t", "true", "yes"], "对"),
+    **dict.fromkeys(["错误", "错", "×", "f", "false", "no"], "错"),
+}
+# 判分方式（题型不在其中的不自动判分）
+GRADED_TYPES = ("choice", "multi", "judge", "fill")
+
+
+def normalize_tokens(text: Any) -> List[str]:
+    if not text:
+        return []
+    text = str(text).strip().strip("（）() ")
+    text = text.replace("；", ";").replace("，", ",")
+    parts = _SEPARATOR_PATTERN.split(text)
+    return [p.strip().lower() for p in parts if p.strip()]
+
+
+def _letters_to_options(letters: Iterable[str], options: Sequence[str]) -> List[str]:
+    mapped = []
+    for ch in letters:
+        idx = ord(ch.upper()) - ord("A")
+        if 0 <= idx < len(options):
+            mapped.append(options[idx].strip().lower())
+    return mapped
+
+
+class GradingKey(NamedTuple):
+    """一道题预先整理好的判分依据，载入题库时计算一次，之后每次判分不再分词/映射选项
+
+    - choice：targets 为正确选项（答案是单个选项字母时已换成选项文本），作答的第一项命中即对
+    - multi：targets 为正确选项集合，作答集合相等才对
+    - judge：targets 为统一后的 "对"/"错"（也保留原答案写法）
+    - fill：tokens 为答案各片段，作答包含全部片段即对
+    """
+    q_type: str
+    targets: FrozenSet[str]
+    tokens: Tuple[str, ...] = ()
+    # 选项字母 -> 选项文本（小写），用于把按字母作答的答卷换成选项
+    letters: Mapping[str, str] = {}
+
+
+def _option_letters(options: Optional[Sequence[str]]) -> Dict[str, str]:
+    return {chr(ord("a") + i): option.strip().lower() for i, option in enumerate(options or ())}
+
+
+def _expand_letters(tokens: List[str], letters: Mapping[str, str]) -> List[str]:
+    """作答中的选项字母（"b"、"acd"）换成选项文本；本身就是选项文本的保持不变"""
+    if not letters:
+        return tokens
+    option_texts = set(letters.values())
+    expanded: List[str] = []
+    for tok in tokens:
+        if tok not in option_texts and _LETTER_RUN_PATTERN.match(tok) and all(ch in letters for ch in tok):
+            expanded.extend(letters[ch] for ch in tok)
+        else:
+            expanded.append(tok)
+    return expanded
+
+
+def compile_key(q_type: Optional[str], correct_ans: Any, options: Optional[Sequence[str]] = None) -> Optional[GradingKey]:
+    """整理一道题的判分依据；无标准答案或该题型不自动判分时返回 None"""
+    correct_tokens = normalize_tokens(correct_ans)
+    if not correct_tokens or q_type not in GRADED_TYPES:
+        return None
+
+    if q_type in ("choice", "multi"):
+        letters = _option_letters(options)
+        # 答案是选项字母时换成对应的选项文本；多选题也认连写的 "ACD"，
+        # 单选题的连写字母不是合法答案，按原文比较（与逐题判分的旧实现一致，不会判对）
+        is_letters = all(
+            _LETTER_RUN_PATTERN.match(tok) and (q_type == "multi" or len(tok) == 1) for tok in correct_tokens
+        )
+        if options and is_letters:
+            targets = frozenset(_letters_to_options("".join(correct_tokens), options))
+        else:
+            targets = frozenset(correct_tokens)
+        return GradingKey(q_type, targets, letters=letters)
+
+    if q_type == "judge":
+        targets = set(correct_tokens)
+        targets.update(_JUDGE_VALUES[tok] for tok in correct_tokens if tok in _JUDGE_VALUES)
+        return GradingKey(q_type, frozenset(targets))
+
+    return GradingKey(q_type, frozenset(correct_tokens), tuple(correct_tokens))
+
+
+def grade(key: Optional[GradingKey], user_ans: Any) -> Optional[bool]:
+    """按预先整理的判分依据判一道题：True/False，不自动判分的题返回 None"""
+    if key is None:
+        return None
+    q_type = key.q_type
+
+    if q_type == "choice":
+        user_tokens = _expand_letters(normalize_tokens(user_ans), key.letters)
+        return bool(user_tokens) and user_tokens[0] in key.targets
+
+    if q_type == "judge":
+        user_tokens = normalize_tokens(user_ans)
+        # 统一映射：正确/对/√/T -> 对，错误/错/×/F -> 错
+        return bool(user_tokens) and _JUDGE_VALUES.get(user_tokens[0], user_tokens[0]) in key.targets
+
+    if q_type == "multi":
+        user_tokens = normalize_tokens(" ".join(user_ans) if isinstance(user_ans, list) else user_ans)
+        return set(_expand_letters(user_tokens, key.letters)) == key.targets
+
+    # fill：允许用户回答包含所有正确片段即可
+    joined = "".join(normalize_tokens(user_ans))
+    raw = str(user_ans)
+    return all(tok in joined or tok in raw for tok in key.tokens)
+
+
+def evaluate_answer(q_type: str, user_ans, correct_ans: str, options: list[str] | None = None):
+    """判一道题（单次调用；批量判分先 compile_key 再 grade，见 grading.batch）"""
+    return grade(compile_key(q_type, correct_ans, options), user_ans)
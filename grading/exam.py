@@ -0,0 +1,129 @@
+"""整场考试判分：题库 + 一批答卷文件 → 逐学生得分 + 逐题正确率
+
+题库的判分依据在每个进程中只整理一次；多个答卷文件分给进程池并行判分，
+按文件顺序逐个写出结果行，不必等全部判完。
+"""
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, TextIO
+
+from grading.batch import AccuracyTally, AnswerKeySet, SheetResult, grade_many
+from grading.submissions import iter_submissions, submission_files
+from storage.compact_store import iter_bank_file
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = ("file", "student", "correct", "graded", "answered", "score")
+
+# 进程池中每个子进程各自的判分依据（initializer 中整理一次，之后判该进程分到的全部文件）
+_worker_keys: Optional[AnswerKeySet] = None
+
+
+class GradedFile(NamedTuple):
+    """一个答卷文件的判分结果"""
+    path: str
+    sheets: List[SheetResult]
+    error: Optional[str] = None
+
+
+def load_key_set(bank_path: Path | str) -> AnswerKeySet:
+    """读取已生成的题库（JSON / JSON Lines / .qbank）并整理判分依据"""
+    return AnswerKeySet(iter_bank_file(bank_path))
+
+
+def _init_worker(bank_path: str) -> None:
+    global _worker_keys
+    _worker_keys = load_key_set(bank_path)
+
+
+def grade_file(path: str, key_set: Optional[AnswerKeySet] = None) -> GradedFile:
+    """判一个答卷文件（在子进程中运行时使用该进程的判分依据）"""
+    key_set = key_set if key_set is not None else _worker_keys
+    try:
+        return GradedFile(path, list(grade_many(key_set, iter_submissions(path))))
+    except (OSError, ValueError, KeyError) as exc:
+        logger.error("答卷文件 %s 判分失败: %s", path, exc)
+        return GradedFile(path, [], str(exc))
+
+
+def iter_graded_files(
+    bank_path: Path | str,
+    submissions: Path | str,
+    workers: Optional[int] = None,
+) -> Iterator[GradedFile]:
+    """逐个产出答卷文件的判分结果（按文件名顺序）
+
+    Args:
+        submissions: 答卷目录（其中全部 .csv / .jsonl）或单个答卷文件
+        workers: 进程数，None 为 CPU 核数；1 或只有一个文件时在当前进程中判分
+    """
+    files = [str(path) for path in submission_files(submissions)]
+    if workers == 1 or len(files) <= 1:
+        key_set = load_key_set(bank_path)
+        for path in files:
+            yield grade_file(path, key_set)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(bank_path),)) as pool:
+        yield from pool.map(grade_file, files)
+
+
+def run_exam(
+    bank_path: Path | str,
+    submissions: Path | str,
+    out: TextIO,
+    workers: Optional[int] = None,
+) -> Dict:
+    """判全部答卷：逐学生得分以 CSV 写到 out（每判完一个文件写出一批），返回汇总和逐题正确率"""
+    started = time.perf_counter()
+    writer = csv.writer(out)
+    writer.writerow(SCORE_COLUMNS)
+    tally = AccuracyTally()
+    files = 0
+    failed: List[Dict[str, str]] = []
+    score_total = 0.0
+    for graded in iter_graded_files(bank_path, submissions, workers):
+        files += 1
+        if graded.error is not None:
+            failed.append({"file": graded.path, "error": graded.error})
+        name = Path(graded.path).name
+        for sheet in graded.sheets:
+            writer.writerow((name, sheet.student, sheet.correct, sheet.graded, sheet.answered, f"{sheet.score:.4f}"))
+            tally.add(sheet)
+            score_total += sheet.score
+        out.flush()
+
+    return {
+        "bank": str(bank_path),
+        "files": files,
+        "failed": failed,
+        "students": tally.sheets,
+        "mean_score": round(score_total / tally.sheets, 4) if tally.sheets else 0.0,
+        "questions": tally.summary(),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def write_accuracy(summary: Dict, path: Path | str) -> None:
+    """把汇总（含逐题正确率）写成 JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def format_accuracy_report(summary: Dict, limit: Optional[int] = None) -> str:
+    """逐题正确率表（正确率低的在前，limit 限制行数）"""
+    questions = sorted(summary["questions"].items(), key=lambda item: (item[1]["accuracy"], item[0]))
+    rows = [f"{'题目':>6}{'作答':>8}{'判对':>8}{'正确率':>10}"]
+    for question_id, stats in questions[:limit]:
+        rows.append(f"{question_id:>6}{stats['total']:>8}{stats['correct']:>8}{stats['accuracy']:>10.1%}")
+    rows.append(
+        f"共 {summary['files']} 个答卷文件（失败 {len(summary['failed'])} 个），{summary['students']} 份答卷，"
+        f"平均得分率 {summary['mean_score']:.1%}，耗时 {summary['seconds']:.3f}s"
+    )
+    return "\n".join(rows)
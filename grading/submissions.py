@@ -0,0 +1,124 @@
+"""答卷导入：CSV / JSON Lines
+
+支持两种 CSV 布局（首行为表头，编码 UTF-8，可带 BOM）：
+- 宽表：student 列 + 每道题一列（列名为题目 id），每行一份答卷
+- 长表：student, question_id, answer 三列，每行一道题的作答
+
+JSON Lines 每行一份答卷：{"student": "...", "answers": {"题目 id": 作答}}，多选题的作答可以是列表。
+"""
+from __future__ import annotations
+
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from grading.batch import Submission
+
+logger = logging.getLogger(__name__)
+
+STUDENT_COLUMN = "student"
+LONG_COLUMNS = ("student", "question_id", "answer")
+SUBMISSION_SUFFIXES = (".csv", ".jsonl")
+
+
+def _question_id(column: str) -> Optional[int]:
+    try:
+        return int(column.strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _student(row: Dict[str, Optional[str]], line_no: int, path: Path) -> str:
+    # 列数不足的行，缺少的列为 None
+    student = row.get(STUDENT_COLUMN)
+    if student is None:
+        raise ValueError(f"答卷 CSV 第 {line_no} 行缺少 {STUDENT_COLUMN} 列: {path}")
+    return student.strip()
+
+
+def _iter_wide_rows(reader: "csv.DictReader", path: Path) -> Iterator[Submission]:
+    id_columns: List[tuple] = []
+    for column in reader.fieldnames or ():
+        if column == STUDENT_COLUMN:
+            continue
+        question_id = _question_id(column)
+        if question_id is None:
+            logger.warning("Ignoring non-question column %r in %s", column, path)
+            continue
+        id_columns.append((column, question_id))
+    for line_no, row in enumerate(reader, start=2):
+        answers = {question_id: row[column].strip() for column, question_id in id_columns if row.get(column)}
+        yield Submission(_student(row, line_no, path), answers)
+
+
+def _iter_long_rows(reader: "csv.DictReader", path: Path) -> Iterator[Submission]:
+    # 同一学生的作答不一定相邻，按学生归并后再产出（保持首次出现的顺序）
+    sheets: Dict[str, Dict[int, str]] = {}
+    for line_no, row in enumerate(reader, start=2):
+        question_id = _question_id(row["question_id"])
+        if question_id is None:
+            logger.warning("Skipping row %d in %s: invalid question_id %r", line_no, path, row["question_id"])
+            continue
+        sheets.setdefault(_student(row, line_no, path), {})[question_id] = (row["answer"] or "").strip()
+    for student, answers in sheets.items():
+        yield Submission(student, answers)
+
+
+def iter_csv_submissions(path: Path | str) -> Iterator[Submission]:
+    """逐份读取 CSV 中的答卷（自动识别宽表 / 长表）"""
+    path = Path(path)
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        columns = [c.strip() for c in reader.fieldnames or ()]
+        reader.fieldnames = columns
+        if STUDENT_COLUMN not in columns:
+            raise ValueError(f"答卷 CSV 缺少 {STUDENT_COLUMN} 列: {path}")
+        rows = _iter_long_rows if set(LONG_COLUMNS) <= set(columns) else _iter_wide_rows
+        yield from rows(reader, path)
+
+
+def iter_jsonl_submissions(path: Path | str) -> Iterator[Submission]:
+    """逐行读取 JSON Lines 中的答卷"""
+    path = Path(path)
+    with path.open(encoding="utf-8-sig") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f"答卷 JSON Lines 第 {line_no} 行不是合法的 JSON: {path}（{exc}）") from exc
+            if not isinstance(record, dict) or "student" not in record:
+                raise ValueError(f"答卷 JSON Lines 第 {line_no} 行应为含 student 的对象: {path}")
+            sheet = record.get("answers") or {}
+            if not isinstance(sheet, dict):
+                raise ValueError(f"答卷 JSON Lines 第 {line_no} 行的 answers 应为对象: {path}")
+            answers: Dict[int, object] = {}
+            for column, answer in sheet.items():
+                question_id = _question_id(column)
+                if question_id is None:
+                    logger.warning("Ignoring invalid question id %r on line %d of %s", column, line_no, path)
+                    continue
+                answers[question_id] = answer
+            yield Submission(str(record["student"]).strip(), answers)
+
+
+def iter_submissions(path: Path | str) -> Iterator[Submission]:
+    """按扩展名读取一个答卷文件（.csv / .jsonl）"""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return iter_csv_submissions(path)
+    if suffix == ".jsonl":
+        return iter_jsonl_submissions(path)
+    raise ValueError(f"不支持的答卷文件格式: {path}（支持 {', '.join(SUBMISSION_SUFFIXES)}）")
+
+
+def submission_files(path: Path | str) -> List[Path]:
+    """答卷文件列表：目录下全部 .csv / .jsonl（按文件名排序），或单个文件本身"""
+    path = Path(path)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.is_file() and p.suffix.lower() in SUBMISSION_SUFFIXES)
+    return [path]
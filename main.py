@@ -1,30 +1,85 @@
 import argparse
-import json
+import contextlib
 import logging
 import subprocess
 import sys
 from pathlib import Path
-from typing import Optional
 
+import profiling
 from config import LOG_FORMAT
-from parsers.docx_parser import parse_docx_file
-from parsers.text_parser import parse_text_file
+from grading.exam import format_accuracy_report, run_exam, write_accuracy
+from parsers.loader import load_document
+from pipeline.batch import format_batch_report, run_batch
+from pipeline.exporter import EXPORT_FORMATS, export_label, export_questions, output_path_for
+from pipeline.manifest import BuildManifest, input_digests
 from recognizers.answer_aligner import align_answers
 
 logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
 
-def load_file(path: Optional[str]) -> Optional[str]:
-    if not path:
-        return None
-    suffix = Path(path).suffix.lower()
-    if suffix == ".txt":
-        return parse_text_file(path)
-    if suffix == ".docx":
-        return parse_docx_file(path)
-    logger.error("Unsupported file type: %s", suffix)
-    return None
+def _build_batch(args) -> None:
+    logger.info("批量处理目录: %s -> %s", args.batch, args.batch_output)
+    summary = run_batch(
+        args.batch, args.batch_output, args.workers, use_cache=not args.no_cache, force=args.force,
+        export_format=args.export_format, compact=args.compact,
+    )
+    logger.info("批量处理完成:\n%s", format_batch_report(summary))
+
+
+def _grade_exam(args) -> None:
+    """grade 子命令：按题库判全部答卷，逐学生得分写到 CSV（默认标准输出），逐题正确率写到日志"""
+    logger.info("判分: 题库 %s，答卷 %s", args.bank, args.submissions)
+    if args.scores:
+        Path(args.scores).parent.mkdir(parents=True, exist_ok=True)
+        output = open(args.scores, "w", encoding="utf-8-sig", newline="")
+    else:
+        output = contextlib.nullcontext(sys.stdout)
+    with output as out:
+        summary = run_exam(args.bank, args.submissions, out, args.workers)
+    if args.accuracy:
+        write_accuracy(summary, args.accuracy)
+        logger.info("逐题正确率已写入 %s", args.accuracy)
+    logger.info("判分完成（正确率最低的 %d 题）:\n%s", args.top, format_accuracy_report(summary, args.top))
+
+
+def _build_single(args) -> bool:
+    """构建单个题库；输入无法加载时返回 False"""
+    logger.info("输入文件（含答案）: %s", args.with_answers)
+    logger.info("输入文件（纯题干）: %s", args.without_answers)
+    output_path = output_path_for(args.output, args.export_format)
+    if output_path != Path(args.output):
+        logger.warning("输出路径的扩展名与导出格式 %s 不符，改为写入 %s", args.export_format, output_path)
+    logger.info("输出路径: %s", output_path)
+
+    manifest = BuildManifest(output_path.parent)
+    inputs = input_digests([args.with_answers, args.without_answers])
+    export = export_label(args.export_format, args.compact)
+    if not args.force and manifest.is_fresh(output_path.name, inputs, export):
+        logger.info("✓ 输入文件与代码版本均未变化，跳过重建（%d 道题目）: %s",
+                    manifest.entry(output_path.name)["questions"], output_path)
+    else:
+        use_cache = not args.no_cache
+        without_doc = load_document(args.without_answers, use_cache)
+        if without_doc is None:
+            logger.error("无法加载纯题干文件: %s（请检查路径或在 data/raw/ 下创建示例文件）", args.without_answers)
+            return False
+
+        with_doc = load_document(args.with_answers, use_cache)
+        if with_doc is None:
+            logger.warning("未找到含答案文件，将仅使用纯题干文件提取题目（答案字段为空）")
+        questions = align_answers(
+            with_doc.text if with_doc else None,
+            without_doc.text,
+            without_doc.line_formats,
+        )
+
+        with profiling.stage(f"export.{args.export_format}"):
+            export_questions(questions, output_path, args.export_format, args.compact)
+        manifest.record(output_path.name, inputs, len(questions), export)
+        manifest.save()
+        logger.info("✓ 成功导出 %d 道题目到 %s", len(questions), output_path)
+    return True
 
 
 def main():
@@ -36,6 +91,10 @@ def main():
   python main.py                              # 使用默认路径
   python main.py --without-answers my.txt     # 仅指定题干文件
   python main.py --with-answers qa.txt --without-answers q.txt --output out.json
+  python main.py --batch data/raw --workers 4   # 批量重建目录下全部题库
+  python main.py --output out.jsonl --format jsonl --no-ui   # 导出为 JSON Lines
+  python main.py --profile --no-cache --force --no-ui   # 输出各阶段耗时表
+  python main.py grade data/processed/questions.json answers/ --scores scores.csv   # 批量判分
         """
     )
     parser.add_argument(
@@ -54,7 +113,58 @@ def main():
         "--output",
         dest="output",
         default="./data/processed/questions.json",
-        help="输出 JSON 路径（默认: data/processed/questions.json）"
+        help="输出路径，扩展名按 --format 修正为 .json / .jsonl / .qbank（默认: data/processed/questions.json）"
+    )
+    parser.add_argument(
+        "--format",
+        dest="export_format",
+        choices=EXPORT_FORMATS,
+        default="json",
+        help="导出格式：json 为 JSON 数组，jsonl 为每行一道题，qbank 为界面可快速加载的紧凑题库（默认: json）"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="紧凑输出，不缩进（文件更小）"
+    )
+    parser.add_argument(
+        "--batch",
+        dest="batch",
+        metavar="DIR",
+        help="批量模式：自动配对目录下的 X.docx 与 X（无答案）.docx，并行处理全部题库"
+    )
+    parser.add_argument(
+        "--batch-output",
+        dest="batch_output",
+        default="./data/processed",
+        help="批量模式的输出目录，每个题库一个 JSON（默认: data/processed）"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="批量模式的进程数（默认: CPU 核数）"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="忽略解析缓存（data/cache），强制重新解析输入文件"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="忽略构建清单（data/processed/manifest.json），即使输入未变也重新生成"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="统计各阶段（读取/解析/行分类/题型判定/答案提取/匹配/导出）的耗时、调用次数和内存分配并打印"
+    )
+    parser.add_argument(
+        "--profile-output",
+        dest="profile_output",
+        metavar="FILE",
+        help="同时运行 cProfile 并把 pstats 写到 FILE（隐含 --profile）"
     )
     parser.add_argument(
         "--no-ui",
@@ -62,26 +172,44 @@ def main():
         help="仅导出 JSON，不启动 Streamlit 界面（默认会自动启动）"
     )
 
+    commands = parser.add_subparsers(dest="command", metavar="grade")
+    grade = commands.add_parser(
+        "grade",
+        help="按已生成的题库批量判分（选择/多选/判断/填空），输出逐学生得分和逐题正确率",
+        description="按已生成的题库批量判分：答卷为 CSV（宽表或 student,question_id,answer 长表）或 JSON Lines",
+    )
+    grade.add_argument("bank", help="题库文件（JSON / JSON Lines / .qbank）")
+    grade.add_argument("submissions", help="答卷目录（其中全部 .csv / .jsonl）或单个答卷文件")
+    grade.add_argument("--scores", metavar="FILE", help="逐学生得分 CSV 的输出路径（默认: 标准输出）")
+    grade.add_argument("--accuracy", metavar="FILE", help="同时把汇总和逐题正确率写成 JSON")
+    grade.add_argument("--top", type=int, default=20, help="日志中列出正确率最低的题数（默认: 20）")
+    grade.add_argument("--workers", type=int, default=None, help="并行判分的进程数（默认: CPU 核数）")
+
     args = parser.parse_args()
+    if args.command == "grade":
+        _grade_exam(args)
+        return
 
-    logger.info("输入文件（含答案）: %s", args.with_answers)
-    logger.info("输入文件（纯题干）: %s", args.without_answers)
-    logger.info("输出路径: %s", args.output)
+    profile = args.profile or bool(args.profile_output)
+    if profile and args.batch and args.workers != 1:
+        logger.info("--profile 模式下批量处理在当前进程中顺序执行，以便统计各阶段耗时")
+        args.workers = 1
 
-    without_text = load_file(args.without_answers)
-    if without_text is None:
-        logger.error("无法加载纯题干文件: %s（请检查路径或在 data/raw/ 下创建示例文件）", args.without_answers)
-        return
+    with profiling.profile_run(args.profile_output) if profile else contextlib.nullcontext():
+        if args.batch:
+            _build_batch(args)
+            built = False
+        else:
+            built = _build_single(args)
 
-    with_text = load_file(args.with_answers)
-    if with_text is None:
-        logger.warning("未找到含答案文件，将仅使用纯题干文件提取题目（答案字段为空）")
-    questions = align_answers(with_text, without_text)
+    if profile:
+        logger.info("各阶段耗时（缓存命中或跳过重建的阶段不会出现，可配合 --no-cache --force）:\n%s",
+                    profiling.format_report())
+        if args.profile_output:
+            logger.info("cProfile 结果已写入 %s（python -m pstats %s）", args.profile_output, args.profile_output)
 
-    output_path = Path(args.output)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps([q.model_dump() for q in questions], ensure_ascii=False, indent=2), encoding="utf-8")
-    logger.info("✓ 成功导出 %d 道题目到 %s", len(questions), output_path)
+    if not built:
+        return
     logger.info("运行 Streamlit 查看: streamlit run ui/streamlit_app.py")
 
     if not args.no_ui:
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel
 
 class Question(BaseModel):
@@ -7,3 +7,58 @@ class Question(BaseModel):
     stem: str
     options: Optional[List[str]] = None
     answer: Optional[str] = None
+
+
+class QuestionRecord:
+    """流水线内部使用的轻量题目记录（字段与 Question 相同，不做校验）
+
+    识别得到的字段类型已经确定，逐题构造 pydantic 模型只是重复校验；
+    流水线内部用带 __slots__ 的记录，需要校验时（对外接口）再 to_model()。
+    """
+
+    __slots__ = ("id", "type", "stem", "options", "answer")
+
+    def __init__(
+        self,
+        id: int,
+        type: str,
+        stem: str,
+        options: Optional[List[str]] = None,
+        answer: Optional[str] = None,
+    ):
+        self.id = id
+        self.type = type
+        self.stem = stem
+        self.options = options
+        self.answer = answer
+
+    def model_dump(self) -> Dict[str, Any]:
+        """与 Question.model_dump() 相同的 dict（键顺序一致）"""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "stem": self.stem,
+            "options": self.options,
+            "answer": self.answer,
+        }
+
+    def to_model(self) -> Question:
+        """校验并转换为 pydantic 模型"""
+        return Question.model_validate(self.model_dump())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QuestionRecord):
+            return NotImplemented
+        return self.model_dump() == other.model_dump()
+
+    def __repr__(self) -> str:
+        return f"QuestionRecord(id={self.id!r}, type={self.type!r}, stem={self.stem!r}, answer={self.answer!r})"
+
+
+# 对齐/导出函数同时接受两种表示
+QuestionLike = Union[Question, QuestionRecord]
+
+
+def question_dict(question: Union[QuestionLike, Dict[str, Any]]) -> Dict[str, Any]:
+    """题目的 dict 表示：Question / QuestionRecord 取 model_dump()，已经是 dict 的原样返回"""
+    return question.model_dump() if isinstance(question, (Question, QuestionRecord)) else question
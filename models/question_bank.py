@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from models.type_index import TYPE_PRIORITY, TypeIndex, ordered_types
+
+__all__ = ["QuestionBank", "TYPE_PRIORITY"]
+
+
+class QuestionBank:
+    """只读的题库句柄：包装题目列表或紧凑题库，以及题型索引
+
+    各会话共享同一个 QuestionBank 对象，每次重绘只按下标读取当前题目，不再扫描整个题库。
+    按题型排序、只练某一题型都是共享同一份题目的视图（只保存下标顺序），不复制题目、不修改题号；
+    视图在第一次使用时建立并缓存在题库上。
+    紧凑题库的题型和各题型题数直接取自其元数据，题型索引到第一次按题型跳转/筛选时才建立，
+    打开题库的耗时与题数无关。
+    """
+
+    def __init__(
+        self,
+        questions: Sequence[Dict[str, Any]],
+        type_index: Optional[TypeIndex] = None,
+        order: Optional[Sequence[int]] = None,
+        renumber: bool = False,
+        key: Optional[str] = None,
+    ):
+        """
+        Args:
+            key: 题库的稳定标识（输入文件内容的哈希），答题记录和错题本按它区分题库
+            type_index: 识别时建立的题型索引；省略时在第一次用到时扫描一遍题型建立
+            order: 视图的下标顺序（None 为原顺序），此时 type_index 是视图坐标下的索引
+            renumber: 视图内按位置重新编号显示（按题型排序时使用）
+        """
+        self._questions = questions
+        self.key = key
+        self._order = order
+        self._renumber = renumber
+        self._index = type_index
+        self._views: Dict[Optional[str], "QuestionBank"] = {}
+        self._positions_by_id: Optional[Dict[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._questions) if self._order is None else len(self._order)
+
+    def get(self, index: int) -> Dict[str, Any]:
+        return self._questions[index if self._order is None else self._order[index]]
+
+    __getitem__ = get
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self._order is None:
+            return iter(self._questions)
+        return (self._questions[i] for i in self._order)
+
+    def number(self, index: int) -> int:
+        """第 index 题显示的题号：重新编号的视图按位置编号，否则为题目本身的 id"""
+        return index + 1 if self._renumber else self.get(index)["id"]
+
+    @property
+    def type_index(self) -> TypeIndex:
+        if self._index is None:
+            if hasattr(self._questions, "iter_types"):
+                types = self._questions.iter_types()  # 紧凑题库：只读题型列
+            else:
+                types = (q.get("type") for q in self._questions)
+            self._index = TypeIndex.from_types(types)
+        return self._index
+
+    def _stored_counts(self) -> Optional[Dict[str, int]]:
+        """紧凑题库元数据中的各题型题数（只对整个题库有效，视图和普通列表为 None）"""
+        if self._index is None and self._order is None and hasattr(self._questions, "type_counts"):
+            return self._questions.type_counts()
+        return None
+
+    @property
+    def available_types(self) -> List[str]:
+        """题库中出现的题型（按 TYPE_PRIORITY 排序）"""
+        counts = self._stored_counts()
+        return ordered_types(counts) if counts is not None else self.type_index.types
+
+    def indices_of(self, q_type: str) -> Sequence[int]:
+        """该题型全部题目的下标（升序）"""
+        return self.type_index.positions(q_type)
+
+    def first_index(self, q_type: str) -> Optional[int]:
+        return self.type_index.first(q_type)
+
+    def type_counts(self) -> Dict[str, int]:
+        counts = self._stored_counts()
+        if counts is not None:
+            return {t: counts[t] for t in ordered_types(counts)}
+        return self.type_index.counts()
+
+    def position_of_id(self, question_id: int) -> Optional[int]:
+        """题目 id 对应的下标（题号重复时取第一道）；id 表在第一次使用时建立并缓存"""
+        if self._positions_by_id is None:
+            if hasattr(self._questions, "iter_ids"):
+                ids = self._questions.iter_ids()  # 紧凑题库：只读 id 列
+            else:
+                ids = (q["id"] for q in self._questions)
+            positions: Dict[int, int] = {}
+            for position, qid in enumerate(ids):
+                positions.setdefault(qid, position)
+            if self._order is not None:
+                view_positions = {base: index for index, base in enumerate(self._order)}
+                positions = {qid: view_positions[base] for qid, base in positions.items() if base in view_positions}
+            self._positions_by_id = positions
+        return self._positions_by_id.get(question_id)
+
+    def _base_position(self, index: int) -> int:
+        return index if self._order is None else self._order[index]
+
+    def sorted_by_type(self) -> "QuestionBank":
+        """按题型排列的视图（同题型保持原顺序，按位置重新编号）"""
+        view = self._views.get(None)
+        if view is None:
+            index = self.type_index
+            order = index.sorted_order()
+            positions: Dict[Optional[str], Sequence[int]] = {}
+            start = 0
+            for q_type in index.types:
+                count = index.count(q_type)
+                positions[q_type] = range(start, start + count)
+                start += count
+            view = QuestionBank(
+                self._questions,
+                TypeIndex(positions),
+                [self._base_position(i) for i in order],
+                renumber=True,
+                key=self.key,
+            )
+            self._views[None] = view
+        return view
+
+    def only_type(self, q_type: str) -> "QuestionBank":
+        """只含某一题型的视图（保持原题号）"""
+        view = self._views.get(q_type)
+        if view is None:
+            positions = self.type_index.positions(q_type)
+            view = QuestionBank(
+                self._questions,
+                TypeIndex({q_type: range(len(positions))}),
+                [self._base_position(i) for i in positions],
+                key=self.key,
+            )
+            self._views[q_type] = view
+        return view
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# 题型的展示/排序顺序：填空 → 判断 → 选择 → 简答 → 综合应用 → 案例分析；其余题型排在后面
+TYPE_PRIORITY = ("fill", "judge", "choice", "short", "comprehensive", "case")
+
+
+def ordered_types(types: Iterable[Optional[str]]) -> List[str]:
+    """题型的展示顺序：TYPE_PRIORITY 中的依次排列，自定义题型按名称排在后面（无题型的不列出）"""
+    present = set(types)
+    ordered = [t for t in TYPE_PRIORITY if t in present]
+    ordered.extend(sorted(t for t in present if t and t not in TYPE_PRIORITY))
+    return ordered
+
+
+class TypeIndex:
+    """按题型的题目位置索引：每种题型的下标列表（升序），识别题目时顺带建立
+
+    下标是题目在题目列表中的位置（不是题号），据此可以 O(1) 跳到某题型的第一题、
+    得到某题型的题数，以及不排序、不改题号地得到按题型排列的顺序。
+    """
+
+    def __init__(self, positions: Optional[Dict[Optional[str], Sequence[int]]] = None):
+        # 题型 -> 下标序列；None 键收集没有题型的题目
+        self._positions: Dict[Optional[str], Sequence[int]] = positions if positions is not None else {}
+
+    @classmethod
+    def from_types(cls, types: Iterable[Optional[str]]) -> "TypeIndex":
+        index = cls()
+        for position, q_type in enumerate(types):
+            index.add(q_type, position)
+        return index
+
+    def prefix(self, count: int) -> "TypeIndex":
+        """只含前 count 道题的索引（后台识别仍在追加时，为已发布的题目取快照）"""
+        positions: Dict[Optional[str], Sequence[int]] = {}
+        for q_type, indices in list(self._positions.items()):
+            end = bisect_left(indices, count)
+            if end:
+                positions[q_type] = indices[:end]
+        return TypeIndex(positions)
+
+    def add(self, q_type: Optional[str], position: int) -> None:
+        self._positions.setdefault(q_type or None, []).append(position)
+
+    @property
+    def types(self) -> List[str]:
+        """出现过的题型（按 TYPE_PRIORITY，自定义题型按名称排在后面）"""
+        return ordered_types(self._positions)
+
+    def positions(self, q_type: Optional[str]) -> Sequence[int]:
+        return self._positions.get(q_type, [])
+
+    def first(self, q_type: Optional[str]) -> Optional[int]:
+        positions = self._positions.get(q_type)
+        return positions[0] if positions else None
+
+    def count(self, q_type: Optional[str]) -> int:
+        return len(self._positions.get(q_type, ()))
+
+    def counts(self) -> Dict[str, int]:
+        return {t: len(self._positions[t]) for t in self.types}
+
+    def sorted_order(self) -> List[int]:
+        """按题型排列的下标顺序（同题型保持原顺序）
+
+        TYPE_PRIORITY 中的题型依次排列，其余题型（含无题型）按原顺序排在最后，
+        与按 TYPE_PRIORITY 做稳定排序的结果一致，但只需拼接各题型的下标列表。
+        """
+        order: List[int] = []
+        for q_type in TYPE_PRIORITY:
+            order.extend(self._positions.get(q_type, ()))
+        rest = [positions for t, positions in self._positions.items() if t not in TYPE_PRIORITY]
+        if len(rest) == 1:
+            order.extend(rest[0])
+        elif rest:
+            order.extend(sorted(p for positions in rest for p in positions))
+        return order
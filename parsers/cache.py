@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from config import PARSE_CACHE_DIR, PARSE_CACHE_MAX_BYTES, PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def content_digest(data: bytes) -> str:
+    """计算文件内容的哈希（缓存键的主体部分）"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: Path | str, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件内容的哈希（与 content_digest(文件内容) 相同，不把整个文件读入内存）"""
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """磁盘上的解析结果缓存
+
+    - 缓存键 = 文件内容哈希 + 结果类型 + 解析器版本，文件未变且解析器未升级时直接命中
+    - 每个条目是一个 JSON 文件，命中时刷新 mtime，超出容量时按 mtime 淘汰最久未用的条目（LRU）
+    """
+
+    def __init__(self, root: Path | str = PARSE_CACHE_DIR, max_bytes: int = PARSE_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, digest: str, kind: str) -> Path:
+        return self.root / f"{digest}-{kind}-v{PARSER_VERSION}.json"
+
+    def get(self, digest: str, kind: str) -> Optional[Any]:
+        entry = self._entry_path(digest, kind)
+        try:
+            value = json.loads(entry.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Dropping unreadable cache entry %s: %s", entry.name, exc)
+            entry.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(entry)  # 刷新最近使用时间
+        except OSError:
+            pass
+        return value
+
+    def put(self, digest: str, kind: str, value: Any) -> None:
+        entry = self._entry_path(digest, kind)
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = entry.with_suffix(".tmp")
+            tmp.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, entry)
+        except OSError as exc:
+            logger.warning("Failed to write cache entry %s: %s", entry.name, exc)
+            return
+        self._evict()
+
+    def invalidate(self, path: Optional[str] = None) -> int:
+        """删除缓存条目
+
+        Args:
+            path: 指定文件时只删除该文件内容对应的条目；为 None 时清空全部缓存
+
+        Returns:
+            删除的条目数
+        """
+        if path is None:
+            pattern = "*.json"
+        else:
+            try:
+                pattern = f"{content_digest(Path(path).read_bytes())}-*.json"
+            except OSError as exc:
+                logger.warning("Cannot invalidate cache for %s: %s", path, exc)
+                return 0
+        removed = 0
+        for entry in self.root.glob(pattern):
+            entry.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for entry in self.root.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort(key=lambda item: item[0])
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            logger.debug("Evicted cache entry %s", entry.name)
+
+
+_default_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    """获取全局默认缓存（目录与容量见 config）"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache()
+    return _default_cache
+
+
+def invalidate_parse_cache(path: Optional[str] = None) -> int:
+    """使默认缓存中某个文件（或全部）的解析结果失效"""
+    return get_parse_cache().invalidate(path)
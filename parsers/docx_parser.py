@@ -1,13 +1,47 @@
-from pathlib import Path
-from typing import Optional, Dict, Any
+from io import BytesIO
+from typing import Optional, Dict, Any, BinaryIO, Iterable, Iterator, List, NamedTuple, Tuple, Union
 import logging
+import re
+import zipfile
 
 from docx import Document
 from docx.oxml import parse_xml
 from docx.oxml.ns import qn
+from lxml import etree
+
+import profiling
+from config import FORMAT_BOLD, FORMAT_STRIKE, FORMAT_UNDERLINE
+from parsers.cache import content_digest, get_parse_cache
+from parsers.source import DocumentSource, read_source_bytes, source_name
 
 logger = logging.getLogger(__name__)
 
+# 快速路径直接读取 WordprocessingML，使用带命名空间的标签名比较
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_BODY = _W + "body"
+_P = _W + "p"
+_PPR = _W + "pPr"
+_NUM_PR = _W + "numPr"
+_ILVL = _W + "ilvl"
+_NUM_ID = _W + "numId"
+_R = _W + "r"
+_RPR = _W + "rPr"
+_B = _W + "b"
+_STRIKE = _W + "strike"
+_U = _W + "u"
+_VAL = _W + "val"
+_HYPERLINK = _W + "hyperlink"
+_T = _W + "t"
+_TAB = _W + "tab"
+_PTAB = _W + "ptab"
+_BR = _W + "br"
+_BR_TYPE = _W + "type"
+_CR = _W + "cr"
+_NO_BREAK_HYPHEN = _W + "noBreakHyphen"
+
+_SAFE_XML_PARSER = etree.XMLParser(resolve_entities=False)
+_LEADING_NUMBER_PATTERN = re.compile(r"^(\d+)")
+
 
 class FormattedParagraph:
     """表示带格式信息的段落"""
@@ -18,6 +52,13 @@ class FormattedParagraph:
         self.is_underline = is_underline  # 下划线 = 要点
 
 
+class ParsedDocument(NamedTuple):
+    """一次解析得到的正文与逐行格式表"""
+    text: str
+    # 第 i 个字节是 text.splitlines()[i] 的格式位（FORMAT_BOLD / FORMAT_STRIKE / FORMAT_UNDERLINE）
+    line_formats: bytes
+
+
 def _get_paragraph_number(para) -> str:
     """获取段落的编号（处理Word自动编号）"""
     try:
@@ -44,95 +85,259 @@ def _get_paragraph_number(para) -> str:
         return ""
 
 
-def parse_docx_file(path: str) -> Optional[str]:
+def _python_docx_flags(para) -> int:
+    """python-docx 回退路径：段落中任意 run 带格式即视为整段带格式"""
+    flags = 0
+    for run in para.runs:
+        if run.bold:
+            flags |= FORMAT_BOLD
+        if run.font.strike:
+            flags |= FORMAT_STRIKE
+        if run.underline:
+            flags |= FORMAT_UNDERLINE
+    return flags
+
+
+def parse_docx_with_format(source: DocumentSource, use_cache: bool = True) -> Optional[ParsedDocument]:
+    """解析DOCX文件，一次遍历同时得到纯文本和逐行格式表
+
+    格式表可直接作为 detect_questions 的 format_info 传入。
+    use_cache 为 True 时按文件内容哈希查询磁盘缓存，未变更的文件不再重新解析。
+
+    Args:
+        source: 文件路径、字节串或二进制文件对象（上传的文件可直接传入，无需落盘）
+    """
+    data = read_source_bytes(source, "DOCX file")
+    if data is None:
+        return None
+    path = source_name(source)
+
+    cache = get_parse_cache() if use_cache else None
+    digest = content_digest(data) if cache else ""
+    if cache:
+        cached = cache.get(digest, "docx")
+        if cached is not None:
+            return ParsedDocument(cached[0], bytes.fromhex(cached[1]))
+
+    document = _parse_docx_document(data, path)
+    if cache and document is not None:
+        cache.put(digest, "docx", [document.text, document.line_formats.hex()])
+    return document
+
+
+def parse_docx_file(source: DocumentSource, use_cache: bool = True) -> Optional[str]:
     """解析DOCX文件，返回纯文本（尝试提取自动编号）"""
-    file_path = Path(path)
-    if not file_path.exists():
-        logger.error("DOCX file not found: %s", path)
+    document = parse_docx_with_format(source, use_cache=use_cache)
+    return document.text if document is not None else None
+
+
+def parse_docx_file_with_format(source: DocumentSource, use_cache: bool = True) -> Optional[list[FormattedParagraph]]:
+    """解析DOCX文件，保留格式信息（加粗/删除线/下划线）"""
+    data = read_source_bytes(source, "DOCX file")
+    if data is None:
         return None
-    try:
-        doc = Document(str(file_path))
-        lines = []
-        num_counter = 0  # 编号计数器
-        
-        for para in doc.paragraphs:
-            if not para.text.strip():
-                continue
-            
-            text = para.text
-            num_marker = _get_paragraph_number(para)
-            
-            # 如果检测到编号段落但文本中没有数字开头，添加编号
-            if num_marker == "[NUM]" and not text.strip()[0].isdigit():
-                num_counter += 1
-                text = f"{num_counter}. {text}"
-            elif text.strip()[0].isdigit():
-                # 如果文本本身有数字开头，更新计数器
-                import re
-                match = re.match(r'^(\d+)', text.strip())
-                if match:
-                    num_counter = int(match.group(1))
-            
-            lines.append(text)
-        
-        return "\n".join(lines)
-    except Exception as exc:
-        logger.error("Failed to read DOCX file %s: %s", path, exc)
+    path = source_name(source)
+
+    cache = get_parse_cache() if use_cache else None
+    digest = content_digest(data) if cache else ""
+    if cache:
+        cached = cache.get(digest, "docx-format")
+        if cached is not None:
+            return [FormattedParagraph(*item) for item in cached]
+
+    paragraphs = _read_paragraphs(data, path)
+    if paragraphs is None:
         return None
+    formatted_paras = [
+        FormattedParagraph(
+            text=text,
+            is_bold=bool(flags & FORMAT_BOLD),
+            is_strike=bool(flags & FORMAT_STRIKE),
+            is_underline=bool(flags & FORMAT_UNDERLINE),
+        )
+        for text, flags in paragraphs
+    ]
+    if cache:
+        cache.put(
+            digest,
+            "docx-format",
+            [[p.text, p.is_bold, p.is_strike, p.is_underline] for p in formatted_paras],
+        )
+    return formatted_paras
 
 
-def parse_docx_file_with_format(path: str) -> Optional[list[FormattedParagraph]]:
-    """解析DOCX文件，保留格式信息（加粗/删除线/下划线）"""
-    file_path = Path(path)
-    if not file_path.exists():
-        logger.error("DOCX file not found: %s", path)
+def _parse_docx_document(data: bytes, path: str) -> Optional[ParsedDocument]:
+    paragraphs = _read_paragraphs(data, path)
+    if paragraphs is None:
         return None
+    lines: List[str] = []
+    line_formats = bytearray()
+    for text, flags in paragraphs:
+        lines.append(text)
+        # 段落内的软换行会被 splitlines() 拆成多行，格式表按行号对齐
+        line_formats.extend(bytes([flags]) * len((text + "\n").splitlines()))
+    return ParsedDocument("\n".join(lines), bytes(line_formats))
+
+
+def _read_paragraphs(data: bytes, path: str) -> Optional[List[Tuple[str, int]]]:
+    """读取非空段落 (文本, 格式位)，优先走流式 XML 快速路径，失败时回退 python-docx"""
     try:
-        doc = Document(str(file_path))
-        formatted_paras = []
-        num_counter = 0
-        
-        for para in doc.paragraphs:
-            if not para.text.strip():
-                continue
-            
-            # 检测段落级别的格式
-            is_para_bold = False
-            is_para_strike = False
-            is_para_underline = False
-            
-            # 遍历所有 runs (文本块)
-            for run in para.runs:
-                if run.bold:
-                    is_para_bold = True
-                if run.font.strike:
-                    is_para_strike = True
-                if run.underline:
-                    is_para_underline = True
-            
-            text = para.text
-            num_marker = _get_paragraph_number(para)
-            
-            # 处理自动编号
-            if num_marker == "[NUM]" and not text.strip()[0].isdigit():
-                num_counter += 1
-                text = f"{num_counter}. {text}"
-            elif text.strip()[0].isdigit():
-                import re
-                match = re.match(r'^(\d+)', text.strip())
-                if match:
-                    num_counter = int(match.group(1))
-            
-            formatted_para = FormattedParagraph(
-                text=text,
-                is_bold=is_para_bold,
-                is_strike=is_para_strike,
-                is_underline=is_para_underline
-            )
-            formatted_paras.append(formatted_para)
-        
-        return formatted_paras
+        with profiling.stage("parse.docx_xml"):
+            return list(_number_lines(_iter_xml_paragraphs(BytesIO(data))))
+    except Exception as exc:
+        logger.warning("Fast DOCX extraction failed for %s (%s), falling back to python-docx", path, exc)
+    try:
+        with profiling.stage("parse.python_docx"):
+            doc = Document(BytesIO(data))
+            return list(_number_lines(
+                (para.text, _get_paragraph_number(para) == "[NUM]", _python_docx_flags(para))
+                for para in doc.paragraphs
+            ))
     except Exception as exc:
         logger.error("Failed to read DOCX file %s: %s", path, exc)
         return None
 
+
+def _number_lines(paragraphs: Iterable[Tuple[str, bool, int]]) -> Iterator[Tuple[str, int]]:
+    """跳过空段落，并为Word自动编号的段落补上题号
+
+    Args:
+        paragraphs: (段落文本, 是否为自动编号段落, 格式位) 序列
+    """
+    num_counter = 0  # 编号计数器
+    for text, is_numbered, flags in paragraphs:
+        stripped = text.strip()
+        if not stripped:
+            continue
+
+        # 如果检测到编号段落但文本中没有数字开头，添加编号
+        if is_numbered and not stripped[0].isdigit():
+            num_counter += 1
+            text = f"{num_counter}. {text}"
+        elif stripped[0].isdigit():
+            # 如果文本本身有数字开头，更新计数器
+            match = _LEADING_NUMBER_PATTERN.match(stripped)
+            if match:
+                num_counter = int(match.group(1))
+
+        yield text, flags
+
+
+def _main_document_part(zf: zipfile.ZipFile) -> str:
+    """从包关系 _rels/.rels 中找到正文部件名（通常是 word/document.xml）"""
+    try:
+        rels = etree.fromstring(zf.read("_rels/.rels"), parser=_SAFE_XML_PARSER)
+    except (KeyError, etree.XMLSyntaxError):
+        return "word/document.xml"
+    for rel in rels:
+        if rel.get("Type", "").endswith("/officeDocument"):
+            return rel.get("Target", "word/document.xml").lstrip("/")
+    return "word/document.xml"
+
+
+def _xml_run_text(run, parts: List[str]) -> None:
+    """与 python-docx 的 Run.text 规则一致：只取 run 的直接子节点"""
+    for node in run:
+        tag = node.tag
+        if tag == _T:
+            parts.append(node.text or "")
+        elif tag == _TAB or tag == _PTAB:
+            parts.append("\t")
+        elif tag == _BR:
+            # 只有换行型分隔符产生换行，分页/分栏符不产生文本
+            if node.get(_BR_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == _CR:
+            parts.append("\n")
+        elif tag == _NO_BREAK_HYPHEN:
+            parts.append("-")
+
+
+def _xml_on_off(element) -> bool:
+    """w:b / w:strike 等开关属性：存在且 w:val 缺省或为真值"""
+    return element is not None and element.get(_VAL, "true") in ("1", "true", "on")
+
+
+def _xml_run_flags(run) -> int:
+    """与 python-docx 的 run.bold / run.font.strike / run.underline 判定一致"""
+    rpr = run.find(_RPR)
+    if rpr is None:
+        return 0
+    flags = 0
+    if _xml_on_off(rpr.find(_B)):
+        flags |= FORMAT_BOLD
+    if _xml_on_off(rpr.find(_STRIKE)):
+        flags |= FORMAT_STRIKE
+    underline = rpr.find(_U)
+    if underline is not None and underline.get(_VAL) not in (None, "none"):
+        flags |= FORMAT_UNDERLINE
+    return flags
+
+
+def _xml_paragraph(para) -> Tuple[str, int]:
+    """段落文本与格式位
+
+    文本与 python-docx 的 Paragraph.text 规则一致（直接子节点中的 w:r 和 w:hyperlink/w:r）；
+    格式位与原 runs 遍历一致，只看段落的直接 w:r。
+    """
+    parts: List[str] = []
+    flags = 0
+    for child in para:
+        if child.tag == _R:
+            _xml_run_text(child, parts)
+            flags |= _xml_run_flags(child)
+        elif child.tag == _HYPERLINK:
+            for run in child:
+                if run.tag == _R:
+                    _xml_run_text(run, parts)
+    return "".join(parts), flags
+
+
+def _xml_is_numbered(para) -> bool:
+    """段落是否带有Word自动编号（pPr/numPr 下同时有 ilvl 和 numId）"""
+    ppr = para.find(_PPR)
+    if ppr is None:
+        return False
+    num_pr = ppr.find(_NUM_PR)
+    return num_pr is not None and num_pr.find(_ILVL) is not None and num_pr.find(_NUM_ID) is not None
+
+
+def _iter_xml_paragraphs(source: Union[str, BinaryIO]) -> Iterator[Tuple[str, bool, int]]:
+    """流式遍历正文段落，产出 (段落文本, 是否自动编号, 格式位)
+
+    直接从 zip 中解压正文 XML 并 iterparse，不加载图片等媒体部件；
+    与 python-docx 的 doc.paragraphs 一致，只处理 w:body 的直接子段落（不含表格内段落）。
+    每处理完一个段落就释放已遍历的节点，内存占用与文档大小无关。
+    """
+    with zipfile.ZipFile(source) as zf:
+        with zf.open(_main_document_part(zf)) as xml:
+            for _, para in etree.iterparse(xml, events=("end",), tag=_P, resolve_entities=False, huge_tree=True):
+                body = para.getparent()
+                if body is None or body.tag != _BODY:
+                    continue
+                text, flags = _xml_paragraph(para)
+                yield text, _xml_is_numbered(para), flags
+                # 释放当前段落及之前的兄弟节点（含表格）
+                para.clear()
+                while para.getprevious() is not None:
+                    del body[0]
+
+
+def iter_docx_lines(source: Union[str, BinaryIO]) -> Iterator[str]:
+    """流式读取DOCX正文，逐行产出文本（已补全自动编号，与 parse_docx_file 的行一致）
+
+    Args:
+        source: 文件路径或二进制文件对象
+    """
+    return (text for text, _ in _number_lines(_iter_xml_paragraphs(source)))
+
+
+def iter_docx_formatted_lines(source: Union[str, BinaryIO]) -> Iterator[Tuple[str, int]]:
+    """流式读取DOCX正文，逐行产出 (文本, 格式位)
+
+    与 parse_docx_with_format 的 text.splitlines() / line_formats 逐行一致（段落内的软换行拆成多行，
+    沿用段落的格式位），可直接交给 recognizers.question_detector.iter_formatted_questions。
+    """
+    for text, flags in _number_lines(_iter_xml_paragraphs(source)):
+        for line in (text + "\n").splitlines():
+            yield line, flags
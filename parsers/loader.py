@@ -0,0 +1,68 @@
+from io import BytesIO
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+import logging
+
+from parsers.docx_parser import ParsedDocument, iter_docx_formatted_lines, parse_docx_with_format
+from parsers.source import DocumentSource, read_source_bytes, source_name
+from parsers.text_parser import iter_text_lines, parse_text_file
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SUFFIXES = (".txt", ".docx")
+
+
+def load_document(
+    source: Optional[DocumentSource],
+    use_cache: bool = True,
+    name: Optional[str] = None,
+) -> Optional[ParsedDocument]:
+    """按扩展名读取题库文件；DOCX 一次解析同时返回逐行格式表，TXT 无格式信息
+
+    use_cache 只对 DOCX 生效（TXT 直接解码，不经过解析缓存）。
+
+    Args:
+        source: 文件路径、字节串或二进制文件对象
+        name: 内存输入的文件名（用于判断扩展名），文件对象默认取其 name 属性
+    """
+    if source is None or (isinstance(source, str) and not source):
+        return None
+    suffix = Path(source_name(source, name)).suffix.lower()
+    if suffix == ".txt":
+        text = parse_text_file(source)
+        return ParsedDocument(text, b"") if text is not None else None
+    if suffix == ".docx":
+        return parse_docx_with_format(source, use_cache=use_cache)
+    logger.error("Unsupported file type: %s", suffix)
+    return None
+
+
+def iter_document_lines(
+    source: Optional[DocumentSource],
+    name: Optional[str] = None,
+) -> Optional[Iterator[Tuple[str, int]]]:
+    """按扩展名流式逐行读取题库文件，产出 (文本, 格式位)；TXT 的格式位恒为 0
+
+    文件路径不读入全文、不经过解析缓存，配合 recognizers.question_detector.iter_formatted_questions
+    可以边读边识别；内存输入的 DOCX 同样逐段落遍历，TXT 整体解码后逐行产出。
+    文件不存在或类型不支持时返回 None。
+    """
+    if source is None or (isinstance(source, str) and not source):
+        return None
+    suffix = Path(source_name(source, name)).suffix.lower()
+    is_path = isinstance(source, (str, Path))
+    if is_path and not Path(source).exists():
+        logger.error("File not found: %s", source)
+        return None
+    if suffix == ".txt":
+        if is_path:
+            return ((line, 0) for line in iter_text_lines(source))
+        text = parse_text_file(source)
+        return ((line, 0) for line in text.splitlines()) if text is not None else None
+    if suffix == ".docx":
+        if is_path:
+            return iter_docx_formatted_lines(str(source))
+        data = read_source_bytes(source, "DOCX file")
+        return iter_docx_formatted_lines(BytesIO(data)) if data is not None else None
+    logger.error("Unsupported file type: %s", suffix)
+    return None
@@ -0,0 +1,47 @@
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+import logging
+
+import profiling
+
+logger = logging.getLogger(__name__)
+
+# 解析器的输入：文件路径、内存中的字节，或二进制文件对象（如 BytesIO / Streamlit 的 UploadedFile）
+DocumentSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+def source_name(source: DocumentSource, name: Optional[str] = None) -> str:
+    """用于日志和扩展名判断的名称：显式指定 > 路径 > 文件对象的 name 属性"""
+    if name:
+        return name
+    if isinstance(source, (str, Path)):
+        return str(source)
+    return getattr(source, "name", None) or "<memory>"
+
+
+def read_source_bytes(source: DocumentSource, kind: str = "file") -> Optional[bytes]:
+    """读取输入的全部字节；内存输入直接复用原缓冲区，不经过磁盘
+
+    Args:
+        kind: 日志中的文件类别（"Text file" / "DOCX file"）
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    if isinstance(source, (str, Path)):
+        file_path = Path(source)
+        if not file_path.exists():
+            logger.error("%s not found: %s", kind, source)
+            return None
+        try:
+            with profiling.stage("parse.read"):
+                return file_path.read_bytes()
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to read %s %s: %s", kind, source, exc)
+            return None
+    try:
+        # BytesIO.getvalue() 在缓冲区未被修改时与内部对象共享内存，不会复制
+        getvalue = getattr(source, "getvalue", None)
+        return getvalue() if getvalue is not None else source.read()
+    except Exception as exc:  # noqa: BLE001
+        logger.error("Failed to read %s %s: %s", kind, source_name(source), exc)
+        return None
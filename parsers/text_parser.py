@@ -1,24 +1,66 @@
+import codecs
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Union
 import logging
 
+import profiling
+from parsers.source import DocumentSource, read_source_bytes, source_name
+
 logger = logging.getLogger(__name__)
 
+# iter_text_lines 用文件开头这么多字节判断编码
+_SNIFF_BYTES = 64 * 1024
 
-def parse_text_file(path: str) -> Optional[str]:
-    file_path = Path(path)
-    if not file_path.exists():
-        logger.error("Text file not found: %s", path)
-        return None
+
+def _decode_text(data: bytes, path: str) -> Optional[str]:
+    """按 UTF-8 解码，失败时回退 GBK（换行统一为 \\n，与文本模式读取一致）"""
     try:
-        return file_path.read_text(encoding="utf-8")
+        text = str(data, "utf-8")
     except UnicodeDecodeError:
         logger.warning("UTF-8 decode failed for %s, retrying with gbk", path)
         try:
-            return file_path.read_text(encoding="gbk")
+            text = str(data, "gbk")
         except Exception as exc:  # noqa: BLE001
             logger.error("Failed to read text file %s: %s", path, exc)
             return None
-    except Exception as exc:  # noqa: BLE001
-        logger.error("Failed to read text file %s: %s", path, exc)
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def parse_text_file(source: DocumentSource) -> Optional[str]:
+    """解析文本题库
+
+    解码本身就是读入后的全部工作，不经过解析缓存（查缓存反而多一次磁盘读写）。
+
+    Args:
+        source: 文件路径、字节串或二进制文件对象（上传的文件可直接传入，无需落盘）
+    """
+    data = read_source_bytes(source, "Text file")
+    if data is None:
         return None
+    with profiling.stage("parse.decode"):
+        return _decode_text(data, source_name(source))
+
+
+def _sniff_encoding(head: bytes) -> str:
+    """文件开头能按 UTF-8 解码（允许末尾截断的多字节字符）则为 UTF-8，否则按 GBK"""
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "gbk"
+
+
+def iter_text_lines(path: Union[str, Path], encoding: Optional[str] = None) -> Iterator[str]:
+    """流式逐行读取文本题库，行划分与 parse_text_file(...).splitlines() 一致（空行除外）
+
+    Args:
+        encoding: 省略时按文件开头判断 UTF-8 / GBK（parse_text_file 则是整体解码失败后回退）
+    """
+    file_path = Path(path)
+    if encoding is None:
+        with file_path.open("rb") as f:
+            encoding = _sniff_encoding(f.read(_SNIFF_BYTES))
+    with file_path.open("r", encoding=encoding) as f:
+        for raw in f:
+            # 文件逐行只按换行符切分，splitlines 还会在 \x0c、\u2028 等处切分
+            yield from raw.splitlines()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import profiling
+from parsers.loader import SUPPORTED_SUFFIXES, load_document
+from pipeline.exporter import FORMAT_SUFFIXES, export_label, export_questions
+from pipeline.manifest import BuildManifest, input_digests
+from recognizers.answer_aligner import align_answers
+
+logger = logging.getLogger(__name__)
+
+# "X（无答案）.docx" 是 "X.docx" 的纯题干版本（兼容半角括号）
+WITHOUT_ANSWERS_SUFFIX_PATTERN = re.compile(r"\s*[（(]无答案[）)]$")
+SUMMARY_FILENAME = "batch_summary.json"
+
+
+class BankJob(NamedTuple):
+    """一个题库：含答案文档 + 纯题干文档（单独存在的文件两者为同一份）"""
+    name: str
+    with_answers: Optional[str]
+    without_answers: str
+
+
+def pair_bank_files(directory: Path | str) -> List[BankJob]:
+    """扫描目录，将 "X.docx" 与 "X（无答案）.docx" 配对
+
+    没有配对的文件单独成为一个题库：含答案文档从自身提取答案，纯题干文档答案为空。
+    同名的不同格式（如 X.docx 与 X.txt）会写到同一个输出文件，这时题库名带上扩展名（X_docx、X_txt）。
+    """
+    files: Dict[tuple, Path] = {}
+    for path in sorted(Path(directory).iterdir()):
+        if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES:
+            files[(path.stem, path.suffix.lower())] = path
+
+    jobs: List[BankJob] = []
+    paired = set()
+    for (stem, suffix), path in files.items():
+        base = WITHOUT_ANSWERS_SUFFIX_PATTERN.sub("", stem)
+        if base == stem:
+            continue
+        with_path = files.get((base, suffix))
+        if with_path is not None:
+            jobs.append(BankJob(base, str(with_path), str(path)))
+            paired.update({(base, suffix), (stem, suffix)})
+
+    for (stem, suffix), path in files.items():
+        if (stem, suffix) in paired:
+            continue
+        if WITHOUT_ANSWERS_SUFFIX_PATTERN.search(stem):
+            jobs.append(BankJob(stem, None, str(path)))
+        else:
+            jobs.append(BankJob(stem, str(path), str(path)))
+
+    names = Counter(job.name for job in jobs)
+    for index, job in enumerate(jobs):
+        if names[job.name] > 1:
+            name = f"{job.name}_{Path(job.without_answers).suffix.lower().lstrip('.')}"
+            logger.warning("题库 %s 有多种格式的输入，输出改名为 %s: %s", job.name, name, job.without_answers)
+            jobs[index] = job._replace(name=name)
+    return sorted(jobs, key=lambda job: job.name)
+
+
+def output_name(job: BankJob, export_format: str = "json") -> str:
+    return f"{job.name}{FORMAT_SUFFIXES[export_format]}"
+
+
+def process_bank(
+    job: BankJob,
+    output_dir: str,
+    use_cache: bool = True,
+    export_format: str = "json",
+    compact: bool = False,
+) -> Dict:
+    """解析 → 识别 → 对齐一个题库并写出 JSON，返回统计信息（在子进程中运行）"""
+    stats: Dict = {"name": job.name, "with_answers": job.with_answers, "without_answers": job.without_answers}
+    started = time.perf_counter()
+    try:
+        without_doc = load_document(job.without_answers, use_cache)
+        if without_doc is None:
+            raise ValueError(f"无法加载纯题干文件: {job.without_answers}")
+        if job.with_answers == job.without_answers:
+            with_text = without_doc.text  # 单独的含答案文档：从自身提取答案
+        else:
+            with_doc = load_document(job.with_answers, use_cache)
+            with_text = with_doc.text if with_doc else None
+        parsed = time.perf_counter()
+
+        questions = align_answers(with_text, without_doc.text, without_doc.line_formats)
+        aligned = time.perf_counter()
+
+        output_path = Path(output_dir) / output_name(job, export_format)
+        with profiling.stage(f"export.{export_format}"):
+            export_questions(questions, output_path, export_format, compact)
+        finished = time.perf_counter()
+    except Exception as exc:  # noqa: BLE001
+        logger.error("题库 %s 处理失败: %s", job.name, exc)
+        stats.update(error=str(exc), seconds=round(time.perf_counter() - started, 4))
+        return stats
+
+    stats.update(
+        output=str(output_path),
+        questions=len(questions),
+        answered=sum(1 for q in questions if q.answer),
+        parse_seconds=round(parsed - started, 4),
+        align_seconds=round(aligned - parsed, 4),
+        write_seconds=round(finished - aligned, 4),
+        seconds=round(finished - started, 4),
+    )
+    return stats
+
+
+def run_batch(
+    directory: Path | str,
+    output_dir: Path | str,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+    force: bool = False,
+    export_format: str = "json",
+    compact: bool = False,
+) -> Dict:
+    """并行处理目录下的全部题库，写出每个题库的 JSON 和汇总文件
+
+    输出目录下的构建清单记录了每个题库的输入哈希和代码版本，未变化的题库直接跳过。
+
+    Args:
+        workers: 进程数，None 为 CPU 核数；1 时在当前进程中顺序处理
+        force: 忽略构建清单，重建全部题库
+        export_format / compact: 导出格式，见 pipeline.exporter.write_questions
+    """
+    started = time.perf_counter()
+    manifest = BuildManifest(output_dir)
+    results: List[Dict] = []
+    stale: List[BankJob] = []
+    digests: Dict[str, Dict[str, str]] = {}
+    export = export_label(export_format, compact)
+    for job in pair_bank_files(directory):
+        inputs = input_digests([job.with_answers, job.without_answers])
+        name = output_name(job, export_format)
+        entry = manifest.entry(name)
+        if not force and manifest.is_fresh(name, inputs, export):
+            results.append({"name": job.name, "skipped": True, "output": entry["output"], "questions": entry["questions"]})
+            continue
+        digests[job.name] = inputs
+        stale.append(job)
+
+    options = (str(output_dir), use_cache, export_format, compact)
+    if workers == 1 or len(stale) <= 1:
+        built = [process_bank(job, *options) for job in stale]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            built = list(pool.map(process_bank, stale, *([option] * len(stale) for option in options)))
+
+    for stats in built:
+        if "error" not in stats:
+            name = Path(stats["output"]).name
+            manifest.record(name, digests[stats["name"]], stats["questions"], export)
+    manifest.save()
+    results = sorted(results + built, key=lambda r: r["name"])
+
+    summary = {
+        "input_dir": str(directory),
+        "banks": results,
+        "total_questions": sum(r.get("questions", 0) for r in results),
+        "failed": sum(1 for r in results if "error" in r),
+        "skipped": sum(1 for r in results if r.get("skipped")),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    summary_path = Path(output_dir) / SUMMARY_FILENAME
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    return summary
+
+
+def format_batch_report(summary: Dict) -> str:
+    """把汇总信息格式化为逐题库的耗时表"""
+    rows = [f"{'题库':<28}{'题数':>6}{'有答案':>8}{'解析(s)':>10}{'对齐(s)':>10}{'合计(s)':>10}"]
+    for r in summary["banks"]:
+        if "error" in r:
+            rows.append(f"{r['name']:<28}  失败: {r['error']}")
+            continue
+        if r.get("skipped"):
+            rows.append(f"{r['name']:<28}{r['questions']:>6}  未变更，跳过")
+            continue
+        rows.append(
+            f"{r['name']:<28}{r['questions']:>6}{r['answered']:>8}"
+            f"{r['parse_seconds']:>10.3f}{r['align_seconds']:>10.3f}{r['seconds']:>10.3f}"
+        )
+    rows.append(
+        f"共 {len(summary['banks'])} 个题库（跳过 {summary['skipped']} 个），"
+        f"{summary['total_questions']} 道题，总耗时 {summary['seconds']:.3f}s"
+    )
+    return "\n".join(rows)
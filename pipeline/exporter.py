@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Union
+
+from models.question import Question, QuestionLike, QuestionRecord, question_dict
+from storage.compact_store import STORE_SUFFIX, write_compact_store
+
+logger = logging.getLogger(__name__)
+
+# 导出格式：JSON 数组（与 json.dumps(list, indent=2) 逐字节一致）、JSON Lines（每行一道题）
+# 或紧凑的列式题库（storage.compact_store，界面可内存映射按需读取）
+EXPORT_FORMATS = ("json", "jsonl", "qbank")
+FORMAT_SUFFIXES = {"json": ".json", "jsonl": ".jsonl", "qbank": STORE_SUFFIX}
+_COMPACT_SEPARATORS = (",", ":")
+
+
+def export_label(fmt: str = "json", compact: bool = False) -> str:
+    """导出选项的简短描述（记录在构建清单中，选项变化时需要重建）"""
+    return f"{fmt}-compact" if compact else fmt
+
+
+def output_path_for(path: Path | str, fmt: str = "json") -> Path:
+    """按导出格式修正输出文件的扩展名（如 --format jsonl 配默认的 questions.json → questions.jsonl）
+
+    界面和 storage.compact_store.iter_bank_file 按扩展名判断文件格式，扩展名与内容不符会读取失败。
+    """
+    path = Path(path)
+    suffix = FORMAT_SUFFIXES[fmt]
+    return path if path.suffix.lower() == suffix else path.with_suffix(suffix)
+
+
+def write_questions(
+    questions: Iterable[Union[QuestionLike, Dict[str, Any]]],
+    stream,
+    fmt: str = "json",
+    compact: bool = False,
+) -> int:
+    """逐题序列化写入文本流，返回写出的题数；任意时刻只持有一道题的序列化结果
+
+    Args:
+        fmt: "json" 输出 JSON 数组，"jsonl" 每行一道题
+        compact: 不缩进、不加空格（体积更小）
+    """
+    if fmt not in ("json", "jsonl"):
+        raise ValueError(f"Unsupported export format: {fmt}")
+    separators = _COMPACT_SEPARATORS if compact else None
+    count = 0
+
+    if fmt == "jsonl":
+        for question in questions:
+            stream.write(json.dumps(question_dict(question), ensure_ascii=False, separators=separators))
+            stream.write("\n")
+            count += 1
+        return count
+
+    indent = None if compact else 2
+    for question in questions:
+        text = json.dumps(question_dict(question), ensure_ascii=False, indent=indent, separators=separators)
+        if compact:
+            stream.write("," if count else "[")
+            stream.write(text)
+        else:
+            # 与整体 json.dumps(list, indent=2) 的排版一致：元素整体再缩进一级
+            stream.write(",\n  " if count else "[\n  ")
+            stream.write(text.replace("\n", "\n  "))
+        count += 1
+    if not count:
+        stream.write("[]")
+    else:
+        stream.write("]" if compact else "\n]")
+    return count
+
+
+def _validated(question: Union[QuestionLike, Dict[str, Any]]) -> Question:
+    """导出前逐题校验：流水线内部的 QuestionRecord 和读入的 dict 都在这里转成 Question"""
+    if isinstance(question, Question):
+        return question
+    if isinstance(question, QuestionRecord):
+        return question.to_model()
+    return Question.model_validate(question)
+
+
+def export_questions(
+    questions: Iterable[Union[QuestionLike, Dict[str, Any]]],
+    path: Path | str,
+    fmt: str = "json",
+    compact: bool = False,
+) -> int:
+    """流式导出题目到文件（先写临时文件再原子替换，中途失败不会留下半个文件），返回题数
+
+    写出前逐题用 Question 校验，字段不合法时抛出 pydantic.ValidationError（ValueError 的子类），不覆盖原文件。
+    """
+    questions = map(_validated, questions)
+    if fmt == "qbank":
+        return write_compact_store(questions, path)
+    output_path = Path(path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    try:
+        with tmp.open("w", encoding="utf-8", newline="\n") as stream:
+            count = write_questions(questions, stream, fmt, compact)
+        os.replace(tmp, output_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    logger.debug("Exported %d questions to %s (%s)", count, output_path, export_label(fmt, compact))
+    return count
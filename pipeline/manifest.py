@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from config import DETECTOR_VERSION, PARSER_VERSION
+from parsers.cache import content_digest
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def code_version() -> str:
+    """影响输出的代码版本：解析器版本 + 识别/对齐版本"""
+    return f"parser-{PARSER_VERSION}/detector-{DETECTOR_VERSION}"
+
+
+def input_digests(paths: Iterable[Optional[str]]) -> Dict[str, str]:
+    """计算输入文件的内容哈希 {路径: sha256}，缺失的文件记为空字符串"""
+    digests = {}
+    for path in paths:
+        if not path or path in digests:
+            continue
+        try:
+            digests[path] = content_digest(Path(path).read_bytes())
+        except OSError:
+            digests[path] = ""
+    return digests
+
+
+class BuildManifest:
+    """data/processed 下的构建清单：记录每个输出文件由哪些输入、哪个代码版本生成
+
+    输入内容和代码版本都未变、且输出文件仍存在时，该输出视为最新，可跳过重建。
+    """
+
+    def __init__(self, output_dir: Path | str):
+        self.path = Path(output_dir) / MANIFEST_FILENAME
+        self.entries: Dict[str, Dict] = {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.entries = data.get("outputs", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable manifest %s: %s", self.path, exc)
+
+    def entry(self, output_name: str) -> Optional[Dict]:
+        return self.entries.get(output_name)
+
+    def is_fresh(self, output_name: str, inputs: Dict[str, str], export: str = "json") -> bool:
+        """export 为导出选项（见 pipeline.exporter.export_label），选项不同也需要重建"""
+        entry = self.entries.get(output_name)
+        if not entry:
+            return False
+        return (
+            entry.get("code_version") == code_version()
+            and entry.get("inputs") == inputs
+            and entry.get("export", "json") == export
+            and (self.path.parent / output_name).exists()
+        )
+
+    def record(self, output_name: str, inputs: Dict[str, str], questions: int, export: str = "json") -> None:
+        self.entries[output_name] = {
+            "inputs": inputs,
+            "code_version": code_version(),
+            "export": export,
+            "output": str(self.path.parent / output_name),
+            "questions": questions,
+            "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"code_version": code_version(), "outputs": self.entries}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.question import QuestionRecord
+from models.question_bank import QuestionBank
+from models.type_index import TypeIndex
+from parsers.cache import content_digest, file_digest
+from parsers.loader import iter_document_lines, load_document
+from parsers.source import DocumentSource, read_source_bytes, source_name
+from recognizers.answer_aligner import attach_answers
+from recognizers.question_detector import iter_formatted_questions
+
+logger = logging.getLogger(__name__)
+
+
+def _source_digest(source: DocumentSource) -> str:
+    if isinstance(source, (str, Path)):
+        return file_digest(source)
+    data = read_source_bytes(source)
+    if data is None:
+        raise ValueError(f"无法读取文件: {source_name(source)}")
+    return content_digest(data)
+
+
+def _collect_text(lines: Iterable[Tuple[str, int]], texts: List[str]) -> Iterator[Tuple[str, int]]:
+    for line in lines:
+        texts.append(line[0])
+        yield line
+
+
+class BankLoader:
+    """在后台线程中解析题库：边读边识别，识别出的题目立即可用，全部识别完再对齐答案
+
+    加载中 bank() 返回已识别题目的快照（尚无答案），完成后返回对齐答案后的完整题库；
+    快照与最终题库的题目顺序一致，下标可以直接沿用。
+    纯题干文件只流式读取一遍；use_cache 同 parsers.loader.load_document，作用于另行解析的含答案 DOCX。
+    """
+
+    def __init__(
+        self,
+        without_source: Optional[DocumentSource],
+        with_source: Optional[DocumentSource] = None,
+        without_name: Optional[str] = None,
+        with_name: Optional[str] = None,
+        use_cache: bool = True,
+    ):
+        # 只有一份文件时两份都用它（从同一份文本中提取答案）
+        if without_source is None:
+            without_source, without_name = with_source, with_name
+        elif with_source is None:
+            with_source, with_name = without_source, without_name
+        self._without = (without_source, without_name)
+        self._with = (with_source, with_name)
+        self._use_cache = use_cache
+        self._key: Optional[str] = None
+        self._questions: List[Dict] = []
+        self._type_index = TypeIndex()
+        self._snapshot: Optional[QuestionBank] = None
+        self._final: Optional[QuestionBank] = None
+        self._error: Optional[str] = None
+        self._changed = threading.Condition()
+        self._done = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def name(self) -> str:
+        return source_name(*self._without)
+
+    def start(self) -> "BankLoader":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"bank-loader:{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    @property
+    def count(self) -> int:
+        """已识别的题数"""
+        return len(self._final) if self._final is not None else len(self._questions)
+
+    def bank(self) -> Optional[QuestionBank]:
+        """完成后为对齐答案的题库（失败为 None），加载中为已识别题目的快照"""
+        if self._done:
+            return self._final
+        with self._changed:
+            if self._done:
+                return self._final
+            # 快照只在识别出新题目后重建；题型索引取识别时增量维护的那份的前缀
+            count = len(self._questions)
+            if self._snapshot is None or len(self._snapshot) != count:
+                self._snapshot = QuestionBank(self._questions[:], self._type_index.prefix(count), key=self._key)
+            return self._snapshot
+
+    def wait(self, count: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """等待至少识别出 count 道题（省略时等待全部完成），返回条件是否已满足"""
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self._done or (count is not None and len(self._questions) >= count),
+                timeout,
+            )
+
+    def _run(self) -> None:
+        try:
+            self._key = content_digest("".join(map(_source_digest, (self._without[0], self._with[0]))).encode())
+            lines = iter_document_lines(*self._without)
+            if lines is None:
+                raise ValueError(f"无法加载纯题干文件: {self.name}")
+            # 识别的同时留下逐行文本，对齐答案时不必再解析一遍纯题干文件
+            texts: List[str] = []
+            for question in iter_formatted_questions(_collect_text(lines, texts), self._type_index):
+                with self._changed:
+                    self._questions.append(question)
+                    self._changed.notify_all()
+
+            # 答案块的归属依赖全部题目（按题型顺序匹配），识别完再整体对齐
+            without_text = "\n".join(texts)
+            if self._with == self._without:
+                with_text = without_text
+            else:
+                with_doc = load_document(self._with[0], self._use_cache, self._with[1])
+                with_text = with_doc.text if with_doc else None
+            records = [QuestionRecord(**q) for q in self._questions]
+            attach_answers(records, with_text, without_text)
+            self._final = QuestionBank([q.model_dump() for q in records], self._type_index, key=self._key)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to load question bank %s: %s", self.name, exc)
+            self._error = str(exc)
+        finally:
+            with self._changed:
+                # 与 _done 一起更新，bank() 不会在两者之间看到空的快照
+                self._questions = []
+                self._snapshot = None
+                self._done = True
+                self._changed.notify_all()
@@ -0,0 +1,152 @@
+"""轻量的分阶段性能统计（main.py --profile）
+
+未启用时 stage() 返回共享的空上下文、wrap() 原样返回函数，对正常运行几乎没有开销。
+启用后按阶段累计墙钟时间、调用次数和净分配内存块数（sys.getallocatedblocks 的差值）。
+阶段可以嵌套，每个阶段的时间都包含其子阶段。
+"""
+from __future__ import annotations
+
+import cProfile
+import contextlib
+import functools
+import sys
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_enabled = False
+_stats: Dict[str, "StageStats"] = {}
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class StageStats:
+    """一个阶段的累计统计"""
+    __slots__ = ("name", "calls", "seconds", "blocks")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.blocks = 0  # 净分配的内存块数，可为负（释放多于分配）
+
+    def to_dict(self) -> Dict:
+        return {"stage": self.name, "calls": self.calls, "seconds": round(self.seconds, 6), "blocks": self.blocks}
+
+
+def _get_stats(name: str) -> StageStats:
+    stats = _stats.get(name)
+    if stats is None:
+        stats = _stats[name] = StageStats(name)
+    return stats
+
+
+class _Stage:
+    __slots__ = ("_stats", "_started", "_blocks")
+
+    def __init__(self, name: str):
+        self._stats = _get_stats(name)
+
+    def __enter__(self):
+        self._blocks = sys.getallocatedblocks()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._started
+        stats = self._stats
+        stats.calls += 1
+        stats.seconds += elapsed
+        stats.blocks += sys.getallocatedblocks() - self._blocks
+        return False
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    _stats.clear()
+
+
+def stage(name: str):
+    """统计一个代码块：with profiling.stage("detect.classify"): ..."""
+    return _Stage(name) if _enabled else _NULL_STAGE
+
+
+def wrap(name: str, func: Callable[..., T]) -> Callable[..., T]:
+    """返回统计每次调用的包装函数；未启用时原样返回（在函数入口处包装热点函数，避免每次调用都判断开关）"""
+    if not _enabled:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _Stage(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def wrap_iter(name: str, iterable: Iterable[T]) -> Iterator[T]:
+    """统计迭代器产出每个元素的耗时（如逐行分类）；未启用时原样返回"""
+    if not _enabled:
+        return iter(iterable)
+    return _timed_iter(_get_stats(name), iter(iterable))
+
+
+def _timed_iter(stats: StageStats, iterator: Iterator[T]) -> Iterator[T]:
+    getblocks = sys.getallocatedblocks
+    clock = time.perf_counter
+    while True:
+        blocks = getblocks()
+        started = clock()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats.seconds += clock() - started
+            return
+        stats.seconds += clock() - started
+        stats.blocks += getblocks() - blocks
+        stats.calls += 1
+        yield item
+
+
+def results() -> List[StageStats]:
+    return list(_stats.values())
+
+
+def format_report(stats: Optional[List[StageStats]] = None) -> str:
+    """格式化为阶段耗时表（按首次出现的顺序，即流水线顺序）"""
+    stats = results() if stats is None else stats
+    rows = [f"{'阶段':<28}{'调用次数':>10}{'累计(ms)':>12}{'平均(µs)':>12}{'净分配块':>12}"]
+    for s in stats:
+        average = s.seconds / s.calls * 1e6 if s.calls else 0.0
+        rows.append(f"{s.name:<28}{s.calls:>10}{s.seconds * 1000:>12.2f}{average:>12.1f}{s.blocks:>12}")
+    return "\n".join(rows)
+
+
+@contextlib.contextmanager
+def profile_run(pstats_path: Optional[str] = None) -> Iterator[None]:
+    """启用分阶段统计（清空之前的结果），可选同时运行 cProfile 并把 pstats 写到 pstats_path"""
+    reset()
+    enable()
+    profiler = cProfile.Profile() if pstats_path else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(pstats_path)
+        disable()
@@ -3,42 +3,122 @@ from __future__ import annotations
 import logging
 import re
 from difflib import SequenceMatcher
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 from config import ANSWER_LINE_PATTERN
-from models.question import Question
-from recognizers.question_detector import detect_questions
+from models.question import QuestionLike, QuestionRecord
+from models.type_index import TypeIndex
+import profiling
+from recognizers.question_detector import detect_questions_with_index
 
 logger = logging.getLogger(__name__)
 
+# 答案块开头的"答案："/"参考答案："前缀
+ANSWER_PREFIX_PATTERN = re.compile(r'^(答案|参考答案)\s*[:：]?')
+ANSWER_PREFIX_STRIP_PATTERN = re.compile(r'^(答案|参考答案)\s*[:：]?\s*')
+# 题型标记（"一、"等）开头的行结束当前答案块
+SECTION_START_PATTERN = re.compile(r'^[一二三四五六七八九十]')
+SHORT_SECTION_START_PATTERN = re.compile(r'^[一二三四五]')
+NUMBERED_LINE_PATTERN = re.compile(r'^\d+[\.、]')
+# 答案块中的题号条目：题号 + 可选分隔符 + 判断符号或选项字母（都没有时只记录题号）
+ANSWER_ITEM_PATTERN = re.compile(r'(\d+)\s*([\.、]?)\s*(?:([×√对错])|([A-Ha-h]+))?')
+# 从题号开始到下一个"题号."之前的完整答案文本
+ANSWER_PAYLOAD_PATTERN = re.compile(r'(\d+)\s*[\.、]?\s*([^0-9]+?)(?=\d+\s*[\.、]|$)')
 
-def align_answers(with_ans_text: Optional[str], without_ans_text: str) -> List[Question]:
+
+class AnswerItem(NamedTuple):
+    """答案块中的一个题号条目"""
+    number: int
+    kind: str  # "judge"（×√对错）/ "choice"（A-H 字母）/ "text"
+    value: str  # 判断/选择条目的答案值
+    payload: Optional[str]  # 到下一个"题号."为止的答案文本；不构成完整条目时为 None
+    has_separator: bool  # 题号后是否紧跟"."或"、"
+
+
+def tokenize_answer_block(block: str) -> List[AnswerItem]:
+    """单次扫描答案块，为每个题号产出一个条目
+
+    每个连续数字串只访问一次：判断/选择答案直接取题号后的符号或字母，
+    完整答案文本从同一位置锚定匹配，结果与分别对整个答案块做三次 findall 一致。
+    """
+    items: List[AnswerItem] = []
+    match_payload = ANSWER_PAYLOAD_PATTERN.match
+    for m in ANSWER_ITEM_PATTERN.finditer(block):
+        number, separator, judge, choice = m.groups()
+        if judge:
+            kind, value = "judge", judge
+        elif choice:
+            kind, value = "choice", choice
+        else:
+            kind, value = "text", ""
+        payload_match = match_payload(block, m.start())
+        items.append(AnswerItem(
+            int(number),
+            kind,
+            value,
+            payload_match.group(2) if payload_match else None,
+            bool(separator),
+        ))
+    return items
+
+
+def align_answers(
+    with_ans_text: Optional[str],
+    without_ans_text: str,
+    format_info: Optional[Sequence[int]] = None,
+) -> List[QuestionRecord]:
     """对齐答案与题目
     
     核心逻辑：
     - 如果提供了两份不同的文本，按题型分块匹配
     - 如果只提供一份文本（或两份相同），直接从"答案："行提取
+
+    format_info 为纯题干文本的逐行格式表，用于过滤删除线题目、标记重点
+
+    返回未经校验的 QuestionRecord（属性与 Question 相同）；需要 pydantic 模型时逐题 to_model()，
+    pipeline.exporter.export_questions 写出前会统一校验。
     """
-    base_questions = [Question(**q) for q in detect_questions(without_ans_text)]
+    return align_answers_with_index(with_ans_text, without_ans_text, format_info)[0]
 
+
+def align_answers_with_index(
+    with_ans_text: Optional[str],
+    without_ans_text: str,
+    format_info: Optional[Sequence[int]] = None,
+) -> Tuple[List[QuestionRecord], TypeIndex]:
+    """同 align_answers，另返回识别题目时建立的题型索引（答案对齐不改变题目顺序和题型）"""
+    detected, type_index = detect_questions_with_index(without_ans_text, format_info)
+    base_questions = [QuestionRecord(**q) for q in detected]
+    attach_answers(base_questions, with_ans_text, without_ans_text)
+    return base_questions, type_index
+
+
+def attach_answers(questions: List[QuestionLike], with_ans_text: Optional[str], without_ans_text: str) -> None:
+    """为已识别的题目（来自 without_ans_text）写入答案，策略同 align_answers"""
     # 如果没有含答案文本，或与纯题干文本相同，则直接提取
     if not with_ans_text or with_ans_text.strip() == without_ans_text.strip():
         # 直接从 without_ans_text 中提取答案块
-        extract_answers_from_same_text(without_ans_text, base_questions)
-        return base_questions
+        extract_answers_from_same_text(without_ans_text, questions)
+        return
     
     # 如果有两份不同的文本，按题型分块匹配
-    extract_answers_by_type(with_ans_text, base_questions)
-    return base_questions
+    extract_answers_by_type(with_ans_text, questions)
 
 
-def extract_answers_from_same_text(text: str, questions: List[Question]) -> None:
+def extract_answers_from_same_text(text: str, questions: List[QuestionLike]) -> None:
     """从同一份文本中提取答案（题目和答案在一起）
     
     策略：提取所有答案块，然后尝试将其与各题型的问题进行智能匹配
     不假设题型顺序，而是通过答案内容的特征来确定属于哪种题型
     """
-    # 提取答案块
+    with profiling.stage("align.extract_blocks"):
+        answer_blocks = _answer_blocks_in_same_text(text)
+    with profiling.stage("align.match"):
+        _match_blocks_by_content(answer_blocks, questions)
+
+
+def _answer_blocks_in_same_text(text: str) -> List[str]:
+    """提取 "答案：" 开头的答案块，直到下一个答案标记或题型标记"""
     lines = text.splitlines()
     answer_blocks = []
     
@@ -47,9 +127,9 @@ def extract_answers_from_same_text(text: str, questions: List[Question]) -> None
         line = lines[i].strip()
         
         # 检测答案行开始
-        if re.match(r'^(答案|参考答案)\s*[:：]?', line):
+        if ANSWER_PREFIX_PATTERN.match(line):
             # 提取答案行本身的内容（去掉前缀）
-            content = re.sub(r'^(答案|参考答案)\s*[:：]?\s*', '', line)
+            content = ANSWER_PREFIX_STRIP_PATTERN.sub('', line)
             current_block = content if content else ""
             
             # 收集后续行，直到遇到新的答案标记或新的题型标记
@@ -58,11 +138,11 @@ def extract_answers_from_same_text(text: str, questions: List[Question]) -> None
                 next_line = lines[i].strip()
                 
                 # 遇到新的"答案："标记，停止当前块
-                if re.match(r'^(答案|参考答案)\s*[:：]?', next_line):
+                if ANSWER_PREFIX_PATTERN.match(next_line):
                     break
                 
                 # 遇到题型标记（"一、"、"二、"等），停止
-                if re.match(r'^[一二三四五六七八九十]', next_line):
+                if SECTION_START_PATTERN.match(next_line):
                     break
                 
                 # 如果下一行非空
@@ -81,7 +161,12 @@ def extract_answers_from_same_text(text: str, questions: List[Question]) -> None
             continue
         
         i += 1
-    
+
+    return answer_blocks
+
+
+def _match_blocks_by_content(answer_blocks: List[str], questions: List[QuestionLike]) -> None:
+    """根据答案块的内容特征判断所属题型，按题型内序号写入答案"""
     # 按题型分组问题
     type_groups = {}
     for q in questions:
@@ -93,13 +178,14 @@ def extract_answers_from_same_text(text: str, questions: List[Question]) -> None
     # 智能匹配：尝试每个答案块，根据其内容特征判断属于哪种题型，然后应用相应的解析规则
     for answer_block in answer_blocks:
         # 尝试按不同的题型解析答案块，看哪个能解析出合理数量的答案
+        items = tokenize_answer_block(answer_block)
         
         # 1. 尝试作为判断题答案（×√对错）
-        judge_matches = re.findall(r'(\d+)\s*[\.、]?\s*([×√对错])', answer_block)
+        judge_matches = [(item.number, item.value) for item in items if item.kind == "judge"]
         # 2. 尝试作为选择题答案（A-H）
-        choice_matches = re.findall(r'(\d+)\s*[\.、]?\s*([A-Ha-h]+)', answer_block)
+        choice_matches = [(item.number, item.value) for item in items if item.kind == "choice"]
         # 3. 尝试作为其他答案
-        other_matches = re.findall(r'(\d+)\s*[\.、]?\s*([^0-9]+?)(?=\d+\s*[\.、]|$)', answer_block)
+        other_matches = [(item.number, item.payload) for item in items if item.payload is not None]
         
         # 判断这个答案块最可能属于哪种题型
         best_type = None
@@ -132,32 +218,28 @@ def extract_answers_from_same_text(text: str, questions: List[Question]) -> None
         # 如果成功识别了题型，就应用匹配
         if best_type and best_matches and best_type in type_groups:
             questions_of_type = type_groups[best_type]
-            for seq_str, ans_str in best_matches:
+            for seq, ans_str in best_matches:
                 try:
-                    seq = int(seq_str)
                     idx = seq - 1
                     if idx < len(questions_of_type):
                         ans = ans_str.strip().strip('（）() ')
                         q = questions_of_type[idx]
                         if not q.answer:
                             q.answer = ans
-                except (ValueError, IndexError):
+                except IndexError:
                     continue
 
 
-def extract_answers_by_type(with_ans_text: str, questions: List[Question]) -> None:
+def extract_answers_by_type(with_ans_text: str, questions: List[QuestionLike]) -> None:
     """从两份不同的文本中按题型分块提取答案"""
-    # 按题型分组题目，保持原顺序
-    type_groups = {}
-    type_order = []
-    for q in questions:
-        q_type = q.type or 'short'
-        if q_type not in type_groups:
-            type_groups[q_type] = []
-            type_order.append(q_type)
-        type_groups[q_type].append(q)
-    
-    # 提取答案块
+    with profiling.stage("align.extract_blocks"):
+        answer_blocks = _answer_blocks_by_type(with_ans_text)
+    with profiling.stage("align.match"):
+        _match_blocks_by_type(answer_blocks, questions)
+
+
+def _answer_blocks_by_type(with_ans_text: str) -> List[str]:
+    """提取含答案文本中的答案块（每个题型一块，按出现顺序）"""
     lines = with_ans_text.splitlines()
     answer_blocks = []
     
@@ -165,15 +247,15 @@ def extract_answers_by_type(with_ans_text: str, questions: List[Question]) -> No
     for i, line in enumerate(lines):
         stripped = line.strip()
         
-        if re.match(r'^(答案|参考答案)\s*[:：]?', stripped):
+        if ANSWER_PREFIX_PATTERN.match(stripped):
             if current_block.strip():
                 answer_blocks.append(current_block)
                 current_block = ""
             
-            content = re.sub(r'^(答案|参考答案)\s*[:：]?\s*', '', stripped)
+            content = ANSWER_PREFIX_STRIP_PATTERN.sub('', stripped)
             current_block = content
         elif current_block and stripped:
-            if re.match(r'^\d+[\.、]', stripped) or not re.match(r'^[一二三四五]', stripped):
+            if NUMBERED_LINE_PATTERN.match(stripped) or not SHORT_SECTION_START_PATTERN.match(stripped):
                 current_block += " " + stripped
             else:
                 if current_block.strip():
@@ -184,30 +266,37 @@ def extract_answers_by_type(with_ans_text: str, questions: List[Question]) -> No
     
     if current_block.strip():
         answer_blocks.append(current_block)
+
+    return answer_blocks
+
+
+def _match_blocks_by_type(answer_blocks: List[str], questions: List[QuestionLike]) -> None:
+    """第 i 个答案块对应第 i 种出现的题型，按题号写入答案"""
+    # 按题型分组题目，保持原顺序；同时建立 题号 -> 题目 索引（重复题号取第一个）
+    type_groups: Dict[str, Dict[int, QuestionLike]] = {}
+    type_order = []
+    for q in questions:
+        q_type = q.type or 'short'
+        if q_type not in type_groups:
+            type_groups[q_type] = {}
+            type_order.append(q_type)
+        type_groups[q_type].setdefault(q.id, q)
     
     # 按题型匹配
     for block_idx, q_type in enumerate(type_order):
         if block_idx >= len(answer_blocks):
             break
         
-        answer_text = answer_blocks[block_idx]
-        questions_of_type = type_groups[q_type]
+        items = tokenize_answer_block(answer_blocks[block_idx])
+        questions_by_id = type_groups[q_type]
         
-        if q_type == 'judge':
-            matches = re.findall(r'(\d+)\s*[\.、]\s*([×√对错])', answer_text)
-        elif q_type == 'choice':
-            matches = re.findall(r'(\d+)\s*[\.、]\s*([A-Ha-h]+)', answer_text)
+        if q_type in ('judge', 'choice'):
+            # 判断/选择答案要求题号后有分隔符（"1.√"、"2、A"）
+            matches = [(item.number, item.value) for item in items if item.kind == q_type and item.has_separator]
         else:
-            matches = re.findall(r'(\d+)\s*[\.、]?\s*([^0-9]+?)(?=\d+\s*[\.、]|$)', answer_text)
+            matches = [(item.number, item.payload) for item in items if item.payload is not None]
         
-        for qid_str, ans_str in matches:
-            try:
-                qid = int(qid_str)
-                ans = ans_str.strip().strip('（）() ')
-                for q in questions_of_type:
-                    if q.id == qid:
-                        if not q.answer:
-                            q.answer = ans
-                        break
-            except ValueError:
-                continue
+        for qid, ans_str in matches:
+            q = questions_by_id.get(qid)
+            if q is not None and not q.answer:
+                q.answer = ans_str.strip().strip('（）() ')
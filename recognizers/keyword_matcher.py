@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, Iterable, Mapping
+
+
+class KeywordMatcher:
+    """多类别关键词匹配器：一次扫描返回文本命中的全部关键词类别
+
+    所有关键词编译成一个按长度降序排列的交替正则（不区分大小写）。每个命中位置只报告最长的关键词，
+    因此每个关键词预先合并了"自身前缀也是关键词"的那些类别——同一位置上较短的关键词一定同时命中。
+    每次命中后从下一个字符继续搜索，重叠的关键词也不会遗漏。
+    """
+
+    def __init__(self, keyword_classes: Mapping[str, Iterable[str]]):
+        classes_by_keyword: Dict[str, set] = {}
+        for name, keywords in keyword_classes.items():
+            for keyword in keywords:
+                if keyword:
+                    classes_by_keyword.setdefault(keyword.lower(), set()).add(name)
+
+        ordered = sorted(classes_by_keyword, key=len, reverse=True)
+        # 没有关键词时使用永不匹配的模式
+        self._pattern = re.compile("|".join(re.escape(k) for k in ordered) or "(?!)", re.IGNORECASE)
+        self._classes: Dict[str, FrozenSet[str]] = {}
+        for keyword in ordered:
+            names = set()
+            for other, other_names in classes_by_keyword.items():
+                if keyword.startswith(other):
+                    names |= other_names
+            self._classes[keyword] = frozenset(names)
+
+    def find_classes(self, text: str) -> FrozenSet[str]:
+        """返回 text 中出现过的关键词所属类别集合"""
+        search = self._pattern.search
+        match = search(text)
+        if match is None:
+            return frozenset()
+        found: set = set()
+        while match is not None:
+            found |= self._classes[match.group().lower()]
+            match = search(text, match.start() + 1)
+        return frozenset(found)
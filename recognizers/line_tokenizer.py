@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable, Iterator, NamedTuple, Pattern, Tuple
+
+from config import OPTION_PATTERN, SECTION_PATTERN
+
+# 行类别
+SECTION = "section"  # 章节/题型标题（"第一章"、"一、选择题"），直接跳过
+ANSWER_HEADER = "answer_header"  # "答案："/"参考答案："/"答案要点：" 开头的行
+HEADING = "heading"  # "一、"、"二，" 等题型序号开头但不是标题的行：退出答案区域，其余按续行处理
+OPTIONS = "options"  # 选项行（A. / A、，支持同行多选项）
+NUMBERED = "numbered"  # 带题号的行（1. / 1) / 1、 / （1））
+TEXT = "text"  # 其他非空行（多行题干的续行）
+
+# 所有行类别合并为一个预编译的交替模式，每行只匹配一次；分支顺序即判定优先级
+LINE_PATTERN: Pattern[str] = re.compile(
+    rf"(?P<{SECTION}>{SECTION_PATTERN.pattern})"
+    rf"|(?P<{ANSWER_HEADER}>(?:答案|参考答案|答案要点)\s*[:：]\s*(?P<answer_body>.*)$)"
+    rf"|(?P<{HEADING}>[一二三四五六七八九十]+\s*[、，.])"
+    rf"|(?P<{OPTIONS}>{OPTION_PATTERN.pattern})"
+    rf"|(?P<{NUMBERED}>[（(]?\s*(?P<number>\d+)\s*[)）\.、]\s*(?P<stem>.+))"
+)
+# 同行多选项：在每个选项字母前切分
+OPTION_SPLIT_PATTERN: Pattern[str] = re.compile(r"(?=[A-Ha-h][\.、．\)）])")
+
+
+class LineToken(NamedTuple):
+    """一行文本的分类结果"""
+    kind: str
+    index: int  # 在 text.splitlines() 中的行号（用于查逐行格式表）
+    text: str  # 去除首尾空白后的行文本
+    number: int = 0  # NUMBERED：题号
+    body: str = ""  # NUMBERED：题干；ANSWER_HEADER：冒号后的内容
+    options: Tuple[str, ...] = ()  # OPTIONS：拆分出的各选项文本
+
+
+def _split_options(stripped: str) -> Tuple[str, ...]:
+    options = []
+    for part in OPTION_SPLIT_PATTERN.split(stripped):
+        seg = part.strip()
+        if not seg:
+            continue
+        opt_match = OPTION_PATTERN.match(seg)
+        if opt_match:
+            options.append(opt_match.group(1).strip())
+    return tuple(options)
+
+
+def tokenize_lines(lines: Iterable[str]) -> Iterator[LineToken]:
+    """逐行分类，跳过空行（行号仍按原始行计数）"""
+    match_line = LINE_PATTERN.match
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        match = match_line(stripped)
+        kind = match.lastgroup if match else TEXT
+        if kind == NUMBERED:
+            yield LineToken(NUMBERED, index, stripped, int(match.group("number")), match.group("stem").strip())
+        elif kind == OPTIONS:
+            yield LineToken(OPTIONS, index, stripped, options=_split_options(stripped))
+        elif kind == ANSWER_HEADER:
+            yield LineToken(ANSWER_HEADER, index, stripped, body=match.group("answer_body").strip())
+        else:
+            yield LineToken(kind, index, stripped)
@@ -2,26 +2,70 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
 from config import (
     ANSWER_LINE_PATTERN,
     CASE_KEYWORDS,
     COMPREHENSIVE_KEYWORDS,
     FILL_MARKERS,
+    FORMAT_BOLD,
+    FORMAT_STRIKE,
+    FORMAT_UNDERLINE,
     JUDGE_PATTERN,
     MULTI_CHOICE_KEYWORDS,
     MULTI_STEM_KEYWORDS,
-    OPTION_PATTERN,
     QUESTION_START_PATTERN,
-    SECTION_PATTERN,
-    SHORT_QUESTION_PREFIXES,
 )
+import profiling
+from models.type_index import TypeIndex
+from recognizers.keyword_matcher import KeywordMatcher
+from recognizers.line_tokenizer import ANSWER_HEADER, HEADING, NUMBERED, OPTIONS, SECTION, LineToken, tokenize_lines
 
 logger = logging.getLogger(__name__)
 
 QuestionDict = Dict[str, Optional[str]]
 
+# 题干中的"数字."对（答案要点行的特征）
+DIGIT_DOT_PATTERN = re.compile(r"\d+\s*[\.、]")
+# 单行串联多题（"7.xxx 8.xxx"）中非行首的题号
+EMBEDDED_NUMBER_PATTERN = re.compile(r"(?<!^)(?:\s|　)+(\d{1,3})[\.、]\s*")
+# 答案区域内带题号的行若含这些词，更像答案要点而不是新题目
+ANSWER_CONTENT_KEYWORDS = ("应对", "思路", "举措", "要点", "特点", "含义", "体现")
+
+# 题型关键词自动机：config 中的关键词表只编译一次
+TYPE_KEYWORD_MATCHER = KeywordMatcher({
+    "fill": FILL_MARKERS,
+    "comprehensive": COMPREHENSIVE_KEYWORDS,
+    "case": CASE_KEYWORDS,
+    # 长题干兜底时区分案例与综合
+    "scenario": ["案例", "情景", "情境"],
+})
+# 填空位置：引号中只有空格（支持 "" 和中文引号）
+QUOTED_BLANK_PATTERN = re.compile(r'[""\u201c](\s+)[""\u201d]')
+QUOTED_TEXT_PATTERN = re.compile(r'[""\u201c][^"""\u201c\u201d]+[""\u201d]')
+# 填空位置：汉字后的空格（后接汉字或中文标点）
+HAN_BLANK_PATTERN = re.compile(r'[\u4e00-\u9fff]\s+[\u4e00-\u9fff，。、；：！？）》]')
+MULTI_SPACE_PATTERN = re.compile(r'\s{2,}')
+# 逐行格式表：第 i 项为第 i 行的格式位（见 parsers.docx_parser.ParsedDocument.line_formats）
+FormatTable = Sequence[int]
+
+
+def _to_format_table(format_info: Union[FormatTable, Mapping[int, Dict], None]) -> FormatTable:
+    """兼容旧的 {行号: {'is_strike': bool, ...}} 形式，统一转换为逐行格式位表"""
+    if not format_info:
+        return b""
+    if not isinstance(format_info, Mapping):
+        return format_info
+    table = bytearray(max(format_info) + 1)
+    for idx, fmt in format_info.items():
+        table[idx] = (
+            (FORMAT_BOLD if fmt.get("is_bold") else 0)
+            | (FORMAT_STRIKE if fmt.get("is_strike") else 0)
+            | (FORMAT_UNDERLINE if fmt.get("is_underline") else 0)
+        )
+    return table
+
 
 def _detect_type(stem: str, options: List[str], has_multiple_correct: bool = False) -> str:
     """检测题型
@@ -39,15 +83,16 @@ def _detect_type(stem: str, options: List[str], has_multiple_correct: bool = Fal
     if JUDGE_PATTERN.search(stem):
         return 'judge'
     
-    stem_lower = stem.lower()
-    
-    if any(marker in stem for marker in FILL_MARKERS):
+    # 一次扫描得到题干命中的全部关键词类别
+    hits = TYPE_KEYWORD_MATCHER.find_classes(stem)
+
+    if "fill" in hits:
         return "fill"
 
     # 综合/案例类优先识别（含长度兜底增强）
-    if any(keyword.lower() in stem_lower for keyword in COMPREHENSIVE_KEYWORDS):
+    if "comprehensive" in hits:
         return "comprehensive"
-    if any(keyword.lower() in stem_lower for keyword in CASE_KEYWORDS):
+    if "case" in hits:
         return "case"
     
     # 新增：检测句中单独空格（列车运行题库的填空格式）
@@ -56,58 +101,113 @@ def _detect_type(stem: str, options: List[str], has_multiple_correct: bool = Fal
     # 3. 引号中的空格：例如"" "" 或 " " - 单独处理
     
     # 先检查引号中是否有空格（通常是填空位置）
-    # 支持多种引号：" " "" "" ' '
-    if re.search(r'[""\u201c](\s+)[""\u201d]', stem):
+    if QUOTED_BLANK_PATTERN.search(stem):
         return 'fill'
     
     # 再检查汉字后的空格（排除引号部分）
-    temp_stem = re.sub(r'[""\u201c][^"""\u201c\u201d]+[""\u201d]', '', stem)  # 移除引号内容
-    if re.search(r'[\u4e00-\u9fff]\s+[\u4e00-\u9fff，。、；：！？）》]', temp_stem):
+    temp_stem = QUOTED_TEXT_PATTERN.sub('', stem)  # 移除引号内容
+    if HAN_BLANK_PATTERN.search(temp_stem):
         return 'fill'
     
     # 检测连续多个空格
-    if re.search(r'\s{2,}', stem):
+    if MULTI_SPACE_PATTERN.search(stem):
         return 'fill'
 
-    # 语义关键词辅助判断
-    if any(keyword.lower() in stem_lower for keyword in CASE_KEYWORDS):
-        return "case"
-    if any(keyword.lower() in stem_lower for keyword in COMPREHENSIVE_KEYWORDS):
-        return "comprehensive"
-
     # 题干长度兜底：长段落优先认为是综合/案例，避免误判为简答
     if len(stem) >= 120:
-        if "案例" in stem or "情景" in stem or "情境" in stem:
+        if "scenario" in hits:
             return "case"
         return "comprehensive"
 
-    if any(stem.strip().startswith(prefix) for prefix in SHORT_QUESTION_PREFIXES):
-        return "short"
     return "short"
 
 
-def detect_questions(text: str, format_info: Optional[Dict] = None) -> List[Dict]:
+def detect_questions(text: str, format_info: Union[FormatTable, Mapping[int, Dict], None] = None) -> List[Dict]:
     """检测题目
     
     Args:
         text: 纯文本内容
-        format_info: 格式信息字典 {行号: {'is_strike': bool, 'is_bold': bool, ...}}
+        format_info: 逐行格式表（parse_docx_with_format 的 line_formats，每行一个格式位），
+            也兼容旧的 {行号: {'is_strike': bool, 'is_bold': bool, ...}} 字典
     """
-    lines = [line.rstrip() for line in text.splitlines()]
-    questions: List[Dict] = []
+    return detect_questions_with_index(text, format_info)[0]
+
+
+def detect_questions_with_index(
+    text: str,
+    format_info: Union[FormatTable, Mapping[int, Dict], None] = None,
+) -> Tuple[List[Dict], TypeIndex]:
+    """检测题目，同时建立题型索引（每道题提交时记录其下标，不需要再扫描/排序）"""
+    type_index = TypeIndex()
+    questions = list(iter_questions(text.splitlines(), format_info, type_index))
+    return questions, type_index
+
+
+def iter_questions(
+    lines: Iterable[str],
+    format_info: Union[FormatTable, Mapping[int, Dict], None] = None,
+    type_index: Optional[TypeIndex] = None,
+) -> Iterator[Dict]:
+    """流式检测题目：逐行消费，每提交一道题就立即产出
+
+    只持有当前正在拼接的一道题，行可以来自文件的逐行读取，不需要先得到全文。
+
+    Args:
+        lines: 行序列（如 text.splitlines()、parsers.text_parser.iter_text_lines）
+        format_info: 逐行格式表，按行号对应 lines
+        type_index: 传入时随产出记录每道题的题型和下标
+    """
+    format_table = _to_format_table(format_info)
+    format_len = len(format_table)
+    tokens = (
+        (token, format_table[token.index] if token.index < format_len else 0)
+        for token in profiling.wrap_iter("detect.classify", tokenize_lines(lines))
+    )
+    return _iter_detected(tokens, type_index)
+
+
+def iter_formatted_questions(
+    lines: Iterable[Tuple[str, int]],
+    type_index: Optional[TypeIndex] = None,
+) -> Iterator[Dict]:
+    """同 iter_questions，行与格式位成对输入（如 parsers.docx_parser.iter_docx_formatted_lines）"""
+    line_flags = 0
+
+    def texts() -> Iterator[str]:
+        nonlocal line_flags
+        for text, line_flags in lines:
+            yield text
+
+    # tokenize_lines 每读入一行就产出该行的分类结果，此时 line_flags 正是这一行的格式位
+    tokens = (
+        (token, line_flags)
+        for token in profiling.wrap_iter("detect.classify", tokenize_lines(texts()))
+    )
+    return _iter_detected(tokens, type_index)
+
+
+def _iter_detected(tokens: Iterable[Tuple[LineToken, int]], type_index: Optional[TypeIndex]) -> Iterator[Dict]:
+    """题目识别的状态机：输入 (行分类, 格式位)，按提交顺序产出题目"""
+    committed: List[Dict] = []  # 本次提交得到的题目（单行串联多题时不止一道）
+    position = 0
     current: Dict[str, Optional[str]] = {"id": 0, "type": None, "stem": None, "options": [], "emphasis": []}
     question_id = 1
-    format_info = format_info or {}
+    # 启用 --profile 时统计题型判定耗时，否则就是 _detect_type 本身
+    detect_type = profiling.wrap("detect.type", _detect_type)
+
+    def emit(question: Dict) -> None:
+        nonlocal position
+        if type_index is not None:
+            type_index.add(question["type"], position)
+        position += 1
+        committed.append(question)
 
     def commit_current():
         nonlocal question_id, current
         if current.get("stem"):
-            # 跳过有删除线的题目
-            if current.get("is_strike"):
-                logger.debug(f"Skipping question {question_id} (marked with strikethrough)")
-                current = {"id": 0, "type": None, "stem": None, "options": [], "emphasis": []}
-                return
-            
+            # 有删除线的题目不产出，但照常占用题号：答案按题号匹配，后面的题号不能前移
+            struck = bool(current.get("is_strike"))
+
             # 检测是否有多个正确答案的标记
             has_multiple_correct = any(
                 "多个" in str(e) or "都对" in str(e) 
@@ -122,7 +222,7 @@ def detect_questions(text: str, format_info: Optional[Dict] = None) -> List[Dict
                 return
 
             # 处理单行串联多题（如 "7.xxx 8.xxx 9.xxx"），避免题号跳过导致答案错位
-            embedded_nums = list(re.finditer(r"(?<!^)(?:\s|　)+(\d{1,3})[\.、]\s*", stem_text))
+            embedded_nums = list(EMBEDDED_NUMBER_PATTERN.finditer(stem_text))
             if embedded_nums and not current.get("options"):
                 parts = []
                 last_idx = 0
@@ -134,25 +234,33 @@ def detect_questions(text: str, format_info: Optional[Dict] = None) -> List[Dict
                 parts = [p for p in parts if p]
                 if len(parts) >= 2:
                     for part in parts:
-                        q_type = _detect_type(part, [], has_multiple_correct)
-                        questions.append({
-                            "id": question_id,
-                            "type": q_type,
-                            "stem": part,
-                            "options": None,
-                            "answer": None,
-                        })
+                        if struck:
+                            logger.debug("Skipping question %d (marked with strikethrough)", question_id)
+                        else:
+                            emit({
+                                "id": question_id,
+                                "type": detect_type(part, [], has_multiple_correct),
+                                "stem": part,
+                                "options": None,
+                                "answer": None,
+                            })
                         question_id += 1
                     current = {"id": 0, "type": None, "stem": None, "options": [], "emphasis": [], "is_strike": False}
                     return
             
+            if struck:
+                logger.debug("Skipping question %d (marked with strikethrough)", question_id)
+                question_id += 1
+                current = {"id": 0, "type": None, "stem": None, "options": [], "emphasis": [], "is_strike": False}
+                return
+
             current["id"] = question_id
-            current["type"] = _detect_type(
+            current["type"] = detect_type(
                 stem_text, 
                 current.get("options") or [],
                 has_multiple_correct
             )
-            questions.append({
+            emit({
                 "id": current["id"],
                 "type": current["type"],
                 "stem": stem_text,
@@ -162,66 +270,43 @@ def detect_questions(text: str, format_info: Optional[Dict] = None) -> List[Dict
             question_id += 1
         current = {"id": 0, "type": None, "stem": None, "options": [], "emphasis": [], "is_strike": False}
 
-    line_idx = 0
+    commit_current = profiling.wrap("detect.commit", commit_current)
     in_answer_section = False  # 标记是否在答案区域内
     
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            line_idx += 1
-            continue
-        
-        # 获取当前行的格式信息
-        line_format = format_info.get(line_idx, {})
-        is_strike = line_format.get("is_strike", False)
-        is_bold = line_format.get("is_bold", False)
-        is_underline = line_format.get("is_underline", False)
-        
+    for token, line_flags in tokens:
+        kind = token.kind
+
         # 过滤章节和题型标题
-        if SECTION_PATTERN.match(stripped):
-            line_idx += 1
+        if kind == SECTION:
             continue
         
         # 跳过答案行（不受格式影响）
         # 区分两种情况：
         # 1. "答案："或"答案要点："独立一行（后面几乎没内容） - 进入答案区域模式
         # 2. "答案：xxx"（后面有内容） - 只跳过这一行，不进入答案区域
-        answer_header_match = re.match(r'^\s*(答案|参考答案|答案要点)\s*[:：]\s*(.*)$', stripped)
-        if answer_header_match:
-            content_after = answer_header_match.group(2).strip()
-            if len(content_after) < 10:  # 内容很少，视为独立的答案块开始
+        if kind == ANSWER_HEADER:
+            if len(token.body) < 10:  # 内容很少，视为独立的答案块开始
                 in_answer_section = True  # 进入答案区域
-            line_idx += 1
             continue
         
         # 检测题型标记（"一、"、"二、"等），退出答案区域
-        if re.match(r'^[一二三四五六七八九十]+\s*[、，.]', stripped):
+        if kind == HEADING:
             in_answer_section = False  # 新题型开始，退出答案区域
 
         # 识别选项（支持 A. 和 A、，以及同行多选项）
-        option_match = OPTION_PATTERN.match(stripped)
-        if option_match and current.get("stem"):
-            # 支持同行多选项：用前瞻在每个选项前切分
-            parts = re.split(r'(?=[A-Ha-h][\.、．\)）])', stripped)
-            for part in parts:
-                seg = part.strip()
-                if not seg:
-                    continue
-                opt_match = re.match(r'^[A-Ha-h][\.、．\)）]\s*(.+)', seg)
-                if opt_match:
-                    opt_text = opt_match.group(1).strip()
-                    current["options"].append(opt_text)
-                    # 记录下划线的选项（要点标记）
-                    if is_underline:
-                        current["emphasis"].append(f"option:{opt_text}")
-            line_idx += 1
+        if kind == OPTIONS and current.get("stem"):
+            is_underline = bool(line_flags & FORMAT_UNDERLINE)
+            for opt_text in token.options:
+                current["options"].append(opt_text)
+                # 记录下划线的选项（要点标记）
+                if is_underline:
+                    current["emphasis"].append(f"option:{opt_text}")
             continue
 
         # 识别题号（支持 1. 1) 1、）
-        question_number_match = re.match(r"^\s*[（(]?\s*(\d+)\s*[)）\.、]\s*(.+)", line)
-        if question_number_match:
-            stem_text = question_number_match.group(2).strip()
-            seq_num = int(question_number_match.group(1))
+        if kind == NUMBERED:
+            stem_text = token.body
+            digit_dot_count = len(DIGIT_DOT_PATTERN.findall(stem_text))
             
             # 如果在答案区域内，检查是否应该退出答案区域
             if in_answer_section:
@@ -235,12 +320,10 @@ def detect_questions(text: str, format_info: Optional[Dict] = None) -> List[Dict
                 # - 包含判断题标记"（ ）"
                 # - 包含疑问词且较短
                 # - 末尾是"？"且不包含多个数字点
-                digit_dot_count = len(re.findall(r'\d+\s*[\.、]', stem_text))
                 has_judge_marker = '（ ）' in stem_text or '( )' in stem_text or '（　 ）' in stem_text
-                has_question_word = any(w in stem_text for w in ['什么', '哪', '如何', '为什么', '怎样', '多少', '简述', '试述', '论述'])
                 is_short_stem = len(stem_text) < 60
                 ends_with_question = stem_text.rstrip().endswith('？')
-                has_answer_keyword = any(w in stem_text for w in ['应对', '思路', '举措', '要点', '特点', '含义', '体现'])
+                has_answer_keyword = any(w in stem_text for w in ANSWER_CONTENT_KEYWORDS)
                 
                 # 明确的题目标记（优先级最高）
                 if has_judge_marker or (ends_with_question and is_short_stem):
@@ -249,33 +332,28 @@ def detect_questions(text: str, format_info: Optional[Dict] = None) -> List[Dict
                 # 模糊情况：结合多个特征判断
                 elif digit_dot_count >= 2 or has_answer_keyword:
                     # 包含多个数字点或答案关键词，可能是答案内容，跳过
-                    line_idx += 1
                     continue
             
             # 额外检查：如果题干本身包含太多个"数字.内容"对，像是答案行而不是题干
             # 答案行特征：连续的 "1.xxx 2.xxx 3.xxx ..." 至少5个
-            digit_dot_count = len(re.findall(r'\d+\s*[\.、]', stem_text))
             if digit_dot_count >= 5:
                 # 这看起来更像答案行而不是题干，跳过
-                line_idx += 1
                 continue
             
             commit_current()
+            if committed:
+                yield from committed
+                committed.clear()
             current["stem"] = stem_text
-            current["is_strike"] = is_strike
+            current["is_strike"] = bool(line_flags & FORMAT_STRIKE)
             # 记录加粗或下划线的题干（重点标记）
-            if is_bold or is_underline:
+            if line_flags & (FORMAT_BOLD | FORMAT_UNDERLINE):
                 current["emphasis"].append("stem_marked")
-            line_idx += 1
             continue
 
         # 如果当前有题干，继续追加文本（多行题干）
         if current.get("stem"):
-            current["stem"] += " " + stripped
-            line_idx += 1
-            continue
-        
-        line_idx += 1
+            current["stem"] += " " + token.text
 
     commit_current()
-    return questions
+    yield from committed
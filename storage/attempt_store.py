@@ -0,0 +1,252 @@
+"""答题记录与错题本的本地 SQLite 存储
+
+按 题库哈希 + 用户 + 题目 id 索引，重启后错题本仍在。写入先放进内存队列，
+由后台线程按批（攒够 ATTEMPT_FLUSH_SIZE 条或每隔 ATTEMPT_FLUSH_INTERVAL 秒）在一个事务里写入，
+界面提交答案时不等待磁盘。读取也不等待队列：刚写入的记录最多滞后 ATTEMPT_FLUSH_INTERVAL 秒可见，
+需要立即读到时先调用 flush()。
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import ATTEMPT_DB_PATH, ATTEMPT_FLUSH_INTERVAL, ATTEMPT_FLUSH_SIZE
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    bank TEXT NOT NULL,
+    user TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    type TEXT,
+    user_answer TEXT,
+    correct INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_by_question ON attempts (bank, user, question_id);
+
+CREATE TABLE IF NOT EXISTS wrong_answers (
+    bank TEXT NOT NULL,
+    user TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    number INTEGER,
+    type TEXT,
+    stem TEXT,
+    answer TEXT,
+    user_answer TEXT,
+    wrong_count INTEGER NOT NULL DEFAULT 1,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (bank, user, question_id)
+);
+CREATE INDEX IF NOT EXISTS wrong_answers_by_time ON wrong_answers (bank, user, updated_at);
+CREATE INDEX IF NOT EXISTS wrong_answers_by_type ON wrong_answers (bank, user, type, updated_at);
+
+-- 各题型错题数，由触发器随 wrong_answers 增删维护，统计时不必扫描错题
+CREATE TABLE IF NOT EXISTS wrong_type_counts (
+    bank TEXT NOT NULL,
+    user TEXT NOT NULL,
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (bank, user, type)
+);
+CREATE TRIGGER IF NOT EXISTS wrong_answers_count_insert AFTER INSERT ON wrong_answers BEGIN
+    INSERT INTO wrong_type_counts (bank, user, type, count) VALUES (NEW.bank, NEW.user, NEW.type, 1)
+    ON CONFLICT (bank, user, type) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS wrong_answers_count_delete AFTER DELETE ON wrong_answers BEGIN
+    UPDATE wrong_type_counts SET count = count - 1
+    WHERE bank = OLD.bank AND user = OLD.user AND type = OLD.type;
+END;
+"""
+
+_INSERT_ATTEMPT = (
+    "INSERT INTO attempts (bank, user, question_id, type, user_answer, correct, created_at)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+# 同一道题再次答错：更新本次答案并累计次数
+_UPSERT_WRONG = (
+    "INSERT INTO wrong_answers (bank, user, question_id, number, type, stem, answer, user_answer, updated_at)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT (bank, user, question_id) DO UPDATE SET"
+    " number = excluded.number, user_answer = excluded.user_answer,"
+    " wrong_count = wrong_count + 1, updated_at = excluded.updated_at"
+)
+_CLEAR_WRONG = "DELETE FROM wrong_answers WHERE bank = ? AND user = ?"
+# 队列中的控制项：要求写线程立即写入当前批次
+_FLUSH_NOW = ("", ())
+_WRONG_COLUMNS = ("question_id", "number", "type", "stem", "answer", "user_answer", "wrong_count")
+
+
+def _answer_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return "、".join(str(v) for v in value)
+    return str(value)
+
+
+class AttemptStore:
+    """答题记录 / 错题本存储（线程安全，多个会话共用一个实例）"""
+
+    def __init__(
+        self,
+        path: Path | str = ATTEMPT_DB_PATH,
+        flush_size: int = ATTEMPT_FLUSH_SIZE,
+        flush_interval: float = ATTEMPT_FLUSH_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._read_lock = threading.Lock()
+        self._reader = self._connect()
+        self._reader.executescript(SCHEMA)
+        # 队列元素：(SQL, 参数)；_FLUSH_NOW 要求立即写入，None 通知写线程退出
+        self._queue: "queue.Queue[Optional[Tuple[str, tuple]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="attempt-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ---- 写入（只入队，由后台线程批量落盘） ----
+
+    def record_attempt(
+        self,
+        bank: str,
+        user: str,
+        question_id: int,
+        q_type: Optional[str],
+        user_answer: Any,
+        correct: Optional[bool],
+    ) -> None:
+        self._queue.put((
+            _INSERT_ATTEMPT,
+            (bank, user, question_id, q_type, _answer_text(user_answer),
+             None if correct is None else int(correct), time.time()),
+        ))
+
+    def add_wrong(self, bank: str, user: str, entry: Dict[str, Any]) -> None:
+        """加入错题本（entry 的键同界面的错题条目：id/number/type/stem/answer/user_answer）"""
+        self._queue.put((
+            _UPSERT_WRONG,
+            (bank, user, entry["id"], entry.get("number"), entry.get("type") or "", entry.get("stem"),
+             _answer_text(entry.get("answer")), _answer_text(entry.get("user_answer")), time.time()),
+        ))
+
+    def clear_wrong(self, bank: str, user: str) -> None:
+        self._queue.put((_CLEAR_WRONG, (bank, user)))
+
+    def flush(self) -> None:
+        """让写线程立即写入当前这一批，并等待队列中已有的写入全部落盘"""
+        self._queue.put(_FLUSH_NOW)
+        self._queue.join()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch: List[Tuple[str, tuple]] = []
+            controls = 0  # 本轮取出的控制项（立即写入 / 退出）
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            # 攒一批：最多 flush_size 条，或等到 flush_interval 超时、收到控制项
+            while True:
+                if item is None or item is _FLUSH_NOW:
+                    controls += 1
+                    stopping = item is None
+                    break
+                batch.append(item)
+                if len(batch) >= self.flush_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self._write_batch(conn, batch)
+            finally:
+                for _ in range(len(batch) + controls):
+                    self._queue.task_done()
+        conn.close()
+
+    @staticmethod
+    def _write_batch(conn: sqlite3.Connection, batch: List[Tuple[str, tuple]]) -> None:
+        try:
+            conn.execute("BEGIN")
+            # 连续的同类语句合并为一次 executemany（保持先后顺序）
+            start = 0
+            for end in range(1, len(batch) + 1):
+                if end == len(batch) or batch[end][0] != batch[start][0]:
+                    conn.executemany(batch[start][0], [params for _, params in batch[start:end]])
+                    start = end
+            conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            logger.error("Failed to write %d attempt records: %s", len(batch), exc)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+
+    # ---- 读取 ----
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        """只读已落盘的数据，不等待写队列（界面每次重绘都会读取，不能把写入拖到请求路径上）"""
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def wrong_counts_by_type(self, bank: str, user: str) -> Dict[str, int]:
+        """各题型的错题数（读计数表，与错题本大小无关；无题型的键为 ""）"""
+        rows = self._query(
+            "SELECT type, count FROM wrong_type_counts WHERE bank = ? AND user = ? AND count > 0",
+            (bank, user),
+        )
+        return dict(rows)
+
+    def wrong_count(self, bank: str, user: str, q_type: Optional[str] = None) -> int:
+        counts = self.wrong_counts_by_type(bank, user)
+        return sum(counts.values()) if q_type is None else counts.get(q_type, 0)
+
+    def wrong_page(
+        self,
+        bank: str,
+        user: str,
+        offset: int = 0,
+        limit: int = 20,
+        q_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """一页错题（最近答错的在前）"""
+        columns = ", ".join(_WRONG_COLUMNS)
+        where = "bank = ? AND user = ?" + (" AND type = ?" if q_type is not None else "")
+        params = (bank, user) + ((q_type,) if q_type is not None else ())
+        rows = self._query(
+            f"SELECT {columns} FROM wrong_answers WHERE {where}"
+            " ORDER BY updated_at DESC, question_id LIMIT ? OFFSET ?",
+            params + (limit, offset),
+        )
+        return [dict(zip(_WRONG_COLUMNS, row)) for row in rows]
+
+    def attempt_count(self, bank: str, user: str) -> int:
+        rows = self._query("SELECT COUNT(*) FROM attempts WHERE bank = ? AND user = ?", (bank, user))
+        return rows[0][0]
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+
+    def __enter__(self) -> "AttemptStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
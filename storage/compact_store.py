@@ -0,0 +1,327 @@
+"""列式的紧凑题库格式（.qbank），可内存映射、按需读取单道题
+
+    python -m storage.compact_store to-compact data/processed/questions.json data/processed/questions.qbank
+    python -m storage.compact_store to-json data/processed/questions.qbank out.json
+
+文件布局（小端序，各列按 8 字节对齐）：
+
+    头部    magic "ARQB" | 版本 u16 | 保留 u16 | 题数 u32 | 字符串数 u32 | 元数据偏移 u64 | 元数据长度 u64
+    ids         int64[题数]
+    type        uint8[题数]     题型编码，编码表见元数据 types
+    stem        int32[题数]     题干在字符串表中的序号
+    answer      int32[题数]     答案序号，-1 表示无答案
+    opt_start   int32[题数]     第一个选项的序号
+    opt_count   int32[题数]     选项个数，-1 表示 options 为 None
+    str_offsets uint64[字符串数 + 1]
+    blob        全部字符串的 UTF-8 字节
+    元数据      JSON：各列的偏移/长度、题型编码表、各题型题数、内容哈希
+
+打开时只映射文件并读取头部和元数据，get(i) 只解码第 i 道题用到的字符串，
+启动耗时和常驻内存与题库大小无关（页面由操作系统按需载入）。
+内容哈希在写入时顺带计算，界面用它作题库标识，不必打开时再哈希整个文件。
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from models.question import QuestionLike, question_dict
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ARQB"
+STORE_VERSION = 1
+STORE_SUFFIX = ".qbank"
+_HEADER = struct.Struct("<4sHHIIQQ")
+_ALIGN = 8
+# 列名 -> array 类型码（按写入顺序）
+_COLUMNS = (
+    ("ids", "q"),
+    ("type", "B"),
+    ("stem", "i"),
+    ("answer", "i"),
+    ("opt_start", "i"),
+    ("opt_count", "i"),
+    ("str_offsets", "Q"),
+)
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _pad(stream, position: int) -> int:
+    padding = -position % _ALIGN
+    stream.write(b"\0" * padding)
+    return position + padding
+
+
+def write_compact_store(questions: Iterable[Union[QuestionLike, Dict[str, Any]]], path: Path | str) -> int:
+    """把题目写成 .qbank 文件，返回题数
+
+    字符串在写入过程中先落到临时文件，内存中只保留每道题的几个整数列。
+    """
+    columns: Dict[str, array] = {name: array(code) for name, code in _COLUMNS}
+    columns["str_offsets"].append(0)
+    type_codes: Dict[str, int] = {}
+    type_counts: Dict[str, int] = {}
+    string_count = 0
+    blob_size = 0
+
+    output_path = Path(path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    try:
+        with tempfile.TemporaryFile() as blob:
+            def add_string(text: str) -> int:
+                nonlocal string_count, blob_size
+                data = str(text).encode("utf-8")
+                blob.write(data)
+                blob_size += len(data)
+                columns["str_offsets"].append(blob_size)
+                string_count += 1
+                return string_count - 1
+
+            for question in questions:
+                q = question_dict(question)
+                q_type = q.get("type") or ""
+                if q_type not in type_codes:
+                    if len(type_codes) > 255:
+                        raise ValueError("Too many question types for the compact store")
+                    type_codes[q_type] = len(type_codes)
+                type_counts[q_type] = type_counts.get(q_type, 0) + 1
+                columns["ids"].append(int(q.get("id") or 0))
+                columns["type"].append(type_codes[q_type])
+                columns["stem"].append(add_string(q.get("stem") or ""))
+                answer = q.get("answer")
+                columns["answer"].append(-1 if answer is None else add_string(answer))
+                options = q.get("options")
+                columns["opt_start"].append(string_count)
+                columns["opt_count"].append(-1 if options is None else len(options))
+                for option in options or ():
+                    add_string(option)
+
+            count = len(columns["ids"])
+            digest = hashlib.sha256()
+            with tmp.open("wb") as out:
+                position = out.write(b"\0" * _HEADER.size)
+                layout: Dict[str, List[int]] = {}
+                for name, _ in _COLUMNS:
+                    position = _pad(out, position)
+                    column = columns[name]
+                    if not _LITTLE_ENDIAN:
+                        column.byteswap()
+                    data = column.tobytes()
+                    digest.update(data)
+                    layout[name] = [position, len(data)]
+                    position += out.write(data)
+                position = _pad(out, position)
+                layout["blob"] = [position, blob_size]
+                blob.seek(0)
+                for chunk in iter(lambda: blob.read(1024 * 1024), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+                position += blob_size
+                types = sorted(type_codes, key=type_codes.get)
+                digest.update(json.dumps(types, ensure_ascii=False).encode("utf-8"))
+
+                meta = json.dumps(
+                    {
+                        "columns": layout,
+                        "types": types,
+                        "type_counts": type_counts,
+                        "digest": digest.hexdigest(),
+                    },
+                    ensure_ascii=False,
+                ).encode("utf-8")
+                out.write(meta)
+                out.seek(0)
+                out.write(_HEADER.pack(MAGIC, STORE_VERSION, 0, count, string_count, position, len(meta)))
+        os.replace(tmp, output_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return count
+
+
+class CompactQuestionStore:
+    """只读的 .qbank 题库：按下标取题时才解码对应的字符串
+
+    支持 len()、下标访问（返回与 JSON 中相同结构的 dict）和迭代，可以当作只读的题目列表使用。
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, _, count, string_count, meta_offset, meta_len = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Not a compact question store: {path}")
+            if version != STORE_VERSION:
+                raise ValueError(f"Unsupported compact store version {version}: {path}")
+            meta = json.loads(self._mm[meta_offset:meta_offset + meta_len])
+        except BaseException:
+            self.close()
+            raise
+
+        self._count = count
+        self._types: List[str] = meta["types"]
+        self._type_counts: Dict[str, int] = meta["type_counts"]
+        self._digest: Optional[str] = meta.get("digest")
+        self._view = memoryview(self._mm)
+        layout = meta["columns"]
+        self._columns = {name: self._column(layout[name], code) for name, code in _COLUMNS}
+        self._blob_offset = layout["blob"][0]
+
+    def _column(self, span: List[int], code: str):
+        offset, size = span
+        raw = self._view[offset:offset + size]
+        if _LITTLE_ENDIAN:
+            return raw.cast(code)
+        column = array(code, raw.tobytes())
+        column.byteswap()
+        return column
+
+    def _string(self, index: int) -> str:
+        offsets = self._columns["str_offsets"]
+        start = self._blob_offset + offsets[index]
+        end = self._blob_offset + offsets[index + 1]
+        return str(self._mm[start:end], "utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("question index out of range")
+        columns = self._columns
+        answer = columns["answer"][index]
+        option_count = columns["opt_count"][index]
+        option_start = columns["opt_start"][index]
+        return {
+            "id": columns["ids"][index],
+            "type": self.type_of(index),
+            "stem": self._string(columns["stem"][index]),
+            "options": None if option_count < 0 else [self._string(option_start + k) for k in range(option_count)],
+            "answer": None if answer < 0 else self._string(answer),
+        }
+
+    get = __getitem__
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._count):
+            yield self[index]
+
+    def type_of(self, index: int) -> Optional[str]:
+        """只读题型列，不解码题干"""
+        return self._types[self._columns["type"][index]] or None
+
+    def iter_types(self) -> Iterator[Optional[str]]:
+        types = self._types
+        return ((types[code] or None) for code in self._columns["type"])
+
+    def iter_ids(self) -> Iterator[int]:
+        """只读题目 id 列，不解码题干"""
+        return iter(self._columns["ids"])
+
+    def type_counts(self) -> Dict[str, int]:
+        """各题型题数（写入时统计，存于元数据）"""
+        return {t: n for t, n in self._type_counts.items() if t}
+
+    @property
+    def digest(self) -> Optional[str]:
+        """写入时计算的内容哈希（旧版本写出的文件没有，为 None）"""
+        return self._digest
+
+    def close(self) -> None:
+        for column in getattr(self, "_columns", {}).values():
+            if isinstance(column, memoryview):
+                column.release()
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "CompactQuestionStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_compact_store(path: Path | str) -> Optional[CompactQuestionStore]:
+    try:
+        return CompactQuestionStore(path)
+    except (OSError, ValueError, struct.error) as exc:
+        logger.error("Failed to open compact store %s: %s", path, exc)
+        return None
+
+
+def _iter_json_questions(path: Path) -> Iterator[Dict[str, Any]]:
+    """读取 JSON 数组或 JSON Lines（.jsonl 逐行读取）"""
+    with path.open("r", encoding="utf-8") as f:
+        if path.suffix.lower() == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def iter_bank_file(path: Path | str) -> Iterator[Dict[str, Any]]:
+    """逐题读取已生成的题库文件：.qbank / JSON 数组 / JSON Lines"""
+    path = Path(path)
+    if path.suffix.lower() == STORE_SUFFIX:
+        with CompactQuestionStore(path) as store:
+            yield from store
+    else:
+        yield from _iter_json_questions(path)
+
+
+def json_to_compact(json_path: Path | str, store_path: Path | str) -> int:
+    """JSON / JSON Lines 题库 → .qbank"""
+    return write_compact_store(_iter_json_questions(Path(json_path)), store_path)
+
+
+def compact_to_json(store_path: Path | str, json_path: Path | str, fmt: str = "json", compact: bool = False) -> int:
+    """.qbank → JSON / JSON Lines 题库（与导出的 JSON 格式一致）"""
+    from pipeline.exporter import export_questions
+
+    with CompactQuestionStore(store_path) as store:
+        return export_questions(iter(store), json_path, fmt, compact)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="JSON 题库与紧凑题库格式（.qbank）互相转换")
+    sub = parser.add_subparsers(dest="command", required=True)
+    to_compact = sub.add_parser("to-compact", help="JSON / JSON Lines → .qbank")
+    to_compact.add_argument("source")
+    to_compact.add_argument("target")
+    to_json = sub.add_parser("to-json", help=".qbank → JSON / JSON Lines")
+    to_json.add_argument("source")
+    to_json.add_argument("target")
+    to_json.add_argument("--format", dest="export_format", choices=("json", "jsonl"), default="json")
+    to_json.add_argument("--compact", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "to-compact":
+        count = json_to_compact(args.source, args.target)
+    else:
+        count = compact_to_json(args.source, args.target, args.export_format, args.compact)
+    print(f"{args.source} → {args.target}（{count} 道题）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
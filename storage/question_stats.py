@@ -0,0 +1,260 @@
+"""逐题统计：作答次数、答对次数、错选选项分布、平均作答用时
+
+每判一次分增量更新内存中的计数列（array），不必从答题记录重新统计；
+每个题库一个二进制文件（data/stats/<题库哈希>.qstats），按题目 id 索引。
+
+文件布局（小端序）：
+
+    头部    magic "ARQS" | 版本 u16 | 选项槽数 u16 | 题数 u32
+    ids          int64[题数]
+    attempts     int64[题数]       判分的作答次数
+    correct      int64[题数]       答对次数
+    timed        int64[题数]       计入用时的作答次数
+    seconds      float64[题数]     计入的用时总和（秒）
+    wrong_option int64[题数 × 选项槽数]   答错时选了第 k 个选项的次数
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from config import STATS_DIR, STATS_MAX_ANSWER_SECONDS, STATS_SAVE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ARQS"
+STATS_VERSION = 1
+STATS_SUFFIX = ".qstats"
+OPTION_SLOTS = 8  # 选项 A~H
+JUDGE_OPTIONS = ("对", "错")  # 判断题按这两个"选项"统计错选
+_HEADER = struct.Struct("<4sHHI")
+# 列名 -> array 类型码（按写入顺序）
+_COLUMNS = (
+    ("ids", "q"),
+    ("attempts", "q"),
+    ("correct", "q"),
+    ("timed", "q"),
+    ("seconds", "d"),
+    ("wrong_option", "q"),
+)
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def option_indices(answer: Any, options: Optional[Sequence[str]]) -> List[int]:
+    """作答选中的选项下标：按选项文本匹配，单个字母 A~H 按字母；匹配不上的忽略"""
+    if answer is None or not options:
+        return []
+    chosen = answer if isinstance(answer, (list, tuple)) else [answer]
+    texts = [str(option).strip() for option in options]
+    indices: List[int] = []
+    for item in chosen:
+        item = str(item).strip()
+        if item in texts:
+            indices.append(texts.index(item))
+        elif len(item) == 1 and "A" <= item.upper() < chr(ord("A") + len(texts)):
+            indices.append(ord(item.upper()) - ord("A"))
+    return indices
+
+
+class BankStats:
+    """一个题库的逐题计数（列式存储，题目 id -> 行号）"""
+
+    def __init__(self, columns: Optional[Dict[str, array]] = None):
+        self._columns: Dict[str, array] = columns or {name: array(code) for name, code in _COLUMNS}
+        self._rows: Dict[int, int] = {qid: row for row, qid in enumerate(self._columns["ids"])}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _row(self, question_id: int) -> int:
+        row = self._rows.get(question_id)
+        if row is None:
+            row = self._rows[question_id] = len(self._rows)
+            for name, _ in _COLUMNS:
+                column = self._columns[name]
+                if name == "ids":
+                    column.append(question_id)
+                elif name == "wrong_option":
+                    column.extend([0] * OPTION_SLOTS)
+                else:
+                    column.append(0)
+        return row
+
+    def record(
+        self,
+        question_id: int,
+        correct: bool,
+        chosen: Iterable[int] = (),
+        seconds: Optional[float] = None,
+    ) -> None:
+        """记一次判分：chosen 为作答选中的选项下标（只在答错时计入错选分布），seconds 为作答用时"""
+        columns = self._columns
+        row = self._row(question_id)
+        columns["attempts"][row] += 1
+        if correct:
+            columns["correct"][row] += 1
+        else:
+            base = row * OPTION_SLOTS
+            for index in chosen:
+                if 0 <= index < OPTION_SLOTS:
+                    columns["wrong_option"][base + index] += 1
+        # 超过上限的视为离开了页面，只计次数不计用时
+        if seconds is not None and 0 <= seconds <= STATS_MAX_ANSWER_SECONDS:
+            columns["timed"][row] += 1
+            columns["seconds"][row] += seconds
+
+    def _summary(self, row: int) -> Dict[str, Any]:
+        columns = self._columns
+        attempts = columns["attempts"][row]
+        timed = columns["timed"][row]
+        base = row * OPTION_SLOTS
+        histogram = columns["wrong_option"][base:base + OPTION_SLOTS]
+        return {
+            "id": columns["ids"][row],
+            "attempts": attempts,
+            "correct": columns["correct"][row],
+            "accuracy": columns["correct"][row] / attempts if attempts else 0.0,
+            "wrong_options": {index: count for index, count in enumerate(histogram) if count},
+            "mean_seconds": columns["seconds"][row] / timed if timed else None,
+        }
+
+    def get(self, question_id: int) -> Optional[Dict[str, Any]]:
+        row = self._rows.get(question_id)
+        return None if row is None else self._summary(row)
+
+    def hardest(self, limit: int = 10, min_attempts: int = 1) -> List[Dict[str, Any]]:
+        """正确率最低的 limit 道题（同正确率时作答多的在前），只看作答不少于 min_attempts 次的题"""
+        attempts = self._columns["attempts"]
+        correct = self._columns["correct"]
+        rows = (row for row in range(len(attempts)) if attempts[row] >= max(min_attempts, 1))
+        ranked = heapq.nsmallest(limit, rows, key=lambda row: (correct[row] / attempts[row], -attempts[row], row))
+        return [self._summary(row) for row in ranked]
+
+    # ---- 持久化 ----
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(MAGIC, STATS_VERSION, OPTION_SLOTS, len(self._rows))]
+        for name, _ in _COLUMNS:
+            column = self._columns[name]
+            if not _LITTLE_ENDIAN:
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BankStats":
+        magic, version, slots, count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a question stats file")
+        if version != STATS_VERSION or slots != OPTION_SLOTS:
+            raise ValueError(f"Unsupported question stats version {version} ({slots} option slots)")
+        columns: Dict[str, array] = {}
+        position = _HEADER.size
+        for name, code in _COLUMNS:
+            column = array(code)
+            size = count * (OPTION_SLOTS if name == "wrong_option" else 1) * column.itemsize
+            column.frombytes(data[position:position + size])
+            if not _LITTLE_ENDIAN:
+                column.byteswap()
+            columns[name] = column
+            position += size
+        if position != len(data):
+            raise ValueError("Truncated question stats file")
+        return cls(columns)
+
+    def save(self, path: Path | str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "BankStats":
+        """读取统计文件；不存在或已损坏时从空统计开始"""
+        path = Path(path)
+        try:
+            return cls.from_bytes(path.read_bytes())
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, struct.error) as exc:
+            logger.warning("Ignoring unreadable question stats %s: %s", path, exc)
+            return cls()
+
+
+class QuestionStatsStore:
+    """各题库的逐题统计（线程安全，多个会话共用一个实例）
+
+    判分时只更新内存中的计数；距上次写盘超过 save_interval 秒时顺带把改动过的题库写回文件，
+    flush() / close() 立即写回。
+    """
+
+    def __init__(self, directory: Path | str = STATS_DIR, save_interval: float = STATS_SAVE_INTERVAL):
+        self.directory = Path(directory)
+        self.save_interval = save_interval
+        self._banks: Dict[str, BankStats] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        self._saved_at = time.monotonic()
+
+    def _path(self, bank: str) -> Path:
+        return self.directory / f"{bank}{STATS_SUFFIX}"
+
+    def _bank(self, bank: str) -> BankStats:
+        stats = self._banks.get(bank)
+        if stats is None:
+            stats = self._banks[bank] = BankStats.load(self._path(bank))
+        return stats
+
+    def record(
+        self,
+        bank: str,
+        question_id: int,
+        correct: bool,
+        chosen: Iterable[int] = (),
+        seconds: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            self._bank(bank).record(question_id, correct, chosen, seconds)
+            self._dirty.add(bank)
+            if time.monotonic() - self._saved_at >= self.save_interval:
+                self._save_dirty()
+
+    def get(self, bank: str, question_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._bank(bank).get(question_id)
+
+    def hardest(self, bank: str, limit: int = 10, min_attempts: int = 1) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._bank(bank).hardest(limit, min_attempts)
+
+    def _save_dirty(self) -> None:
+        for bank in self._dirty:
+            try:
+                self._banks[bank].save(self._path(bank))
+            except OSError as exc:
+                logger.error("Failed to save question stats for %s: %s", bank, exc)
+        self._dirty.clear()
+        self._saved_at = time.monotonic()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._save_dirty()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "QuestionStatsStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -54,3 +54,26 @@ def test_json_serialization(tmp_path: Path):
     tmp_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
     loaded = json.loads(tmp_file.read_text(encoding="utf-8"))
     assert loaded[0]["stem"].startswith("Python")
+
+
+def test_tokenize_answer_block_single_pass():
+    from recognizers.answer_aligner import tokenize_answer_block
+
+    items = tokenize_answer_block("1.√ 2、AB 3 牵引力 4.对")
+    assert [(i.number, i.kind, i.value) for i in items] == [
+        (1, "judge", "√"),
+        (2, "choice", "AB"),
+        (3, "text", ""),
+        (4, "judge", "对"),
+    ]
+    assert [i.has_separator for i in items] == [True, True, False, True]
+    assert items[2].payload == "牵引力 "
+
+
+def test_align_answers_by_type_uses_question_ids():
+    without = "\n".join(f"{i}. 第{i}题（ ）" for i in range(1, 201))
+    with_ans = without + "\n答案：" + " ".join(f"{i}.{'√' if i % 2 else '×'}" for i in range(200, 0, -1))
+    questions = align_answers(with_ans, without)
+    assert len(questions) == 200
+    assert questions[0].answer == "√"
+    assert questions[199].answer == "×"
@@ -0,0 +1,69 @@
+import sqlite3
+from pathlib import Path
+
+from storage.attempt_store import AttemptStore
+
+
+def _entry(qid, q_type="judge", user_answer="对"):
+    return {"id": qid, "number": qid, "type": q_type, "stem": f"第{qid}题", "answer": "错", "user_answer": user_answer}
+
+
+def test_wrong_book_upserts_and_pages(tmp_path: Path):
+    with AttemptStore(tmp_path / "a.sqlite3", flush_size=4, flush_interval=60) as store:
+        for qid in range(1, 26):
+            store.add_wrong("bank", "alice", _entry(qid, "fill" if qid % 5 == 0 else "judge"))
+        store.add_wrong("bank", "alice", _entry(3, user_answer=["A", "B"]))
+        store.add_wrong("bank", "bob", _entry(1))
+        store.flush()
+
+        assert store.wrong_count("bank", "alice") == 25
+        assert store.wrong_count("bank", "alice", "fill") == 5
+        assert store.wrong_count("other", "alice") == 0
+        first = store.wrong_page("bank", "alice", 0, 10)
+        assert len(first) == 10
+        assert first[0]["question_id"] == 3
+        assert first[0]["wrong_count"] == 2
+        assert first[0]["user_answer"] == "A、B"
+        pages = [item["question_id"] for offset in (0, 10, 20) for item in store.wrong_page("bank", "alice", offset, 10)]
+        assert sorted(pages) == list(range(1, 26))
+        assert [i["question_id"] for i in store.wrong_page("bank", "alice", 0, 10, "fill")] == [25, 20, 15, 10, 5]
+
+        store.clear_wrong("bank", "alice")
+        store.flush()
+        assert store.wrong_count("bank", "alice") == 0
+        assert store.wrong_count("bank", "bob") == 1
+
+
+def test_attempts_are_batched_and_survive_restart(tmp_path: Path):
+    path = tmp_path / "a.sqlite3"
+    store = AttemptStore(path, flush_size=1000, flush_interval=60)
+    for qid in range(50):
+        store.record_attempt("bank", "alice", qid, "choice", "A", qid % 2 == 0)
+    store.record_attempt("bank", "alice", 50, "short", "略", None)
+    # 尚未攒够一批：写线程还没有提交，读取也不等待队列
+    assert sqlite3.connect(str(path)).execute("SELECT COUNT(*) FROM attempts").fetchone()[0] == 0
+    assert store.attempt_count("bank", "alice") == 0
+    store.flush()
+    assert store.attempt_count("bank", "alice") == 51
+    store.close()
+
+    with AttemptStore(path) as reopened:
+        assert reopened.attempt_count("bank", "alice") == 51
+        rows = sqlite3.connect(str(path)).execute("SELECT correct FROM attempts WHERE question_id >= 49").fetchall()
+        assert rows == [(0,), (None,)]
+
+
+def test_type_counts_follow_inserts_and_deletes(tmp_path: Path):
+    path = tmp_path / "a.sqlite3"
+    with AttemptStore(path) as store:
+        for qid, q_type in enumerate(["judge", "judge", "fill", None]):
+            store.add_wrong("bank", "alice", _entry(qid, q_type))
+        store.add_wrong("bank", "alice", _entry(0, "judge"))  # 再次答错不改变题数
+        store.flush()
+        assert store.wrong_counts_by_type("bank", "alice") == {"judge": 2, "fill": 1, "": 1}
+        assert store.wrong_count("bank", "alice", "") == 1
+        assert [i["question_id"] for i in store.wrong_page("bank", "alice", q_type="")] == [3]
+        store.clear_wrong("bank", "alice")
+        store.flush()
+        assert store.wrong_counts_by_type("bank", "alice") == {}
+
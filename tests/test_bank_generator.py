@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from benchmarks.bank_generator import generate_bank, load_truth
+from parsers.loader import load_document
+from pipeline.batch import pair_bank_files
+from recognizers.answer_aligner import align_answers
+
+
+def _aligned(files, fmt):
+    with_doc = load_document(str(files.with_answers[fmt]), use_cache=False)
+    without_doc = load_document(str(files.without_answers[fmt]), use_cache=False)
+    return align_answers(with_doc.text, without_doc.text, without_doc.line_formats)
+
+
+def test_generated_pair_matches_ground_truth(tmp_path: Path):
+    files = generate_bank(tmp_path, 60, seed=3)
+    truth = load_truth(files.truth)
+
+    assert files.questions == len(truth) == 60
+    assert [job.name for job in pair_bank_files(tmp_path)] == ["synthetic_docx", "synthetic_txt"]
+    for fmt in ("txt", "docx"):
+        questions = _aligned(files, fmt)
+        assert [(q.id, q.type, q.stem, q.options, q.answer) for q in questions] == [
+            (t["id"], t["type"], t["stem"], t["options"], t["answer"]) for t in truth
+        ]
+
+
+def test_struck_questions_are_filtered_from_docx(tmp_path: Path):
+    files = generate_bank(tmp_path, 80, formats=["docx"], seed=1, strike_ratio=0.2)
+    truth = load_truth(files.truth)
+    kept = [t for t in truth if not t["struck"]]
+
+    assert 0 < len(kept) < len(truth)
+    questions = _aligned(files, "docx")
+    # 删除线题目照常占用题号，保留下来的题目 id 不变、答案按题号对齐
+    assert [(q.id, q.stem, q.answer) for q in questions] == [(t["id"], t["stem"], t["answer"]) for t in kept]
+    assert [q.id for q in questions] == [t["number"] for t in kept]
+    assert all(q.answer for q in questions)
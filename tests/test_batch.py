@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+from pipeline.batch import SUMMARY_FILENAME, BankJob, pair_bank_files, run_batch
+
+BANK = "一、判断题\n1. 列车制动距离与初速度有关（ ）\n2. 闸瓦压力越大越好（ ）\n"
+
+
+def test_pair_bank_files(tmp_path: Path):
+    for name in ["列车.docx", "列车（无答案）.docx", "企业管理.docx", "运营(无答案).txt", "notes.md"]:
+        (tmp_path / name).write_bytes(b"")
+
+    jobs = pair_bank_files(tmp_path)
+
+    assert jobs == [
+        BankJob("企业管理", str(tmp_path / "企业管理.docx"), str(tmp_path / "企业管理.docx")),
+        BankJob("列车", str(tmp_path / "列车.docx"), str(tmp_path / "列车（无答案）.docx")),
+        BankJob("运营(无答案)", None, str(tmp_path / "运营(无答案).txt")),
+    ]
+
+
+def test_same_stem_in_different_formats_gets_unique_names(tmp_path: Path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "制动.docx").write_bytes(b"")
+    (raw / "制动.txt").write_text(BANK, encoding="utf-8")
+    (raw / "牵引.txt").write_text(BANK, encoding="utf-8")
+
+    assert [job.name for job in pair_bank_files(raw)] == ["制动_docx", "制动_txt", "牵引"]
+
+    out = tmp_path / "processed"
+    run_batch(raw, out, workers=1, use_cache=False)
+    assert (out / "制动_txt.json").exists() and not (out / "制动.json").exists()
+
+
+def test_run_batch_writes_bank_and_summary(tmp_path: Path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "制动（无答案）.txt").write_text(BANK, encoding="utf-8")
+    (raw / "制动.txt").write_text(BANK + "答案：1.√ 2.×\n", encoding="utf-8")
+    out = tmp_path / "processed"
+
+    summary = run_batch(raw, out, workers=1, use_cache=False)
+
+    assert summary["failed"] == 0
+    assert summary["total_questions"] == 2
+    bank = json.loads((out / "制动.json").read_text(encoding="utf-8"))
+    assert [q["answer"] for q in bank] == ["√", "×"]
+    assert json.loads((out / SUMMARY_FILENAME).read_text(encoding="utf-8"))["banks"][0]["name"] == "制动"
+
+
+def test_run_batch_skips_unchanged_banks(tmp_path: Path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "制动.txt").write_text(BANK, encoding="utf-8")
+    (raw / "牵引.txt").write_text(BANK, encoding="utf-8")
+    out = tmp_path / "processed"
+    run_batch(raw, out, workers=1, use_cache=False)
+
+    (raw / "牵引.txt").write_text(BANK + "3. 新增题目（ ）\n", encoding="utf-8")
+    summary = run_batch(raw, out, workers=1, use_cache=False)
+
+    by_name = {r["name"]: r for r in summary["banks"]}
+    assert by_name["制动"]["skipped"] is True
+    assert by_name["牵引"]["questions"] == 3
+    assert summary["skipped"] == 1
+
+    forced = run_batch(raw, out, workers=1, use_cache=False, force=True)
+    assert forced["skipped"] == 0
+
+
+def test_run_batch_rebuilds_when_export_format_changes(tmp_path: Path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "制动.txt").write_text(BANK, encoding="utf-8")
+    out = tmp_path / "processed"
+    run_batch(raw, out, workers=1, use_cache=False)
+
+    summary = run_batch(raw, out, workers=1, use_cache=False, export_format="jsonl", compact=True)
+    assert summary["skipped"] == 0
+    assert len((out / "制动.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+
+    summary = run_batch(raw, out, workers=1, use_cache=False, export_format="jsonl")
+    assert summary["skipped"] == 0
+    summary = run_batch(raw, out, workers=1, use_cache=False, export_format="jsonl")
+    assert summary["skipped"] == 1
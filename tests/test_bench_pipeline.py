@@ -0,0 +1,28 @@
+from benchmarks.bench_pipeline import compare_results, run_benchmarks
+
+
+def test_compare_results_flags_slowdowns_over_threshold():
+    baseline = {"results": {"a": {"seconds": 0.1}, "b": {"seconds": 0.1}, "tiny": {"seconds": 0.0001}}}
+    current = {"results": {"a": {"seconds": 0.15}, "b": {"seconds": 0.11}, "tiny": {"seconds": 0.001}, "new": {"seconds": 1}}}
+
+    regressions = compare_results(current, baseline, threshold=0.2)
+    assert [r["case"] for r in regressions] == ["a"]
+    assert regressions[0]["ratio"] == 1.5
+
+
+def test_run_benchmarks_records_each_stage():
+    report = run_benchmarks(sizes=[20], repeat=1, memory=True, real=False)
+
+    cases = report["results"]
+    assert set(cases) == {
+        "parse_docx_file[synthetic-20.docx]",
+        "parse_text_file[synthetic-20.txt]",
+        "detect_questions[synthetic-20]",
+        "_detect_type[synthetic-20]",
+        "question_model[synthetic-20]",
+        "question_record[synthetic-20]",
+        "align_answers[synthetic-20]",
+        "align_answers_same[synthetic-20]",
+    }
+    assert cases["detect_questions[synthetic-20]"]["items"] == 20
+    assert all(entry["peak_kb"] > 0 for entry in cases.values())
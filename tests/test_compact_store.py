@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from models.question import Question
+from pipeline.exporter import export_questions
+from storage.compact_store import CompactQuestionStore, compact_to_json, json_to_compact, write_compact_store
+
+QUESTIONS = [
+    {"id": 1, "type": "choice", "stem": "列车制动方式有哪些？", "options": ["空气制动", "电制动"], "answer": "AB"},
+    {"id": 2, "type": "judge", "stem": "闸瓦压力越大越好（ ）", "options": None, "answer": None},
+    {"id": 3, "type": "fill", "stem": "", "options": [], "answer": ""},
+    {"id": 4, "type": "judge", "stem": "制动距离与坡度无关（ ）", "options": None, "answer": "×"},
+]
+
+
+def test_store_round_trips_questions(tmp_path: Path):
+    path = tmp_path / "bank.qbank"
+    assert write_compact_store([Question(**QUESTIONS[0])] + QUESTIONS[1:], path) == 4
+
+    with CompactQuestionStore(path) as store:
+        assert len(store) == 4
+        assert list(store) == QUESTIONS
+        assert store[-1] == QUESTIONS[-1]
+        assert store.get(1)["stem"] == QUESTIONS[1]["stem"]
+        assert list(store.iter_types()) == ["choice", "judge", "fill", "judge"]
+        assert store.type_counts() == {"choice": 1, "judge": 2, "fill": 1}
+        assert store.digest and len(store.digest) == 64
+        with pytest.raises(IndexError):
+            store[4]
+
+
+def test_json_conversion_both_ways(tmp_path: Path):
+    source = tmp_path / "bank.json"
+    export_questions(QUESTIONS, source)
+    store = tmp_path / "bank.qbank"
+    assert json_to_compact(source, store) == 4
+
+    target = tmp_path / "back.json"
+    compact_to_json(store, target)
+    assert target.read_bytes() == source.read_bytes()
+
+    lines = tmp_path / "bank.jsonl"
+    compact_to_json(store, lines, fmt="jsonl")
+    assert json_to_compact(lines, tmp_path / "again.qbank") == 4
+    with CompactQuestionStore(tmp_path / "again.qbank") as again, CompactQuestionStore(store) as first:
+        assert list(again) == QUESTIONS
+        # 内容相同则哈希相同，与文件写入时间无关
+        assert again.digest == first.digest
+
+
+def test_rejects_other_files(tmp_path: Path):
+    path = tmp_path / "bank.qbank"
+    path.write_text(json.dumps(QUESTIONS), encoding="utf-8")
+    with pytest.raises(ValueError):
+        CompactQuestionStore(path)
@@ -0,0 +1,99 @@
+from io import BytesIO
+from pathlib import Path
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from config import FORMAT_BOLD, FORMAT_STRIKE, FORMAT_UNDERLINE
+from parsers.docx_parser import (
+    _get_paragraph_number,
+    _number_lines,
+    _python_docx_flags,
+    iter_docx_formatted_lines,
+    iter_docx_lines,
+    parse_docx_with_format,
+)
+from recognizers.question_detector import detect_questions, iter_formatted_questions
+
+NUM_PR = f'<w:numPr {nsdecls("w")}><w:ilvl w:val="0"/><w:numId w:val="1"/></w:numPr>'
+
+
+def _build_sample_docx(path: Path) -> None:
+    doc = Document()
+    doc.add_paragraph("一、选择题")
+    for stem in ["列车牵引力由什么产生？", "制动距离与哪些因素有关？"]:
+        para = doc.add_paragraph(stem)
+        para._p.get_or_add_pPr().append(parse_xml(NUM_PR))
+    doc.add_paragraph("7. 已有题号的题目")
+    para = doc.add_paragraph("A. 选项一")
+    para.add_run().add_break()
+    para.add_run("B.\t选项二")
+    doc.add_paragraph("   ")
+    doc.add_table(rows=1, cols=1).cell(0, 0).text = "表格内文字"
+    para = doc.add_paragraph()
+    para._p.get_or_add_pPr().append(parse_xml(NUM_PR))
+    para.add_run("编号题")
+    doc.save(str(path))
+
+
+def test_fast_path_matches_python_docx(tmp_path: Path):
+    src = tmp_path / "bank.docx"
+    _build_sample_docx(src)
+
+    fast = list(iter_docx_lines(str(src)))
+    doc = Document(str(src))
+    slow = [
+        text
+        for text, _ in _number_lines(
+            (p.text, _get_paragraph_number(p) == "[NUM]", _python_docx_flags(p)) for p in doc.paragraphs
+        )
+    ]
+
+    assert fast == slow
+    assert fast[1] == "1. 列车牵引力由什么产生？"
+    assert fast[-1] == "8. 编号题"
+    assert "表格内文字" not in fast
+
+
+def test_fast_path_accepts_file_object(tmp_path: Path):
+    src = tmp_path / "bank.docx"
+    _build_sample_docx(src)
+    assert list(iter_docx_lines(BytesIO(src.read_bytes()))) == list(iter_docx_lines(str(src)))
+
+
+def test_format_table_feeds_detect_questions(tmp_path: Path):
+    doc = Document()
+    doc.add_paragraph().add_run("1. 加粗的重点题（ ）").bold = True
+    doc.add_paragraph().add_run("2. 已删除的题目（ ）").font.strike = True
+    para = doc.add_paragraph("3. 多行题干")
+    para.add_run().add_break()
+    para.add_run("续行").underline = True
+    doc.add_paragraph("4. 普通题目（ ）")
+    src = tmp_path / "bank.docx"
+    doc.save(str(src))
+
+    parsed = parse_docx_with_format(str(src), use_cache=False)
+    assert len(parsed.line_formats) == len(parsed.text.splitlines())
+    assert list(parsed.line_formats) == [FORMAT_BOLD, FORMAT_STRIKE, FORMAT_UNDERLINE, FORMAT_UNDERLINE, 0]
+
+    stems = [q["stem"] for q in detect_questions(parsed.text, parsed.line_formats)]
+    assert stems == ["加粗的重点题（ ）", "多行题干 续行", "普通题目（ ）"]
+
+
+def test_streamed_lines_match_format_table(tmp_path: Path):
+    doc = Document()
+    doc.add_paragraph().add_run("1. 加粗的重点题（ ）").bold = True
+    doc.add_paragraph().add_run("2. 已删除的题目（ ）").font.strike = True
+    para = doc.add_paragraph()
+    para.add_run("3. 多行题干").underline = True
+    para.add_run().add_break()
+    para.add_run("续行")
+    src = tmp_path / "fmt.docx"
+    doc.save(str(src))
+
+    parsed = parse_docx_with_format(str(src), use_cache=False)
+    streamed = list(iter_docx_formatted_lines(str(src)))
+    assert [line for line, _ in streamed] == parsed.text.splitlines()
+    assert bytes(flags for _, flags in streamed) == parsed.line_formats
+    assert list(iter_formatted_questions(streamed)) == detect_questions(parsed.text, parsed.line_formats)
@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from models.question import Question, QuestionRecord
+from pipeline.exporter import export_questions, output_path_for
+from storage.compact_store import iter_bank_file
+
+QUESTIONS = [
+    Question(id=1, type="choice", stem="列车制动方式有哪些？", options=["空气制动", "电制动"], answer="AB"),
+    Question(id=2, type="judge", stem="闸瓦压力越大越好（ ）", answer="×"),
+]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_json_export_matches_json_dumps(tmp_path: Path, compact: bool):
+    target = tmp_path / "out" / "bank.json"
+    for questions in (QUESTIONS, QUESTIONS[:1], []):
+        assert export_questions(questions, target, compact=compact) == len(questions)
+        expected = json.dumps(
+            [q.model_dump() for q in questions],
+            ensure_ascii=False,
+            indent=None if compact else 2,
+            separators=(",", ":") if compact else None,
+        )
+        assert target.read_text(encoding="utf-8") == expected
+    assert not list(target.parent.glob("*.tmp"))
+
+
+def test_jsonl_export_writes_one_question_per_line(tmp_path: Path):
+    target = tmp_path / "bank.jsonl"
+    export_questions(iter(QUESTIONS), target, fmt="jsonl")
+
+    lines = target.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [q.model_dump() for q in QUESTIONS]
+
+
+def test_failed_export_keeps_previous_file(tmp_path: Path):
+    target = tmp_path / "bank.json"
+    target.write_text("[]", encoding="utf-8")
+
+    def broken():
+        yield QUESTIONS[0]
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        export_questions(broken(), target)
+    assert target.read_text(encoding="utf-8") == "[]"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("fmt", ["json", "qbank"])
+def test_export_validates_records(tmp_path: Path, fmt: str):
+    target = tmp_path / f"bank.{fmt}"
+    export_questions([QuestionRecord(id=1, type="judge", stem="题干", answer="√")], target, fmt)
+    previous = target.read_bytes()
+
+    with pytest.raises(ValidationError):
+        export_questions([QuestionRecord(id=None, type="judge", stem="题干")], target, fmt)
+    with pytest.raises(ValidationError):
+        export_questions([{"id": 2, "type": "fill", "stem": None}], target, fmt)
+    assert target.read_bytes() == previous
+
+
+def test_output_path_follows_export_format():
+    assert output_path_for("data/processed/questions.json", "jsonl") == Path("data/processed/questions.jsonl")
+    assert output_path_for("out.JSONL", "jsonl") == Path("out.JSONL")
+    assert output_path_for("out.jsonl", "json") == Path("out.json")
+    assert output_path_for("out", "json") == Path("out.json")
+    assert output_path_for("data/processed/questions.json", "qbank") == Path("data/processed/questions.qbank")
+
+
+def test_qbank_export_to_derived_path_is_readable(tmp_path: Path):
+    target = output_path_for(tmp_path / "questions.json", "qbank")
+
+    assert export_questions(QUESTIONS, target, "qbank") == 2
+    assert [q["stem"] for q in iter_bank_file(target)] == [q.stem for q in QUESTIONS]
+    assert not (tmp_path / "questions.json").exists()
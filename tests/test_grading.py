@@ -0,0 +1,171 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from grading.batch import AnswerKeySet, Submission, grade_many, question_accuracy
+from grading.evaluator import compile_key, evaluate_answer, grade
+from grading.exam import run_exam
+from grading.submissions import iter_csv_submissions, iter_submissions
+
+OPTIONS = ["空气制动", "电制动", "电磁制动", "手制动"]
+QUESTIONS = [
+    {"id": 1, "type": "choice", "stem": "单选", "options": OPTIONS, "answer": "B"},
+    {"id": 2, "type": "multi", "stem": "多选", "options": OPTIONS, "answer": "A、C"},
+    {"id": 3, "type": "judge", "stem": "判断（ ）", "options": None, "answer": "×"},
+    {"id": 4, "type": "fill", "stem": "填空____", "options": None, "answer": "闸瓦；制动缸"},
+    {"id": 5, "type": "short", "stem": "简述", "options": None, "answer": "略"},
+    {"id": 6, "type": "choice", "stem": "无答案", "options": OPTIONS, "answer": None},
+]
+
+
+@pytest.mark.parametrize(
+    "q_type, user, answer, options, expected",
+    [
+        ("choice", "电制动", "B", OPTIONS, True),
+        ("choice", "B", "B", OPTIONS, True),
+        ("choice", "空气制动", "B", OPTIONS, False),
+        ("choice", "", "B", OPTIONS, False),
+        ("choice", "电磁制动", "A、C", OPTIONS, True),
+        ("choice", "空气制动", "ACD", OPTIONS, False),
+        ("choice", "A", "ACD", OPTIONS, False),
+        ("multi", ["空气制动", "电磁制动"], "AC", OPTIONS, True),
+        ("multi", ["空气制动"], "A,C", OPTIONS, False),
+        ("multi", "AC", "A、C", OPTIONS, True),
+        ("judge", "错", "错误", None, True),
+        ("judge", "错", "×", None, True),
+        ("judge", "对", "×", None, False),
+        ("judge", "√", "正确", None, True),
+        ("fill", "闸瓦、制动缸", "闸瓦;制动缸", None, True),
+        ("fill", "闸瓦", "闸瓦;制动缸", None, False),
+        ("short", "随便写", "略", None, None),
+        ("choice", "A", None, OPTIONS, None),
+    ],
+)
+def test_evaluate_answer(q_type, user, answer, options, expected):
+    assert evaluate_answer(q_type, user, answer, options) is expected
+
+
+def test_compiled_key_is_reusable():
+    key = compile_key("multi", "ACD", OPTIONS)
+
+    assert key.targets == {"空气制动", "电磁制动", "手制动"}
+    assert grade(key, ["手制动", "空气制动", "电磁制动"]) is True
+    assert grade(key, ["手制动", "空气制动"]) is False
+    assert compile_key("short", "略") is None
+    assert compile_key("choice", "  ") is None
+
+
+def test_grade_many_scores_each_sheet():
+    keys = AnswerKeySet(QUESTIONS)
+    sheets = [
+        Submission("alice", {1: "B", 2: "A C", 3: "错", 4: "闸瓦 制动缸", 5: "略"}),
+        Submission("bob", {1: "空气制动", 3: "对"}),
+    ]
+
+    results = list(grade_many(keys, sheets))
+
+    assert len(keys) == 4 and keys.question_count == 6
+    assert [(r.student, r.correct, r.graded, r.answered) for r in results] == [("alice", 4, 4, 4), ("bob", 0, 4, 2)]
+    assert results[0].score == 1.0
+    assert results[1].results == {1: False, 2: False, 3: False, 4: False}
+    accuracy = question_accuracy(results)
+    assert accuracy[1] == {"total": 2, "correct": 1, "accuracy": 0.5}
+
+
+def test_grade_many_matches_evaluate_answer():
+    keys = AnswerKeySet(QUESTIONS)
+    answers = {1: "C", 2: ["空气制动", "电磁制动"], 3: "错误", 4: "制动缸"}
+
+    (sheet,) = grade_many(keys, [Submission("carol", answers)])
+
+    for q in QUESTIONS:
+        if q["id"] in keys:
+            assert sheet.results[q["id"]] is evaluate_answer(q["type"], answers[q["id"]], q["answer"], q["options"])
+
+
+def test_csv_wide_and_long_layouts(tmp_path: Path):
+    wide = tmp_path / "wide.csv"
+    wide.write_text("﻿student,1,3,备注\nalice,B,错,\nbob,,对,迟到\n", encoding="utf-8")
+    long = tmp_path / "long.csv"
+    long.write_text("student,question_id,answer\nalice,1,B\nbob,3,对\nalice,3,错\nbob,x,A\n", encoding="utf-8")
+
+    assert list(iter_csv_submissions(wide)) == [Submission("alice", {1: "B", 3: "错"}), Submission("bob", {3: "对"})]
+    assert list(iter_csv_submissions(long)) == [Submission("alice", {1: "B", 3: "错"}), Submission("bob", {3: "对"})]
+
+    bad = tmp_path / "bad.csv"
+    bad.write_text("name,1\nalice,B\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_csv_submissions(bad))
+
+
+@pytest.mark.parametrize(
+    "name, content, line",
+    [
+        ("short.csv", "1,student\nB,alice\nC\n", 3),
+        ("short_long.csv", "question_id,answer,student\n1,B,alice\n1,B\n", 3),
+        ("list.jsonl", '{"student": "alice", "answers": {"1": "B"}}\n["bob"]\n', 2),
+        ("string.jsonl", '"alice"\n', 1),
+        ("answers.jsonl", '{"student": "alice", "answers": ["B"]}\n', 1),
+        ("broken.jsonl", '{"student": \n', 1),
+    ],
+)
+def test_malformed_submissions_raise_value_error(tmp_path: Path, name, content, line):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(ValueError, match=f"第 {line} 行"):
+        list(iter_submissions(path))
+
+
+def _write_exam(tmp_path: Path) -> tuple:
+    bank = tmp_path / "bank.json"
+    bank.write_text(json.dumps(QUESTIONS, ensure_ascii=False), encoding="utf-8")
+    subs = tmp_path / "subs"
+    subs.mkdir()
+    (subs / "a.csv").write_text("student,1,3\nalice,B,错\nbob,A,对\n", encoding="utf-8")
+    (subs / "b.jsonl").write_text(
+        json.dumps({"student": "carol", "answers": {"1": "电制动", "2": ["空气制动", "电磁制动"]}}, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    (subs / "notes.txt").write_text("ignored", encoding="utf-8")
+    return bank, subs
+
+
+def test_jsonl_submissions(tmp_path: Path):
+    _, subs = _write_exam(tmp_path)
+
+    assert list(iter_submissions(subs / "b.jsonl")) == [Submission("carol", {1: "电制动", 2: ["空气制动", "电磁制动"]})]
+    with pytest.raises(ValueError):
+        iter_submissions(subs / "notes.txt")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_exam_streams_scores_and_accuracy(tmp_path: Path, workers):
+    bank, subs = _write_exam(tmp_path)
+    out = io.StringIO()
+
+    summary = run_exam(bank, subs, out, workers)
+
+    assert out.getvalue().splitlines() == [
+        "file,student,correct,graded,answered,score",
+        "a.csv,alice,2,4,2,0.5000",
+        "a.csv,bob,0,4,2,0.0000",
+        "b.jsonl,carol,2,4,2,0.5000",
+    ]
+    assert (summary["files"], summary["students"], summary["failed"]) == (2, 3, [])
+    assert summary["questions"][1] == {"total": 3, "correct": 2, "accuracy": 2 / 3}
+    assert summary["questions"][4]["correct"] == 0
+
+
+def test_run_exam_reports_malformed_file(tmp_path: Path):
+    bank, subs = _write_exam(tmp_path)
+    (subs / "c.jsonl").write_text('["not a sheet"]\n', encoding="utf-8")
+    out = io.StringIO()
+
+    summary = run_exam(bank, subs, out, 1)
+
+    assert summary["students"] == 3
+    assert [Path(f["file"]).name for f in summary["failed"]] == ["c.jsonl"]
+    assert "第 1 行" in summary["failed"][0]["error"]
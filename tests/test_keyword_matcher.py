@@ -0,0 +1,23 @@
+from recognizers.keyword_matcher import KeywordMatcher
+from recognizers.question_detector import _detect_type
+
+
+def test_find_classes_reports_overlapping_and_prefix_hits():
+    matcher = KeywordMatcher({
+        "comprehensive": ["综合案例"],
+        "case": ["案例", "案例分析"],
+        "fill": ["___", "______"],
+        "acronym": ["PDCA"],
+    })
+    assert matcher.find_classes("以下综合案例分析题") == {"comprehensive", "case"}
+    assert matcher.find_classes("填空______") == {"fill"}
+    assert matcher.find_classes("简述 pdca 循环") == {"acronym"}
+    assert matcher.find_classes("普通题干") == frozenset()
+
+
+def test_detect_type_uses_keyword_classes():
+    assert _detect_type("城市轨道交通的综合应用题", []) == "comprehensive"
+    assert _detect_type("阅读以下材料，回答问题", []) == "case"
+    assert _detect_type("列车的____由牵引力产生", []) == "fill"
+    assert _detect_type("情景" + "长" * 120, []) == "case"
+    assert _detect_type("简述列车制动的原理", []) == "short"
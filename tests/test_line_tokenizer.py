@@ -0,0 +1,30 @@
+from recognizers.line_tokenizer import (
+    ANSWER_HEADER,
+    HEADING,
+    NUMBERED,
+    OPTIONS,
+    SECTION,
+    TEXT,
+    tokenize_lines,
+)
+
+
+def test_tokenize_lines_classifies_each_line():
+    lines = [
+        "一、单项选择题",
+        "",
+        "（3）列车制动距离包括哪些部分？",
+        "A. 空走距离 B、有效制动距离",
+        "续行文字",
+        "答案：",
+        "二，补充说明",
+        "第二章 牵引计算",
+    ]
+    tokens = list(tokenize_lines(lines))
+
+    assert [t.kind for t in tokens] == [SECTION, NUMBERED, OPTIONS, TEXT, ANSWER_HEADER, HEADING, SECTION]
+    assert [t.index for t in tokens] == [0, 2, 3, 4, 5, 6, 7]
+    assert tokens[1].number == 3
+    assert tokens[1].body == "列车制动距离包括哪些部分？"
+    assert tokens[2].options == ("空走距离", "有效制动距离")
+    assert tokens[4].body == ""
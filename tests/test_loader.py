@@ -0,0 +1,31 @@
+from io import BytesIO
+from pathlib import Path
+
+from docx import Document
+
+from parsers.loader import load_document
+
+
+def test_load_document_from_memory_matches_path(tmp_path: Path):
+    doc = Document()
+    doc.add_paragraph("1. 列车牵引力由什么产生？")
+    doc.add_paragraph("A. 轮轨粘着")
+    src = tmp_path / "bank.docx"
+    doc.save(str(src))
+    data = src.read_bytes()
+
+    from_path = load_document(str(src), use_cache=False)
+    assert load_document(data, use_cache=False, name="bank.docx") == from_path
+
+    upload = BytesIO(data)
+    upload.name = "bank.docx"
+    assert load_document(upload, use_cache=False) == from_path
+
+
+def test_load_text_from_memory_keeps_gbk_fallback():
+    data = "1. 题目\r\n答案：A".encode("gbk")
+
+    parsed = load_document(BytesIO(data), use_cache=False, name="题库.txt")
+    assert parsed.text == "1. 题目\n答案：A"
+    assert parsed.line_formats == b""
+    assert load_document(data, use_cache=False) is None  # 无文件名时无法判断类型
@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+
+from docx import Document
+
+import parsers.docx_parser as docx_parser
+from parsers.cache import ParseCache, content_digest
+from parsers.loader import load_document
+
+
+def _use_cache(monkeypatch, cache: ParseCache):
+    monkeypatch.setattr(docx_parser, "get_parse_cache", lambda: cache)
+
+
+def test_cache_roundtrip_and_invalidate(tmp_path: Path):
+    cache = ParseCache(tmp_path / "cache")
+    src = tmp_path / "bank.txt"
+    src.write_text("1. 题目", encoding="utf-8")
+    digest = content_digest(src.read_bytes())
+
+    assert cache.get(digest, "text") is None
+    cache.put(digest, "text", "1. 题目")
+    assert cache.get(digest, "text") == "1. 题目"
+
+    assert cache.invalidate(str(src)) == 1
+    assert cache.get(digest, "text") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = ParseCache(tmp_path / "cache", max_bytes=250)
+    for i, name in enumerate(["a", "b", "c"]):
+        cache.put(name, "text", "x" * 100)
+        entry = cache._entry_path(name, "text")
+        os.utime(entry, (1000 + i, 1000 + i))
+
+    assert cache.get("a", "text") is None
+    assert cache.get("c", "text") == "x" * 100
+
+
+def test_text_parser_bypasses_cache(tmp_path: Path, monkeypatch):
+    cache = ParseCache(tmp_path / "cache")
+    _use_cache(monkeypatch, cache)
+    src = tmp_path / "bank.txt"
+    src.write_bytes("1. 题目\r\n答案：A".encode("gbk"))
+
+    assert load_document(str(src)).text == "1. 题目\n答案：A"
+    assert not (tmp_path / "cache").exists()
+
+
+def test_docx_parser_skips_python_docx_on_hit(tmp_path: Path, monkeypatch):
+    cache = ParseCache(tmp_path / "cache")
+    _use_cache(monkeypatch, cache)
+    doc = Document()
+    doc.add_paragraph("1. Python 的创始人是谁？")
+    doc.add_paragraph("A. Guido")
+    src = tmp_path / "bank.docx"
+    doc.save(str(src))
+
+    first = docx_parser.parse_docx_file(str(src))
+    formatted = docx_parser.parse_docx_file_with_format(str(src))
+    monkeypatch.setattr(docx_parser, "Document", None)
+
+    assert docx_parser.parse_docx_file(str(src)) == first
+    cached = docx_parser.parse_docx_file_with_format(str(src))
+    assert [p.text for p in cached] == [p.text for p in formatted]
@@ -0,0 +1,36 @@
+import profiling
+from recognizers.answer_aligner import align_answers
+from recognizers.question_detector import _detect_type
+
+
+def test_disabled_profiling_is_a_no_op():
+    assert not profiling.is_enabled()
+    assert profiling.wrap("detect.type", _detect_type) is _detect_type
+    with profiling.stage("unused"):
+        pass
+    assert all(s.name != "unused" for s in profiling.results())
+
+
+def test_profile_run_collects_pipeline_stages():
+    without_text = "一、判断题\n1. 列车制动距离与速度有关（ ）\n2. 限制坡度越大越好（ ）"
+    with_text = without_text + "\n答案：1.√ 2.×"
+
+    with profiling.profile_run():
+        align_answers(with_text, without_text)
+    assert not profiling.is_enabled()
+
+    stats = {s.name: s for s in profiling.results()}
+    assert stats["detect.classify"].calls == 3
+    assert stats["detect.type"].calls == 2
+    assert stats["align.extract_blocks"].calls == stats["align.match"].calls == 1
+    assert all(s.seconds >= 0 for s in stats.values())
+    report = profiling.format_report()
+    assert report.splitlines()[0].startswith("阶段")
+    assert any(line.startswith("detect.commit") for line in report.splitlines())
+
+
+def test_profile_run_dumps_pstats(tmp_path):
+    target = tmp_path / "run.pstats"
+    with profiling.profile_run(str(target)):
+        _detect_type("简述列车制动的过程。", [])
+    assert target.stat().st_size > 0
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+import parsers.docx_parser as docx_parser
+from benchmarks.bank_generator import generate_bank
+from parsers.cache import ParseCache
+from models.question_bank import QuestionBank
+from parsers.loader import load_document
+from pipeline.progressive import BankLoader
+from recognizers.answer_aligner import align_answers
+
+
+@pytest.fixture(autouse=True)
+def parse_cache(tmp_path: Path, monkeypatch) -> ParseCache:
+    """不写入真实的 data/cache"""
+    cache = ParseCache(tmp_path / "cache")
+    monkeypatch.setattr(docx_parser, "get_parse_cache", lambda: cache)
+    return cache
+
+
+@pytest.mark.parametrize("fmt", ["docx", "txt"])
+def test_loader_matches_align_answers(tmp_path: Path, parse_cache: ParseCache, fmt: str):
+    files = generate_bank(tmp_path, 300, strike_ratio=0.1)
+    with_path = str(files.with_answers[fmt])
+    without_path = str(files.without_answers[fmt])
+
+    loader = BankLoader(without_path, with_path, use_cache=False).start()
+    assert loader.wait(count=1, timeout=30)
+    snapshot = loader.bank()
+    assert len(snapshot) >= 1
+    assert snapshot.type_counts() == QuestionBank(list(snapshot)).type_counts()
+    assert loader.wait(timeout=30) and loader.done and loader.error is None
+
+    with_doc = load_document(with_path, use_cache=False)
+    without_doc = load_document(without_path, use_cache=False)
+    expected = [q.model_dump() for q in align_answers(with_doc.text, without_doc.text, without_doc.line_formats)]
+    bank = loader.bank()
+    assert loader.bank() is bank
+    assert list(bank) == expected
+    assert loader.count == len(expected)
+    # 加载中的快照与完整题库顺序一致
+    assert [q["stem"] for q in snapshot] == [q["stem"] for q in expected[: len(snapshot)]]
+    assert bank.type_counts() == QuestionBank(expected).type_counts()
+    assert not parse_cache.root.exists()
+
+
+def test_loader_single_upload_extracts_answers_from_same_text():
+    text = "1. 闸瓦压力越大越好（ ）\n2. 制动距离与坡度无关（ ）\n答案：1.× 2.×"
+    loader = BankLoader(None, text.encode("utf-8"), with_name="bank.txt").start()
+    assert loader.wait(timeout=30)
+    assert list(loader.bank()) == [q.model_dump() for q in align_answers(text, text)]
+
+
+def test_loader_reports_unreadable_source(tmp_path: Path):
+    loader = BankLoader(str(tmp_path / "missing.docx")).start()
+    assert loader.wait(timeout=30)
+    assert loader.bank() is None
+    assert loader.error
@@ -0,0 +1,36 @@
+import pytest
+from pydantic import ValidationError
+
+from models.question import Question, QuestionRecord
+from pipeline.exporter import write_questions
+from recognizers.answer_aligner import align_answers
+
+FIELDS = {"id": 3, "type": "choice", "stem": "列车制动方式有哪些？", "options": ["空气制动", "电制动"], "answer": "AB"}
+
+
+def test_record_dumps_like_model():
+    record = QuestionRecord(**FIELDS)
+
+    assert record.model_dump() == Question(**FIELDS).model_dump()
+    assert list(record.model_dump()) == list(Question(**FIELDS).model_dump())
+    assert record.to_model() == Question(**FIELDS)
+    assert not hasattr(record, "__dict__")
+
+
+def test_record_validates_only_on_to_model():
+    record = QuestionRecord(id="x", type="judge", stem="闸瓦压力越大越好（ ）")
+    with pytest.raises(ValidationError):
+        record.to_model()
+
+
+def test_align_answers_returns_records_that_export_like_models(tmp_path):
+    without = "1. 闸瓦压力越大越好（ ）\n2. 制动距离与坡度无关（ ）"
+    records = align_answers(without + "\n答案：1.× 2.×", without)
+
+    assert all(isinstance(q, QuestionRecord) for q in records)
+    assert [q.answer for q in records] == ["×", "×"]
+    models = [Question(**q.model_dump()) for q in records]
+    with (tmp_path / "a.json").open("w", encoding="utf-8") as a, (tmp_path / "b.json").open("w", encoding="utf-8") as b:
+        write_questions(records, a)
+        write_questions(models, b)
+    assert (tmp_path / "a.json").read_bytes() == (tmp_path / "b.json").read_bytes()
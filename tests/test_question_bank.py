@@ -0,0 +1,104 @@
+from pathlib import Path
+
+from models.question_bank import QuestionBank
+from models.type_index import TypeIndex
+from storage.compact_store import CompactQuestionStore, write_compact_store
+
+QUESTIONS = [
+    {"id": 1, "type": "short", "stem": "简述制动过程", "options": None, "answer": None},
+    {"id": 2, "type": "judge", "stem": "闸瓦压力越大越好（ ）", "options": None, "answer": "×"},
+    {"id": 3, "type": "calc", "stem": "计算制动距离", "options": None, "answer": None},
+    {"id": 4, "type": "judge", "stem": "制动距离与坡度无关（ ）", "options": None, "answer": "×"},
+    {"id": 5, "type": None, "stem": "未识别题型", "options": None, "answer": None},
+]
+
+
+def test_bank_indexes_types_once():
+    bank = QuestionBank(QUESTIONS)
+
+    assert len(bank) == 5
+    assert bank.get(3) is QUESTIONS[3]
+    assert bank.available_types == ["judge", "short", "calc"]
+    assert bank.indices_of("judge") == [1, 3]
+    assert bank.indices_of("fill") == []
+    assert bank.first_index("short") == 0
+    assert bank.first_index("fill") is None
+    assert bank.type_counts() == {"judge": 2, "short": 1, "calc": 1}
+
+
+def test_bank_over_compact_store(tmp_path: Path):
+    write_compact_store(QUESTIONS, tmp_path / "bank.qbank")
+    with CompactQuestionStore(tmp_path / "bank.qbank") as store:
+        bank = QuestionBank(store)
+        # 题型和题数来自元数据，题型索引到第一次跳转时才建立
+        assert bank.available_types == ["judge", "short", "calc"]
+        assert bank.type_counts() == {"judge": 2, "short": 1, "calc": 1}
+        assert bank._index is None
+        assert bank.get(bank.first_index("calc")) == QUESTIONS[2]
+        assert list(bank) == QUESTIONS
+        assert bank.position_of_id(4) == 3
+
+
+def test_position_of_id_in_views():
+    bank = QuestionBank(QUESTIONS)
+
+    assert bank.position_of_id(3) == 2
+    assert bank.position_of_id(99) is None
+    assert bank.only_type("judge").position_of_id(4) == 1
+    assert bank.only_type("judge").position_of_id(1) is None
+    assert bank.sorted_by_type().position_of_id(2) == 0
+
+
+def _stable_sort_by_type(questions):
+    # 旧版界面的排序方式：按 TYPE_PRIORITY 稳定排序
+    order = {"fill": 0, "judge": 1, "choice": 2, "short": 3, "comprehensive": 4, "case": 5}
+    return sorted(questions, key=lambda q: order.get(q.get("type"), 6))
+
+
+def test_sorted_view_matches_stable_sort_without_copying():
+    bank = QuestionBank(QUESTIONS)
+    view = bank.sorted_by_type()
+
+    assert list(view) == _stable_sort_by_type(QUESTIONS)
+    assert view.get(0) is QUESTIONS[1]
+    assert [view.number(i) for i in range(len(view))] == [1, 2, 3, 4, 5]
+    assert [q["id"] for q in QUESTIONS] == [1, 2, 3, 4, 5]
+    assert view.first_index("short") == 2
+    assert view.first_index("calc") == 3
+    assert view.type_counts() == bank.type_counts()
+    assert bank.sorted_by_type() is view
+
+
+def test_only_type_view_keeps_question_numbers():
+    bank = QuestionBank(QUESTIONS)
+    judge = bank.only_type("judge")
+
+    assert len(judge) == 2
+    assert [judge.number(i) for i in range(2)] == [2, 4]
+    assert judge.available_types == ["judge"]
+    assert len(bank.sorted_by_type().only_type("judge")) == 2
+    assert len(bank.only_type("fill")) == 0
+
+
+def test_detector_builds_type_index():
+    from recognizers.question_detector import detect_questions_with_index
+
+    text = "一、判断题\n1. 闸瓦压力越大越好（ ）\n二、简答题\n1. 简述制动过程\n三、判断题\n1. 制动距离与坡度无关（ ）"
+    questions, index = detect_questions_with_index(text)
+    bank = QuestionBank(questions, index)
+
+    assert index.counts() == QuestionBank(questions).type_counts()
+    for q_type in index.types:
+        assert [questions[i]["type"] for i in index.positions(q_type)] == [q_type] * index.count(q_type)
+    assert index.sorted_order() == [questions.index(q) for q in _stable_sort_by_type(questions)]
+    assert list(bank.sorted_by_type()) == _stable_sort_by_type(questions)
+
+
+def test_type_index_prefix_covers_published_questions():
+    index = TypeIndex.from_types(q["type"] for q in QUESTIONS)
+
+    assert index.prefix(4).counts() == QuestionBank(QUESTIONS[:4]).type_counts()
+    assert index.prefix(2).positions("judge") == [1]
+    assert index.prefix(0).types == []
+    index.add("judge", 5)
+    assert index.prefix(5).count("judge") == 2
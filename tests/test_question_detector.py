@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from config import FORMAT_STRIKE
+from models.type_index import TypeIndex
+from parsers.text_parser import iter_text_lines, parse_text_file
+from recognizers.question_detector import detect_questions, iter_formatted_questions, iter_questions
+
+TEXT = """一、判断题
+1. 闸瓦压力越大越好（ ）
+2. 制动距离与坡度无关（ ）
+二、选择题
+3. 列车制动方式有哪些？
+A. 空气制动 B. 电制动
+三、简答题
+4. 简述制动过程
+要求写出三个阶段
+5.第一题 6.第二题"""
+
+
+def test_iter_questions_matches_detect_questions():
+    assert list(iter_questions(TEXT.splitlines())) == detect_questions(TEXT)
+
+
+def test_iter_questions_yields_each_question_when_committed():
+    consumed = []
+
+    def lines():
+        for line in TEXT.splitlines():
+            consumed.append(line)
+            yield line
+
+    stream = iter_questions(lines())
+    first = next(stream)
+    assert first["stem"] == "闸瓦压力越大越好（ ）"
+    # 第一题在读到下一道题的题号时提交，之后的行尚未读取
+    assert consumed[-1] == "2. 制动距离与坡度无关（ ）"
+    assert len(list(stream)) == len(detect_questions(TEXT)) - 1
+
+
+def test_iter_questions_builds_type_index():
+    index = TypeIndex()
+    questions = list(iter_questions(TEXT.splitlines(), type_index=index))
+    assert index.counts() == TypeIndex.from_types(q["type"] for q in questions).counts()
+
+
+def test_formatted_lines_skip_struck_questions():
+    lines = [(line, FORMAT_STRIKE if line.startswith("2.") else 0) for line in TEXT.splitlines()]
+    table = bytes(flags for _, flags in lines)
+    assert list(iter_formatted_questions(lines)) == detect_questions(TEXT, table)
+    assert all("坡度" not in q["stem"] for q in iter_formatted_questions(lines))
+
+
+def test_struck_questions_keep_their_numbers():
+    # 答案按题号匹配：删除线题目被过滤后，其余题目的 id 不能前移
+    struck = {"2. 制动距离与坡度无关（ ）", "5.第一题 6.第二题"}
+    table = bytes(FORMAT_STRIKE if line in struck else 0 for line in TEXT.splitlines())
+    kept = {q["id"]: q["stem"] for q in detect_questions(TEXT)}
+    del kept[2], kept[5], kept[6]
+
+    assert {q["id"]: q["stem"] for q in detect_questions(TEXT, table)} == kept
+
+
+def test_iter_text_lines_matches_parse_text_file(tmp_path: Path):
+    for encoding in ("utf-8", "gbk"):
+        path = tmp_path / f"bank-{encoding}.txt"
+        path.write_bytes(TEXT.replace("\n", "\r\n").encode(encoding))
+        expected = [line for line in parse_text_file(str(path)).splitlines() if line]
+        assert list(iter_text_lines(path)) == expected
+        assert list(iter_questions(iter_text_lines(path))) == detect_questions(TEXT)
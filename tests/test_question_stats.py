@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from storage.question_stats import BankStats, QuestionStatsStore, option_indices
+
+OPTIONS = ["空气制动", "电制动", "电磁制动", "手制动"]
+
+
+def test_option_indices():
+    assert option_indices("电制动", OPTIONS) == [1]
+    assert option_indices(["空气制动", "手制动"], OPTIONS) == [0, 3]
+    assert option_indices("c", OPTIONS) == [2]
+    assert option_indices("不在选项中", OPTIONS) == []
+    assert option_indices("A", None) == []
+
+
+def test_counters_update_incrementally():
+    stats = BankStats()
+    stats.record(7, False, [1], 12.0)
+    stats.record(7, False, [1, 2], 8.0)
+    stats.record(7, True, [0], 4.0)
+    stats.record(7, False, [], 3600.0)  # 离开页面太久：不计用时
+
+    assert stats.get(7) == {
+        "id": 7,
+        "attempts": 4,
+        "correct": 1,
+        "accuracy": 0.25,
+        "wrong_options": {1: 2, 2: 1},
+        "mean_seconds": 8.0,
+    }
+    assert stats.get(8) is None
+
+
+def test_hardest_orders_by_accuracy_then_attempts():
+    stats = BankStats()
+    for qid, results in {1: [True, True], 2: [False, True], 3: [False], 4: [False, False], 5: [True]}.items():
+        for ok in results:
+            stats.record(qid, ok)
+
+    assert [s["id"] for s in stats.hardest(3)] == [4, 3, 2]
+    assert [s["id"] for s in stats.hardest(10, min_attempts=2)] == [4, 2, 1]
+
+
+def test_round_trip_and_corrupt_file(tmp_path: Path):
+    stats = BankStats()
+    stats.record(3, False, [2], 5.5)
+    stats.record(1, True)
+    stats.save(tmp_path / "bank.qstats")
+
+    loaded = BankStats.load(tmp_path / "bank.qstats")
+    assert len(loaded) == 2
+    assert loaded.get(3) == stats.get(3)
+    assert loaded.get(1) == stats.get(1)
+    loaded.record(3, True)
+    assert loaded.get(3)["attempts"] == 2
+
+    (tmp_path / "bad.qstats").write_bytes((tmp_path / "bank.qstats").read_bytes()[:-4])
+    assert len(BankStats.load(tmp_path / "bad.qstats")) == 0
+    assert len(BankStats.load(tmp_path / "missing.qstats")) == 0
+
+
+def test_store_persists_per_bank(tmp_path: Path):
+    with QuestionStatsStore(tmp_path, save_interval=60) as store:
+        store.record("bank-a", 1, False, [0], 3.0)
+        store.record("bank-b", 1, True)
+        assert not list(tmp_path.iterdir())  # 未到写盘间隔
+
+    reopened = QuestionStatsStore(tmp_path)
+    assert reopened.get("bank-a", 1)["wrong_options"] == {0: 1}
+    assert reopened.get("bank-b", 1)["correct"] == 1
+    assert reopened.hardest("bank-c") == []
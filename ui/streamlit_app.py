@@ -1,18 +1,33 @@
+import atexit
 import json
 import re
+import time
+from functools import partial
 from pathlib import Path
+from typing import Callable
 import sys
 import streamlit as st
 
 # 添加父目录到路径以导入模块
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from parsers.text_parser import parse_text_file
-from parsers.docx_parser import parse_docx_file
-from recognizers.answer_aligner import align_answers
+from grading.evaluator import GradingKey, compile_key, grade
+from models.question_bank import TYPE_PRIORITY, QuestionBank
+from parsers.cache import file_digest
+from pipeline.progressive import BankLoader
+from storage.attempt_store import AttemptStore
+from storage.compact_store import STORE_SUFFIX, open_compact_store
+from storage.question_stats import JUDGE_OPTIONS, QuestionStatsStore, option_indices
 
 st.set_page_config(page_title="AutoReview", page_icon="📚", layout="wide")
 
+# 题库共享缓存：同一份题库只解析一次，所有会话共用同一个只读的 QuestionBank
+BANK_CACHE_TTL = 6 * 3600  # 秒
+BANK_CACHE_MAX_ENTRIES = 32
+ALL_TYPES = "all"
+WRONG_BOOK_PAGE_SIZE = 10
+HARDEST_QUESTIONS_LIMIT = 10
+
 TYPE_LABELS = {
     "fill": "填空题",
     "choice": "选择题",
@@ -23,103 +38,190 @@ TYPE_LABELS = {
 }
 
 
+def type_rank(q_type: str | None) -> int:
+    """题型的展示顺序（同 TYPE_PRIORITY，其余题型在后）"""
+    return TYPE_PRIORITY.index(q_type) if q_type in TYPE_PRIORITY else len(TYPE_PRIORITY)
+
+
 def get_type_label(q_type: str | None) -> str:
     return TYPE_LABELS.get(q_type or "", q_type or "未知题型")
 
 
-def normalize_tokens(text: str) -> list[str]:
-    if not text:
-        return []
-    text = str(text).strip().strip("（）() ")
-    text = text.replace("；", ";").replace("，", ",")
-    parts = re.split(r"[;，,、/\s]+", text)
-    return [p.strip().lower() for p in parts if p.strip()]
+def _file_stamp(path: str | None) -> tuple | None:
+    """data/raw 文件的缓存键：路径 + 修改时间 + 大小（文件被替换后自动失效）"""
+    if not path:
+        return None
+    stat = Path(path).stat()
+    return (path, stat.st_mtime_ns, stat.st_size)
 
 
-def sort_questions_by_type(questions: list[dict]) -> list[dict]:
-    """按题型排序问题
-    
-    排序顺序：填空题 -> 判断题 -> 选择题 -> 简答题 -> 综合应用题 -> 案例分析题
-    """
-    type_order = {
-        'fill': 0,           # 填空题
-        'judge': 1,          # 判断题
-        'choice': 2,         # 选择题（含多选）
-        'short': 3,          # 简答题
-        'comprehensive': 4,  # 综合应用题
-        'case': 5,           # 案例分析题
-    }
-    
-    # 按题型排序，相同题型的保持原顺序
-    sorted_questions = sorted(questions, key=lambda q: type_order.get(q.get('type'), 6))
-    
-    # 重新编号
-    for i, q in enumerate(sorted_questions, 1):
-        q['id'] = i
-    
-    return sorted_questions
+@st.cache_resource(ttl=BANK_CACHE_TTL, max_entries=BANK_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_bank_from_files(with_stamp: tuple | None, without_stamp: tuple | None) -> BankLoader:
+    """在后台解析 data/raw 下的题库并对齐答案（以 路径+修改时间 为键，跨会话共享同一个加载任务）"""
+    return BankLoader(
+        without_stamp[0] if without_stamp else None,
+        with_stamp[0] if with_stamp else None,
+    ).start()
 
 
-def _letters_to_options(letters: list[str], options: list[str]) -> list[str]:
-    mapped = []
-    for ch in letters:
-        idx = ord(ch.upper()) - ord("A")
-        if 0 <= idx < len(options):
-            mapped.append(options[idx].strip().lower())
-    return mapped
+@st.cache_resource(ttl=BANK_CACHE_TTL, max_entries=BANK_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_bank_from_uploads(with_upload: tuple[str, bytes] | None, without_upload: tuple[str, bytes]) -> BankLoader:
+    """在后台解析上传的题库并对齐答案（缓存键为 文件名+内容 的哈希，同一份上传只解析一次）
 
+    直接从内存中的上传内容解析，不写临时文件。
+    """
+    with_name, with_data = with_upload or (None, None)
+    without_name, without_data = without_upload
+    return BankLoader(without_data, with_data, without_name, with_name).start()
+
+
+@st.cache_resource(ttl=BANK_CACHE_TTL, max_entries=BANK_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_processed_questions(stamp: tuple) -> QuestionBank | None:
+    """读取 data/processed 下已生成的题库 JSON（以 路径+修改时间 为键）；不是题目数组或没有题目时返回 None"""
+    try:
+        with Path(stamp[0]).open("r", encoding="utf-8") as f:
+            questions = json.load(f)
+    except (OSError, ValueError):  # 含 UnicodeDecodeError / JSONDecodeError
+        return None
+    if not isinstance(questions, list) or not questions or not all(isinstance(q, dict) for q in questions):
+        return None
+    return QuestionBank(questions, key=file_digest(stamp[0]))
 
-def evaluate_answer(q_type: str, user_ans, correct_ans: str, options: list[str] | None = None):
-    correct_tokens = normalize_tokens(correct_ans)
-    # 无标准答案
-    if not correct_tokens:
+
+@st.cache_resource(max_entries=BANK_CACHE_MAX_ENTRIES, show_spinner=False)
+def open_processed_store(stamp: tuple) -> QuestionBank | None:
+    """内存映射 data/processed 下的紧凑题库（.qbank），所有会话共享同一份映射，按需读取题目
+
+    题库标识取自元数据中的内容哈希（旧文件没有时才哈希整个文件），打开耗时与题库大小无关。
+    """
+    store = open_compact_store(stamp[0])
+    if store is None:
         return None
+    if not len(store):  # 空题库同样回退到 JSON / 提示选择文件
+        store.close()
+        return None
+    return QuestionBank(store, key=store.digest or file_digest(stamp[0]))
+
+
+@st.cache_resource(show_spinner=False)
+def get_attempt_store() -> AttemptStore:
+    """答题记录 / 错题本（SQLite，所有会话共用一个后台写线程）"""
+    return AttemptStore()
+
+
+@st.cache_resource(show_spinner=False)
+def get_question_stats() -> QuestionStatsStore:
+    """逐题统计（所有用户共用，按题库哈希 + 题目 id 累计；退出时写回尚未落盘的计数）"""
+    stats = QuestionStatsStore()
+    atexit.register(stats.flush)
+    return stats
+
+
+def current_bank_key() -> str | None:
+    bank = st.session_state.get("bank")
+    return bank.key if bank is not None else None
+
+
+@st.cache_resource(max_entries=BANK_CACHE_MAX_ENTRIES, show_spinner=False)
+def grading_key_cache(bank_key: str) -> dict[int, GradingKey | None]:
+    """每份题库各题的判分依据（按题目 id，首次判到该题时整理，所有会话共用）"""
+    return {}
+
+
+def grading_key(bank: QuestionBank, question: dict, final: bool = True) -> GradingKey | None:
+    # 加载中的快照尚无答案，不缓存，免得答案对齐后仍用旧的判分依据
+    if not final or not bank.key:
+        return compile_key(question.get("type"), question.get("answer"), question.get("options"))
+    keys = grading_key_cache(bank.key)
+    if question["id"] not in keys:
+        keys[question["id"]] = compile_key(question.get("type"), question.get("answer"), question.get("options"))
+    return keys[question["id"]]
+
+
+def use_loader(loader: BankLoader, evict: Callable[[], None]) -> bool:
+    """等到识别出第一道题就开始练习，其余题目在后台继续加载
+
+    evict 把这个加载任务移出 st.cache_resource：失败的任务不留在缓存里，重试时重新解析。
+    """
+    with st.spinner("解析中..."):
+        loader.wait(count=1)
+    bank = loader.bank()
+    if not bank:
+        evict()
+        return False
+    use_bank(bank)
+    st.session_state.loader = None if loader.done else loader
+    st.session_state.evict_loader = evict
+    return True
+
+
+@st.experimental_fragment(run_every=1)
+def show_loading_progress(loader: BankLoader) -> None:
+    """加载中每秒刷新进度；全部识别并对齐答案后整页重跑，换上完整题库"""
+    bank = loader.bank()
+    if loader.done or bank is None:
+        st.rerun()
+    st.metric("进度", f"{st.session_state.idx + 1}/{len(current_view(bank))}")
+    st.caption(f"⏳ 后台解析中，已识别 {loader.count} 道题")
+
+
+def use_bank(bank: QuestionBank) -> None:
+    """切换当前会话的题库（共享的题库只读，排序/按题型练习都只是视图）"""
+    st.session_state.bank = bank
+    st.session_state.practice_type = ALL_TYPES
+    st.session_state.idx = 0
+
+
+def reset_position() -> None:
+    st.session_state.idx = 0
+
+
+def reset_wrong_page() -> None:
+    st.session_state.wrong_page = 1
+
+
+def add_to_wrong_book(bank_key: str, entry: dict) -> None:
+    """把本次答错的题加入错题本（同一次提交只加一次）"""
+    graded = st.session_state.get("graded")
+    if graded is None or graded["saved"]:
+        return
+    store = get_attempt_store()
+    store.add_wrong(bank_key, st.session_state.user_name, entry)
+    graded["saved"] = True
+    store.flush()  # 用户主动修改错题本，侧栏随后的重绘要能读到
+
+
+def clear_wrong_book(bank_key: str) -> None:
+    store = get_attempt_store()
+    store.clear_wrong(bank_key, st.session_state.user_name)
+    store.flush()
+    reset_wrong_page()
+
+
+def current_view(bank: QuestionBank) -> QuestionBank:
+    """当前会话看到的题目顺序：按题型排序 / 只练某一题型（视图缓存在共享题库上，不复制题目）"""
+    practice_type = st.session_state.get("practice_type", ALL_TYPES)
+    if practice_type != ALL_TYPES and bank.first_index(practice_type) is not None:
+        return bank.only_type(practice_type)
+    if st.session_state.get("sort_by_type"):
+        return bank.sorted_by_type()
+    return bank
 
-    if q_type == "choice":
-        user_token = normalize_tokens(user_ans)
-        if options and all(len(tok) == 1 and tok.isalpha() for tok in correct_tokens):
-            target = set(_letters_to_options(correct_tokens, options))
-            return bool(user_token) and user_token[0] in target
-        return bool(user_token) and user_token[0] in correct_tokens
-
-    if q_type == "judge":
-        user_token = normalize_tokens(user_ans)
-        # 统一映射：正确/对/√/T -> 对，错误/错/×/F -> 错
-        if user_token:
-            first = user_token[0]
-            if first in ['正确', '对', '√', 't', 'true', 'yes']:
-                user_token = ['对']
-            elif first in ['错误', '错', '×', 'f', 'false', 'no']:
-                user_token = ['错']
-        return bool(user_token) and user_token[0] in correct_tokens
-
-    if q_type == "multi":
-        user_tokens = normalize_tokens(" ".join(user_ans) if isinstance(user_ans, list) else user_ans)
-        if options and all(len(tok) == 1 and tok.isalpha() for tok in correct_tokens):
-            target = set(_letters_to_options(correct_tokens, options))
-            return set(user_tokens) == target
-        return set(user_tokens) == set(correct_tokens)
-
-    if q_type == "fill":
-        user_tokens = normalize_tokens(user_ans)
-        # 允许用户回答包含所有正确片段即可
-        return all(tok in "".join(user_tokens) or tok in str(user_ans) for tok in correct_tokens)
-
-    # short / calc 不判分
-    return None
 
 # 侧边栏：文件选择和生成
 with st.sidebar:
     st.header("📁 题库管理")
-    if "wrong_book" not in st.session_state:
-        st.session_state.wrong_book = []
+    if "user_name" not in st.session_state:
+        st.session_state.user_name = "本地用户"
+    if "wrong_page" not in st.session_state:
+        st.session_state.wrong_page = 1
     if "auto_next" not in st.session_state:
         st.session_state.auto_next = True
     if "sort_by_type" not in st.session_state:
         st.session_state.sort_by_type = False
 
     st.checkbox("判对后自动跳下一题", key="auto_next")
-    st.checkbox("按题型排序（填空→判断→选择→简答→综合应用→案例分析）", key="sort_by_type")
+    st.checkbox("按题型排序（填空→判断→选择→简答→综合应用→案例分析）", key="sort_by_type", on_change=reset_position)
     
     mode = st.radio("选择输入方式", ["从文件夹选择", "直接上传文件"])
     
@@ -145,115 +247,169 @@ with st.sidebar:
                 st.error("至少需要选择一份文件")
                 st.stop()
             
-            with st.spinner("解析中..."):
-                def load_file(path):
-                    if not path:
-                        return None
-                    suffix = Path(path).suffix.lower()
-                    return parse_text_file(path) if suffix == ".txt" else parse_docx_file(path)
-                
-                without_text = load_file(without_path)
-                with_text = load_file(with_path)
-                
-                if without_text or with_text:
-                    # 如果只有一份文本，两份都用它
-                    if not without_text:
-                        without_text = with_text
-                    if not with_text:
-                        with_text = without_text
-                    
-                    questions = align_answers(with_text, without_text)
-                    questions_list = [q.model_dump() for q in questions]
-                    # 应用排序
-                    if st.session_state.sort_by_type:
-                        questions_list = sort_questions_by_type(questions_list)
-                    st.session_state.questions = questions_list
-                    st.session_state.idx = 0
-                    st.success(f"✓ 成功加载 {len(questions_list)} 道题")
-                    st.rerun()
-                else:
-                    st.error("文件解析失败")
+            stamps = (_file_stamp(with_path), _file_stamp(without_path))
+            loader = load_bank_from_files(*stamps)
+            if use_loader(loader, partial(load_bank_from_files.clear, *stamps)):
+                st.rerun()
+            else:
+                st.error(f"文件解析失败：{loader.error or '未识别出题目'}")
     
     else:  # 上传文件
         with_upload = st.file_uploader("上传含答案文档", type=["txt", "docx"])
         without_upload = st.file_uploader("上传纯题干文档", type=["txt", "docx"], key="without")
         
         if st.button("🚀 生成题库", type="primary") and without_upload:
-            with st.spinner("解析中..."):
-                import tempfile
-                
-                def load_upload(upload_obj):
-                    if not upload_obj:
-                        return None
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=upload_obj.name) as tmp:
-                        tmp.write(upload_obj.read())
-                        tmp_path = tmp.name
-                    suffix = Path(tmp_path).suffix.lower()
-                    text = parse_text_file(tmp_path) if suffix == ".txt" else parse_docx_file(tmp_path)
-                    Path(tmp_path).unlink()
-                    return text
-                
-                without_text = load_upload(without_upload)
-                with_text = load_upload(with_upload)
-                
-                if without_text:
-                    questions = align_answers(with_text, without_text)
-                    questions_list = [q.model_dump() for q in questions]
-                    # 应用排序
-                    if st.session_state.sort_by_type:
-                        questions_list = sort_questions_by_type(questions_list)
-                    st.session_state.questions = questions_list
-                    st.session_state.idx = 0
-                    st.success(f"✓ 成功加载 {len(questions_list)} 道题")
-                    st.rerun()
-                else:
-                    st.error("文件解析失败")
+            uploads = (
+                (with_upload.name, with_upload.getvalue()) if with_upload else None,
+                (without_upload.name, without_upload.getvalue()),
+            )
+            loader = load_bank_from_uploads(*uploads)
+            if use_loader(loader, partial(load_bank_from_uploads.clear, *uploads)):
+                st.rerun()
+            else:
+                st.error(f"文件解析失败：{loader.error or '未识别出题目'}")
+
+    st.text_input("用户", key="user_name", help="答题记录和错题本按 用户 + 题库 保存在本地")
 
     with st.expander("📒 错题本", expanded=False):
-        st.write(f"共 {len(st.session_state.wrong_book)} 条")
-        if st.session_state.wrong_book:
-            for item in st.session_state.wrong_book:
-                st.markdown(f"**第 {item['id']} 题（{get_type_label(item.get('type'))}）** - {item['stem']}")
-                st.markdown(f"你的答案：{item['user_answer']}")
-                st.markdown(f"正确答案：{item['answer']}")
-                st.divider()
-            if st.button("清空错题本"):
-                st.session_state.wrong_book = []
-                st.rerun()
+        store = get_attempt_store()
+        bank_key = current_bank_key()
+        # 各题型题数来自计数表，每次重绘只查询并渲染一页，耗时与错题本大小无关
+        wrong_counts = store.wrong_counts_by_type(bank_key, st.session_state.user_name) if bank_key else {}
+        wrong_counts = dict(sorted(wrong_counts.items(), key=lambda item: type_rank(item[0])))
+        total = sum(wrong_counts.values())
+        st.write(f"共 {total} 条")
+        if total:
+            st.caption(" · ".join(f"{get_type_label(t)} {n}" for t, n in wrong_counts.items()))
+            wrong_labels = {ALL_TYPES: "全部题型"}
+            wrong_labels.update({t: f"{get_type_label(t)}（{n}）" for t, n in wrong_counts.items()})
+            if st.session_state.get("wrong_type", ALL_TYPES) not in wrong_labels:
+                st.session_state.wrong_type = ALL_TYPES
+            wrong_type = st.selectbox(
+                "题型",
+                list(wrong_labels),
+                format_func=wrong_labels.get,
+                key="wrong_type",
+                on_change=reset_wrong_page,
+            )
+            count = total if wrong_type == ALL_TYPES else wrong_counts[wrong_type]
+            pages = (count - 1) // WRONG_BOOK_PAGE_SIZE + 1
+            st.session_state.wrong_page = min(st.session_state.wrong_page, pages)
+            page = st.number_input(f"页码（共 {pages} 页）", min_value=1, max_value=pages, key="wrong_page") if pages > 1 else 1
+            items = store.wrong_page(
+                bank_key,
+                st.session_state.user_name,
+                (page - 1) * WRONG_BOOK_PAGE_SIZE,
+                WRONG_BOOK_PAGE_SIZE,
+                None if wrong_type == ALL_TYPES else wrong_type,
+            )
+            # 整页合成一段 markdown，每页只发送一个元素
+            st.markdown("\n\n---\n\n".join(
+                f"**第 {item['number']} 题（{get_type_label(item['type'])}）** - {item['stem']}  \n"
+                f"你的答案：{item['user_answer']}  \n"
+                f"正确答案：{item['answer']}"
+                + (f"  \n答错 {item['wrong_count']} 次" if item["wrong_count"] > 1 else "")
+                for item in items
+            ))
+            st.button("清空错题本", on_click=clear_wrong_book, args=(bank_key,))
+
+    with st.expander("📊 难题榜", expanded=False):
+        bank_key = current_bank_key()
+        hardest = get_question_stats().hardest(bank_key, HARDEST_QUESTIONS_LIMIT) if bank_key else []
+        if not hardest:
+            st.write("暂无判分记录")
+        else:
+            st.caption("所有用户在本题库上的作答，正确率最低的在前")
+            stats_bank: QuestionBank = st.session_state.bank
+            lines = []
+            for stats in hardest:
+                position = stats_bank.position_of_id(stats["id"])
+                q = stats_bank.get(position) if position is not None else {}
+                line = (
+                    f"**第 {stats['id']} 题（{get_type_label(q.get('type'))}）** - {q.get('stem') or ''}  \n"
+                    f"正确率 {stats['accuracy']:.0%}（{stats['correct']}/{stats['attempts']}）"
+                )
+                if stats["mean_seconds"] is not None:
+                    line += f" · 平均用时 {stats['mean_seconds']:.0f} 秒"
+                if stats["wrong_options"]:
+                    index, count = max(stats["wrong_options"].items(), key=lambda item: item[1])
+                    options = JUDGE_OPTIONS if q.get("type") == "judge" else q.get("options") or ()
+                    label = options[index] if index < len(options) else chr(ord("A") + index)
+                    line += f"  \n常见错选：{label}（{count} 次）"
+                lines.append(line)
+            # 整个榜单合成一段 markdown，只发送一个元素
+            st.markdown("\n\n---\n\n".join(lines))
 
 # 主界面：题目展示
 st.title("AutoReview 互动练习")
 
-if "questions" not in st.session_state:
-    # 尝试加载默认JSON
+loader: BankLoader | None = st.session_state.get("loader")
+if loader is not None:
+    # 后台加载中每次重绘取最新快照；完成后换上对齐了答案的完整题库（题目顺序不变，进度保留）
+    latest = loader.bank()
+    if latest:
+        st.session_state.bank = latest
+    if loader.done:
+        st.session_state.loader = loader = None
+        if latest is None:
+            st.session_state.pop("evict_loader", lambda: None)()
+            st.warning("题库解析中断，只保留了已识别的题目")
+
+if "bank" not in st.session_state:
+    # 尝试加载默认题库：优先紧凑题库（启动耗时与题库大小无关），其次 JSON
     default_json = Path(__file__).resolve().parent.parent / "data" / "processed" / "questions.json"
-    if default_json.exists():
-        with default_json.open("r", encoding="utf-8") as f:
-            st.session_state.questions = json.load(f)
-            st.session_state.idx = 0
+    default_store = default_json.with_suffix(STORE_SUFFIX)
+    default_bank = open_processed_store(_file_stamp(str(default_store))) if default_store.exists() else None
+    if default_bank is None and default_json.exists():
+        default_bank = load_processed_questions(_file_stamp(str(default_json)))
+        if default_bank is None:
+            st.warning(f"{default_json.name} 不是有效的 JSON 题库或没有题目，请用 python main.py 重新生成")
+    if default_bank is not None:
+        st.session_state.bank = default_bank
+        st.session_state.idx = 0
     else:
         st.info("👈 请在左侧选择或上传复习题文件")
         st.stop()
 
-questions = st.session_state.questions
-
 if "idx" not in st.session_state:
     st.session_state.idx = 0
-
-question = questions[st.session_state.idx]
+if "practice_type" not in st.session_state:
+    st.session_state.practice_type = ALL_TYPES
+
+base_bank: QuestionBank = st.session_state.bank
+if base_bank.available_types:
+    practice_labels = {ALL_TYPES: "全部题型"}
+    for t, count in base_bank.type_counts().items():
+        practice_labels[t] = f"{get_type_label(t)}（{count} 题）"
+    st.selectbox(
+        "练习题型",
+        list(practice_labels),
+        format_func=practice_labels.get,
+        key="practice_type",
+        on_change=reset_position,
+    )
+
+bank = current_view(base_bank)
+st.session_state.idx = max(0, min(st.session_state.idx, len(bank) - 1))
+
+question = bank.get(st.session_state.idx)
 q_type = question.get("type") or "short"
+question_number = bank.number(st.session_state.idx)
+# 作答用时：从这道题显示出来（或上次提交）开始计
+shown = st.session_state.get("question_shown")
+if shown is None or shown[0] != (base_bank.key, question["id"]):
+    st.session_state.question_shown = shown = ((base_bank.key, question["id"]), time.monotonic())
 
-type_priority = ["fill", "judge", "choice", "short", "comprehensive", "case"]
-available_types = [t for t in type_priority if any(q.get("type") == t for q in questions)]
-# 包含未在优先列表中的自定义题型
-extra_types = {t for t in (q.get("type") for q in questions) if t and t not in available_types}
-available_types.extend(sorted(extra_types))
+available_types = bank.available_types
 
 col1, col2 = st.columns([3, 1])
 with col1:
-    st.subheader(f"第 {question['id']} 题（{get_type_label(q_type)}）")
+    st.subheader(f"第 {question_number} 题（{get_type_label(q_type)}）")
 with col2:
-    st.metric("进度", f"{st.session_state.idx + 1}/{len(questions)}")
+    if loader is not None:
+        show_loading_progress(loader)
+    else:
+        st.metric("进度", f"{st.session_state.idx + 1}/{len(bank)}")
 
 # 显示题干，填空题中的空格用下划线标记
 stem_text = question.get("stem")
@@ -279,38 +435,60 @@ with st.form(key=f"form_{question['id']}"):
     elif q_type == "fill":
         user_answer = st.text_input("填写答案：", key=user_key)
     elif q_type == "judge":
-        user_answer = st.radio("判断题：", ["对", "错"], key=user_key)
+        user_answer = st.radio("判断题：", list(JUDGE_OPTIONS), key=user_key)
     else:
         user_answer = st.text_area("作答：", key=user_key)
 
-    submitted = st.form_submit_button("提交/判题 (Enter)")
-
-    if submitted:
-        result = evaluate_answer(q_type, user_answer, question.get("answer"), question.get("options"))
-        if result is True:
-            st.success("✓ 回答正确！")
-            # 判对后自动跳下一题
-            if st.session_state.get("auto_next", True):
-                if st.session_state.idx < len(questions) - 1:
-                    st.session_state.idx += 1
-                    st.rerun()
-        elif result is False:
-            st.error("✗ 回答错误")
-            if st.checkbox("加入错题本", key=f"wrong_{question['id']}"):
-                entry = {
-                    "id": question.get("id"),
-                    "type": q_type,
-                    "stem": question.get("stem"),
-                    "answer": question.get("answer"),
-                    "user_answer": user_answer,
-                }
-                if entry not in st.session_state.wrong_book:
-                    st.session_state.wrong_book.append(entry)
-        else:
-            st.info("ℹ 本题不自动判分，参考答案见下方。")
+    if st.form_submit_button("提交/判题 (Enter)"):
+        # 每次提交只在这里记一次作答和逐题统计；页面上其他操作引起的重绘只读取 graded
+        result = grade(grading_key(base_bank, question, final=loader is None), user_answer)
+        previous = st.session_state.get("graded")
+        # 同一道题原样再提交（连按回车等）不再计入逐题统计，免得正确率和错选分布被重复计数
+        repeated = (
+            previous is not None and previous["result"] is not None
+            and previous["question"] == shown[0] and previous["answer"] == user_answer
+        )
+        if base_bank.key:
+            get_attempt_store().record_attempt(
+                base_bank.key, st.session_state.user_name, question["id"], q_type, user_answer, result
+            )
+            if result is not None and not repeated:
+                chosen = option_indices(user_answer, JUDGE_OPTIONS if q_type == "judge" else question.get("options"))
+                get_question_stats().record(base_bank.key, question["id"], result, chosen, time.monotonic() - shown[1])
+        st.session_state.question_shown = (shown[0], time.monotonic())
+        if not repeated:
+            st.session_state.graded = {"question": shown[0], "answer": user_answer, "result": result, "saved": False}
+        # 判对后自动跳下一题
+        if result is True and st.session_state.get("auto_next", True) and st.session_state.idx < len(bank) - 1:
+            st.session_state.idx += 1
+            st.rerun()
+
+graded = st.session_state.get("graded")
+if graded is not None and graded["question"] == shown[0]:
+    if graded["result"] is True:
+        st.success("✓ 回答正确！")
+    elif graded["result"] is False:
+        st.error("✗ 回答错误")
+        if base_bank.key and graded["saved"]:
+            st.caption("已加入错题本")
+        elif base_bank.key:
+            entry = {
+                "id": question.get("id"),
+                "number": question_number,
+                "type": q_type,
+                "stem": question.get("stem"),
+                "answer": question.get("answer"),
+                "user_answer": graded["answer"],
+            }
+            st.button("加入错题本", key=f"wrong_{question['id']}", on_click=add_to_wrong_book, args=(base_bank.key, entry))
+    elif loader is not None:
+        st.info("⏳ 答案仍在后台对齐，稍后再提交即可判分。")
+    else:
+        st.info("ℹ 本题不自动判分，参考答案见下方。")
 
 if st.button("显示答案", key=f"show_{question['id']}"):
-    st.info(f"**答案/思路：** {question.get('answer') or '暂无答案'}")
+    pending = "答案仍在后台对齐" if loader is not None else "暂无答案"
+    st.info(f"**答案/思路：** {question.get('answer') or pending}")
 
 # 导航区
 st.divider()
@@ -321,10 +499,10 @@ with col1:
         st.rerun()
 with col2:
     if st.button("下一题 ➡️", use_container_width=True):
-        st.session_state.idx = min(len(questions) - 1, st.session_state.idx + 1)
+        st.session_state.idx = min(len(bank) - 1, st.session_state.idx + 1)
         st.rerun()
 with col3:
-    jump_to = st.number_input("跳转到第", min_value=1, max_value=len(questions), value=st.session_state.idx + 1, key="jump")
+    jump_to = st.number_input("跳转到第", min_value=1, max_value=len(bank), value=st.session_state.idx + 1, key="jump")
     if st.button("GO", use_container_width=True):
         st.session_state.idx = jump_to - 1
         st.rerun()
@@ -333,8 +511,8 @@ with col3:
         selected_label = st.selectbox("按题型跳转", type_labels, key="jump_type")
         selected_type = available_types[type_labels.index(selected_label)]
         if st.button("跳到该题型", use_container_width=True, key="jump_type_btn"):
-            for i, q in enumerate(questions):
-                if q.get("type") == selected_type:
-                    st.session_state.idx = i
-                    st.rerun()
+            first = bank.first_index(selected_type)
+            if first is not None:
+                st.session_state.idx = first
+                st.rerun()
             st.warning("未找到该题型的题目")